@@ -0,0 +1,224 @@
+# bench_snu_bot.py
+# End-to-end benchmark: runs try_book_room / main() headless against the local
+# mock server (mock_ssims_server.py) and reports per scenario
+#   time-to-submit, time-to-result, total time and WebDriver round trips.
+#
+#   python bench_snu_bot.py                  # all scenarios once
+#   python bench_snu_bot.py -s main_dups -n 3 --headful
+#   python bench_snu_bot.py --profile both   # default vs LEAN_BROWSER: page loads, memory, assets fetched
+#   python bench_snu_bot.py --backend both   # chromedriver vs raw CDP (BROWSER_BACKEND), same scenarios
+import argparse
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+
+import mock_ssims_server as mock_server
+import snu_practice_room_bot as bot
+
+try:
+    import psutil   # optional: browser RSS in the report
+except ImportError:
+    psutil = None
+
+class Counter:
+    def __init__(self):
+        self.webdriver_calls = 0
+        self.page_loads = []   # ms per driver.get
+        self.js_heap_mb = None
+        self.rss_mb = None
+
+def sample_memory(counter, driver):
+    try:
+        driver.execute_cdp_cmd("Performance.enable", {})
+        metrics = {m["name"]: m["value"] for m in driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]}
+        counter.js_heap_mb = max(counter.js_heap_mb or 0, round(metrics["JSHeapUsedSize"] / 2**20, 1))
+    except Exception:
+        pass
+    if psutil is not None:
+        try:
+            root = psutil.Process(driver.service.process.pid)
+            procs = root.children(recursive=True)
+            if bot.BROWSER_BACKEND == "cdp":   # the service process is Chrome itself, not chromedriver
+                procs.append(root)
+            counter.rss_mb = max(counter.rss_mb or 0, round(sum(p.memory_info().rss for p in procs) / 2**20))
+        except Exception:
+            pass
+
+def instrument(counter, headful):
+    """Make bot.build_driver headless (unless headful), count driver commands, time page loads, sample memory."""
+    orig = bot.build_driver
+
+    def build_driver(headless=None, profile_dir=None):
+        driver = orig(headless=not headful, profile_dir=profile_dir)
+        execute, get, quit_ = driver.execute, driver.get, driver.quit
+
+        def counted(driver_command, params=None):
+            counter.webdriver_calls += 1
+            return execute(driver_command, params)
+
+        def timed_get(url):
+            t0 = time.perf_counter()
+            get(url)
+            counter.page_loads.append((time.perf_counter() - t0) * 1000)
+
+        def sampled_quit():
+            sample_memory(counter, driver)
+            quit_()
+
+        driver.execute = counted
+        driver.get = timed_get
+        driver.quit = sampled_quit
+        return driver
+
+    bot.build_driver = build_driver
+    return orig
+
+def point_bot_at(url, tmp):
+    bot.START_URL = url
+    bot.HTTP_BASE_URL = url.rstrip("/")
+    bot.PROFILE_DIR = os.path.join(tmp, "profile")
+    bot.TRACE_FILE = os.path.join(tmp, "timeline.jsonl")
+    bot.SESSION_CACHE_FILE = os.path.join(tmp, "session_cache.json")
+    bot.HISTORY_DB = os.path.join(tmp, "history.sqlite")
+    bot.BOOK_DAYS = set(range(7))
+    bot.DEBUG = False
+    os.environ.setdefault("SNU_PW", "bench")
+
+def read_spans(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+# ---------- SCENARIOS ----------
+def run_try_book_room(room):
+    def run():
+        today = bot.now_kst()
+        target = today + timedelta(days=bot.BOOK_AHEAD_DAYS)
+        bot.trace_start_run()
+        driver = bot.build_driver()
+        try:
+            driver.get(bot.START_URL)
+            bot.wait_for_idle(driver)
+            bot.maybe_login_nsso(driver)
+            status = bot.try_book_room(driver, today, target, room)
+            bot.trace_end_run(status, room)
+            return status
+        finally:
+            driver.quit()
+    return run
+
+def run_main():
+    bot.main()
+    spans = read_spans(bot.TRACE_FILE)
+    ends = [s for s in spans if s["phase"] == "run"]
+    return ends[-1]["outcome"] if ends else "?"
+
+def run_main_warm():
+    """Cold run to fill the session cache, then the measured warm run."""
+    bot.main()
+    open(bot.TRACE_FILE, "w").close()
+    return run_main()
+
+def first_rooms(n):
+    target = bot.now_kst() + timedelta(days=bot.BOOK_AHEAD_DAYS)
+    return bot.ROOM_PRIORITY.get(target.weekday(), ["311", "302", "318"])[:n]
+
+SCENARIOS = {
+    # name: (mock kwargs factory, runner factory)
+    "room_free": (lambda: {}, lambda: run_try_book_room(first_rooms(1)[0])),
+    "room_duplicate": (lambda: {"taken": {first_rooms(1)[0]: []}}, lambda: run_try_book_room(first_rooms(1)[0])),
+    "room_free_no_jquery": (lambda: {"jquery": False}, lambda: run_try_book_room(first_rooms(1)[0])),
+    "main_first_room": (lambda: {}, lambda: run_main),
+    "main_dups": (lambda: {"taken": {r: [] for r in first_rooms(2)}}, lambda: run_main),
+    "main_slow_server": (lambda: {"latency_ms": 250, "jitter_ms": 100}, lambda: run_main),
+    "main_login": (lambda: {"require_login": True}, lambda: run_main),
+    "main_warm_start": (lambda: {"require_login": True}, lambda: run_main_warm),
+    "main_contention": (lambda: {"contention": 0.5, "seed": 7}, lambda: run_main),
+}
+
+def run_scenario(name, headful, profile="default", backend="selenium"):
+    mock_kwargs, runner = SCENARIOS[name]
+    tmp = tempfile.mkdtemp(prefix="snu_bench_")
+    mock = mock_server.MockSSIMS(**mock_kwargs()).start()
+    saved = {k: getattr(bot, k) for k in ("START_URL", "HTTP_BASE_URL", "PROFILE_DIR", "TRACE_FILE",
+                                          "SESSION_CACHE_FILE", "BOOK_DAYS", "DEBUG", "LEAN_BROWSER",
+                                          "BROWSER_BACKEND", "HISTORY_DB")}
+    counter = Counter()
+    orig_build = instrument(counter, headful)
+    try:
+        point_bot_at(mock.url, tmp)
+        bot.LEAN_BROWSER = profile == "lean"
+        bot.BROWSER_BACKEND = backend
+        t0 = time.monotonic()
+        try:
+            outcome = runner()()
+        except Exception as e:
+            outcome = f"error:{type(e).__name__}"
+        total = time.monotonic() - t0
+        spans = read_spans(bot.TRACE_FILE)
+        submits = [s for s in spans if s["phase"] == "submit"]
+        results = [s for s in spans if s["phase"] == "swal"]
+        return {
+            "scenario": name,
+            "profile": profile,
+            "backend": backend,
+            "outcome": outcome,
+            "total_s": round(total, 2),
+            "submit_s": round(submits[0]["t"], 2) if submits else None,
+            "result_s": round(results[-1]["t"] + results[-1]["ms"] / 1000, 2) if results else None,
+            "webdriver_calls": counter.webdriver_calls,
+            "page_load_ms": round(statistics.median(counter.page_loads)) if counter.page_loads else None,
+            "js_heap_mb": counter.js_heap_mb,
+            "rss_mb": counter.rss_mb,
+            "server": dict(mock.stats),
+            "booked": mock.my_bookings(),
+        }
+    finally:
+        bot.build_driver = orig_build
+        for k, v in saved.items():
+            setattr(bot, k, v)
+        mock.stop()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the booking flow against the mock SSIMS server")
+    ap.add_argument("-s", "--scenario", action="append", choices=sorted(SCENARIOS), help="default: all")
+    ap.add_argument("-n", "--repeat", type=int, default=1)
+    ap.add_argument("--headful", action="store_true")
+    ap.add_argument("--profile", choices=["default", "lean", "both"], default="default",
+                    help="browser profile: current one, LEAN_BROWSER, or both for comparison")
+    ap.add_argument("--backend", choices=["selenium", "cdp", "both"], default="selenium",
+                    help="BROWSER_BACKEND: chromedriver, raw CDP, or both for comparison")
+    ap.add_argument("--json", help="also write results to this file")
+    args = ap.parse_args()
+
+    profiles = ["default", "lean"] if args.profile == "both" else [args.profile]
+    backends = ["selenium", "cdp"] if args.backend == "both" else [args.backend]
+    results = []
+    for name in args.scenario or list(SCENARIOS):
+        for profile in profiles:
+            for backend in backends:
+                for i in range(args.repeat):
+                    res = run_scenario(name, args.headful, profile, backend)
+                    results.append(res)
+                    print(f"[bench] {name} ({profile}, {backend}) #{i + 1}: {res['outcome']} total={res['total_s']}s "
+                          f"submit@{res['submit_s']}s result@{res['result_s']}s wd={res['webdriver_calls']}", flush=True)
+
+    print()
+    print(f"{'scenario':<20}{'profile':<9}{'backend':<10}{'outcome':<12}{'submit s':>10}{'result s':>10}{'total s':>10}"
+          f"{'WD calls':>10}{'inserts':>9}{'load ms':>9}{'heap MB':>9}{'RSS MB':>8}{'assets':>8}")
+    for r in results:
+        print(f"{r['scenario']:<20}{r['profile']:<9}{r['backend']:<10}{r['outcome']:<12}{r['submit_s'] or '-':>10}{r['result_s'] or '-':>10}"
+              f"{r['total_s']:>10}{r['webdriver_calls']:>10}{r['server']['inserts']:>9}{r['page_load_ms'] or '-':>9}"
+              f"{r['js_heap_mb'] or '-':>9}{r['rss_mb'] or '-':>8}{r['server']['static']:>8}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,10 @@ from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 import os
 
+from snu_practice_room_bot import resolve_browser
+
 PROFILE_DIR = r"C:\SNU_Booker\chrome_snu_profile"
 os.makedirs(PROFILE_DIR, exist_ok=True)
 
@@ -19,7 +20,11 @@ options.add_argument("--disable-dev-shm-usage")
 options.add_argument("--no-first-run")
 options.add_argument("--no-default-browser-check")
 
-driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=options)
+# Same Chrome / chromedriver pair the bot uses (resolved once, cached in DRIVER_CACHE_FILE)
+chrome, chromedriver = resolve_browser()
+if chrome:
+    options.binary_location = chrome
+driver = webdriver.Chrome(service=ChromeService(executable_path=chromedriver), options=options)
 
 login_url = "https://ssims.snu.ac.kr"  # or "https://my.snu.ac.kr"
 driver.get(login_url)
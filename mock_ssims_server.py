@@ -0,0 +1,498 @@
+# mock_ssims_server.py
+# Local stand-in for the SSIMS pages and endpoints snu_practice_room_bot.py touches:
+#   /                 filters (#S_BD_CD / #S_SPACE_CD), datepicker, search, FullCalendar zone
+#   /reservation      reservation form (#reserInsertBtn) with SweetAlert2-style popups
+#   SEARCH_PATH       POST, JSON list of bookings for a room/day
+#   INSERT_PATH       POST, JSON result ("예약이 중복되었습니다" when the slot is taken)
+#   /login            optional nsso-style password page (#login_pwd / #loginProcBtn)
+# Latency and slot contention are configurable.
+#
+#   python mock_ssims_server.py --port 8765 --latency 150 --taken 302,311@13:00-14:00
+# then point START_URL / HTTP_BASE_URL at http://127.0.0.1:8765/
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+SEARCH_PATH = "/resv/space/selectSpaceReserList.do"
+INSERT_PATH = "/resv/space/insertSpaceReser.do"
+DUPLICATE_MSG = "예약이 중복되었습니다"
+SUCCESS_MSG = "예약이 완료되었습니다."
+SESSION_COOKIE = "JSESSIONID"
+
+# Sub-resources like the real pages pull in (a lean browser should not fetch them)
+STATIC = {
+    "/static/logo.png": ("image/png", bytes.fromhex(
+        "89504e470d0a1a0a0000000d49484452000000010000000108060000001f15c489"
+        "0000000b49444154789c6360000200000500017a5eab3f0000000049454e44ae426082")),
+    "/static/ssims.woff2": ("font/woff2", b"wOF2" + bytes(60 * 1024)),
+}
+
+BUILDING_CODE = "BD0220"
+# Position in the #S_SPACE_CD list matters: the bot clicks li:nth-child(N).
+ROOMS = ["101", "102", "103", "104", "105", "106", "107",
+         "302", "303", "304", "305", "311", "318", "319"]
+
+def space_code(room):
+    return f"SP{room}"
+
+def _minutes(hhmm):
+    h, m = hhmm.split(":")
+    return int(h) * 60 + int(m)
+
+def _hhmm(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+# ---------- PAGES ----------
+_TOP = """
+<div id="Tmp_resvUserTop">
+  <div class="logoarea"><div><a href="/"><img alt="SSIMS" src="/static/logo.png" width="120" height="30"></a></div></div>
+  <div class="top"><div><div>
+    <a href="#">1</a><a href="#">2</a><a href="#">3</a><a href="#">4</a>
+    <a href="#">5</a><a href="#">6</a><a href="#">7</a>
+    <a href="#" id="langEn" onclick="document.documentElement.lang='en';return false;">English</a>
+  </div></div></div>
+</div>
+"""
+
+_SWAL_JS = """
+function swal(text, onConfirm) {
+  const c = document.createElement('div');
+  c.className = 'swal2-container swal2-center swal2-backdrop-show';
+  c.innerHTML = '<div class="swal2-popup"><h2 class="swal2-title"></h2>' +
+    '<div id="swal2-html-container"></div><button class="swal2-confirm swal2-styled" type="button">OK</button></div>';
+  c.querySelector('#swal2-html-container').textContent = text;
+  c.querySelector('button').onclick = () => { c.remove(); if (onConfirm) onConfirm(); };
+  document.body.appendChild(c);
+}
+function post(path, data) {
+  return fetch(path, {method: 'POST', body: new URLSearchParams(data),
+    headers: {'X-Requested-With': 'XMLHttpRequest'}}).then(r => r.json());
+}
+"""
+
+_STYLE = """
+<style>
+  @font-face { font-family: "SSIMS Sans"; src: url("/static/ssims.woff2") format("woff2"); }
+  body { font-family: "SSIMS Sans", sans-serif; margin: 0; }
+  .dropdown ul { display: none; list-style: none; margin: 0; padding: 0; border: 1px solid #999; }
+  .dropdown.open ul { display: block; }
+  .dropdown li { padding: 2px 6px; cursor: pointer; }
+  #ui-datepicker-div { position: absolute; background: #fff; border: 1px solid #999; padding: 4px; }
+  #ui-datepicker-div td a { display: inline-block; width: 24px; text-align: center; }
+  .swal2-container { position: fixed; inset: 0; background: rgba(0,0,0,.4); display: flex; align-items: center; justify-content: center; }
+  .swal2-popup { background: #fff; padding: 20px; min-width: 300px; }
+  .fc-event { border: 1px solid #36c; margin: 2px; padding: 2px; }
+</style>
+"""
+
+# Minimal jQuery-UI-compatible datepicker: same DOM (#ui-datepicker-div, header
+# month/year spans, prev/next links, day anchors) as the real widget, plus the
+# subset of the $.datepicker API the bot's fast path uses (see _JQUERY_SHIM_JS).
+_DATEPICKER_JS = """
+const MONTHS = ['Jan','Feb','Mar','Apr','May','Jun','Jul','Aug','Sept','Oct','Nov','Dec'];
+const dp = {input: null, year: 0, month: 0, selected: null};
+function pad(n) { return String(n).padStart(2, '0'); }
+function fmt(d) { return d.getFullYear() + '-' + pad(d.getMonth() + 1) + '-' + pad(d.getDate()); }
+function dpRender() {
+  let div = document.getElementById('ui-datepicker-div');
+  if (!div) { div = document.createElement('div'); div.id = 'ui-datepicker-div'; document.body.appendChild(div); }
+  const first = new Date(dp.year, dp.month, 1).getDay();
+  const days = new Date(dp.year, dp.month + 1, 0).getDate();
+  let rows = '', cells = '';
+  for (let i = 0; i < first; i++) cells += '<td class="ui-datepicker-other-month"></td>';
+  for (let d = 1; d <= days; d++) {
+    cells += '<td><a href="#" class="ui-state-default" data-day="' + d + '">' + d + '</a></td>';
+    if ((first + d) % 7 === 0) { rows += '<tr>' + cells + '</tr>'; cells = ''; }
+  }
+  if (cells) rows += '<tr>' + cells + '</tr>';
+  div.innerHTML = '<div class="ui-datepicker-header">' +
+    '<a class="ui-datepicker-prev" href="#">Prev</a><a class="ui-datepicker-next" href="#">Next</a>' +
+    '<div class="ui-datepicker-title"><span class="ui-datepicker-month">' + MONTHS[dp.month] +
+    '</span>&nbsp;<span class="ui-datepicker-year">' + dp.year + '</span></div></div>' +
+    '<table class="ui-datepicker-calendar"><tbody>' + rows + '</tbody></table>';
+  div.style.display = 'block';
+  div.querySelector('.ui-datepicker-prev').onclick = e => { e.preventDefault(); dpShift(-1); };
+  div.querySelector('.ui-datepicker-next').onclick = e => { e.preventDefault(); dpShift(1); };
+  div.querySelectorAll('td a').forEach(a => a.onclick = e => {
+    e.preventDefault(); dpSelect(new Date(dp.year, dp.month, +a.dataset.day));
+  });
+}
+function dpShift(n) {
+  dp.month += n;
+  if (dp.month < 0) { dp.month = 11; dp.year--; }
+  if (dp.month > 11) { dp.month = 0; dp.year++; }
+  setTimeout(dpRender, DP_DELAY);
+}
+function dpSelect(d) {
+  dp.selected = d;
+  dp.input.value = fmt(d);
+  dp.input.dispatchEvent(new Event('change', {bubbles: true}));
+  const div = document.getElementById('ui-datepicker-div');
+  if (div) div.style.display = 'none';
+}
+function dpAttach(input) {
+  dp.input = input;
+  input.classList.add('hasDatepicker');
+  input.addEventListener('click', () => {
+    const base = dp.selected || new Date();
+    dp.year = base.getFullYear(); dp.month = base.getMonth();
+    dpRender();
+  });
+}
+"""
+
+_JQUERY_SHIM_JS = """
+(function () {
+  const api = {
+    setDate(el, d) { dp.selected = d; el.value = fmt(d); },
+    getDate() { return dp.selected; },
+    hide() { const div = document.getElementById('ui-datepicker-div'); if (div) div.style.display = 'none'; },
+    option() { return null; },
+  };
+  function $(sel) {
+    const el = typeof sel === 'string' ? document.querySelector(sel) : sel;
+    return {
+      hasClass: c => !!el && el.classList.contains(c),
+      datepicker: (cmd, arg) => (api[cmd] ? api[cmd](el, arg) : undefined),
+      trigger: ev => el && el.dispatchEvent(new Event(ev, {bubbles: true})),
+    };
+  }
+  $.fn = {datepicker: true};
+  $.datepicker = {};
+  window.jQuery = window.$ = $;
+})();
+"""
+
+def home_page(delay_ms, jquery=True):
+    bd_items = "".join(f'<li data-value="BD{i:04d}">Building {i}</li>' for i in range(1, 4))
+    bd_items += f'<li data-value="{BUILDING_CODE}">Music Hall (220)</li>'
+    sp_items = "".join(f'<li data-value="{space_code(r)}">Practice Room {r}</li>' for r in ROOMS)
+    return f"""<!DOCTYPE html><html><head><meta charset="utf-8"><title>SSIMS (mock)</title>{_STYLE}</head>
+<body>
+{_TOP}
+<div id="Tmp_resvUserBody"><div>
+  <div><ul>
+    <li class="col-lg-3"><div class="dropdown" id="bdBox"><button type="button">Building</button>
+      <div id="S_BD_CD"><ul>{bd_items}</ul></div></div></li>
+    <li class="col-lg-4"><div class="dropdown" id="spBox"><button type="button">Space</button>
+      <div id="S_SPACE_CD"><ul>{sp_items}</ul></div></div></li>
+    <li class="col-lg-3"><div><input id="S_SPACE_RESER_USE_DT" type="text" readonly></div></li>
+    <li class="col-lg-2"><div><button type="button" class="btn2 searchPlusbtn">Search</button></div></li>
+  </ul></div>
+  <div id="resultZone"></div>
+</div></div>
+<script>
+const DP_DELAY = {delay_ms};
+{_SWAL_JS}
+{_DATEPICKER_JS}
+{_JQUERY_SHIM_JS if jquery else ""}
+const state = {{bd: '', sp: ''}};
+function dropdown(box, key) {{
+  const el = document.getElementById(box);
+  el.querySelector('button').onclick = () => el.classList.toggle('open');
+  el.querySelectorAll('li').forEach(li => li.onclick = () => {{
+    state[key] = li.dataset.value;
+    el.querySelector('button').textContent = li.textContent;
+    el.classList.remove('open');
+  }});
+}}
+dropdown('bdBox', 'bd');
+dropdown('spBox', 'sp');
+dpAttach(document.getElementById('S_SPACE_RESER_USE_DT'));
+document.querySelector('.searchPlusbtn').onclick = () => {{
+  const dt = document.getElementById('S_SPACE_RESER_USE_DT').value;
+  const zone = document.getElementById('resultZone');
+  zone.innerHTML = '';
+  post('{SEARCH_PATH}', {{S_BD_CD: state.bd, S_SPACE_CD: state.sp, S_SPACE_RESER_USE_DT: dt}}).then(res => {{
+    if (!res.available) {{ zone.innerHTML = '<p>검색 결과가 없습니다</p>'; return; }}
+    const events = res.list.map(e => '<div class="fc-event" data-start="' + e.start + '" data-end="' + e.end +
+      '"><span class="fc-event-time">' + e.start + ' - ' + e.end + '</span> <span class="fc-event-title">' +
+      e.title + '</span></div>').join('');
+    zone.innerHTML = '<div id="calendarZone"><div class="fc-header-toolbar fc-toolbar">' +
+      '<div><h2>' + dt + '</h2></div><div></div><div><button type="button" id="goReser">Reservation</button></div>' +
+      '</div><div class="fc-view" data-date="' + dt + '" data-space="' + state.sp + '">' + events + '</div></div>';
+    document.getElementById('goReser').onclick = () => {{
+      location.href = '/reservation?bd=' + encodeURIComponent(state.bd) + '&sp=' +
+        encodeURIComponent(state.sp) + '&dt=' + encodeURIComponent(dt);
+    }};
+  }});
+}};
+</script>
+</body></html>"""
+
+def form_page(bd, sp, dt):
+    hours = "".join(f"<option>{h:02d} h</option>" for h in range(7, 24))
+    mins = "".join(f"<option>{m:02d} min</option>" for m in range(0, 60, 10))
+    return f"""<!DOCTYPE html><html><head><meta charset="utf-8"><title>Reservation (mock)</title>{_STYLE}</head>
+<body>
+{_TOP}
+<div id="bodyContentArea-RESV">
+  <form id="reserForm" onsubmit="return false;">
+    <input type="hidden" id="BD_CD" name="BD_CD" value="{bd}">
+    <input type="hidden" id="SPACE_CD" name="SPACE_CD" value="{sp}">
+    <input type="hidden" id="SPACE_RESER_USE_DT" name="SPACE_RESER_USE_DT" value="{dt}">
+    <p>Space {sp} on {dt}</p>
+    <select id="RESER_APLY_TYPE_CD" name="RESER_APLY_TYPE_CD">
+      <option value="">-- purpose --</option><option value="RV14000001">Class</option>
+      <option value="RV14000099">Others</option></select>
+    <select id="SPACE_RESER_FR_T" name="SPACE_RESER_FR_T">{hours}</select>
+    <select id="SPACE_RESER_FR_M" name="SPACE_RESER_FR_M">{mins}</select>
+    <select id="SPACE_RESER_TO_T" name="SPACE_RESER_TO_T">{hours}</select>
+    <select id="SPACE_RESER_TO_M" name="SPACE_RESER_TO_M">{mins}</select>
+    <input id="APLYT_CNTINFO" name="APLYT_CNTINFO" value="01000000000">
+    <input id="APLYT_EMAIL" name="APLYT_EMAIL" value="">
+    <input id="SPACE_RESER_TTL" name="SPACE_RESER_TTL">
+    <textarea id="SPACE_RESER_CTNT" name="SPACE_RESER_CTNT"></textarea>
+    <div style="height:600px"></div>
+    <label><input type="checkbox" id="PERS_INFO_UTILIZ_CONSNT_YN" name="PERS_INFO_UTILIZ_CONSNT_YN" value="Y"> agree</label>
+    <label><input type="checkbox" id="ATTNT_CTNT_CONSNT_YN" name="ATTNT_CTNT_CONSNT_YN" value="Y"> agree</label>
+    <button type="button" id="reserInsertBtn">Reserve</button>
+  </form>
+</div>
+<script>
+{_SWAL_JS}
+const sel = id => document.getElementById(id);
+sel('reserInsertBtn').onclick = () => {{
+  if (!sel('PERS_INFO_UTILIZ_CONSNT_YN').checked || !sel('ATTNT_CTNT_CONSNT_YN').checked) {{
+    swal('개인정보 이용 및 주의사항에 동의해 주세요.'); return;
+  }}
+  if (!sel('RESER_APLY_TYPE_CD').value || !sel('SPACE_RESER_TTL').value) {{ swal('필수 항목을 입력해 주세요.'); return; }}
+  swal('예약하시겠습니까?', () => {{
+    const data = {{}};
+    for (const el of sel('reserForm').elements) {{
+      if (!el.name) continue;
+      if (el.type === 'checkbox') data[el.name] = el.checked ? 'Y' : 'N';
+      else if (el.tagName === 'SELECT' && el.id.startsWith('SPACE_RESER_')) data[el.name] = el.value.split(' ')[0];
+      else data[el.name] = el.value;
+    }}
+    post('{INSERT_PATH}', data).then(res => swal(res.msg || '오류가 발생했습니다.'));
+  }});
+}};
+</script>
+</body></html>"""
+
+def login_page():
+    return """<!DOCTYPE html><html><head><meta charset="utf-8"><title>nsso (mock)</title></head>
+<body><form method="post" action="/login">
+  <input type="password" id="login_pwd" name="pwd">
+  <button type="submit" id="loginProcBtn">Login</button>
+</form></body></html>"""
+
+# ---------- SERVER ----------
+class MockSSIMS:
+    """
+    In-process mock server.
+      latency_ms   added to every response (plus up to jitter_ms)
+      taken        {room: [(start_min, end_min), ...]} pre-booked for every date; [] = whole day
+      contention   probability that a free slot is grabbed by someone else at submit time
+      no_results   rooms whose search comes back empty
+      require_login  serve the nsso page until the session cookie is set
+      jquery       expose the $.datepicker API subset (False forces the month-walking path)
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=0, jitter_ms=0, taken=None,
+                 contention=0.0, no_results=(), require_login=False, datepicker_delay_ms=30, jquery=True,
+                 seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.contention = contention
+        self.no_results = set(no_results)
+        self.require_login = require_login
+        self.datepicker_delay_ms = datepicker_delay_ms
+        self.jquery = jquery
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.bookings = {}     # (space_code, date) -> [(start, end, title, mine)]
+        self.taken = dict(taken or {})
+        self.stats = {"requests": 0, "static": 0, "searches": 0, "inserts": 0, "success": 0, "duplicate": 0}
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    # --- slot state ---
+    def _day_bookings(self, sp, dt):
+        key = (sp, dt)
+        if key not in self.bookings:
+            room = sp[2:] if sp.startswith("SP") else sp
+            pre = []
+            if room in self.taken:
+                windows = self.taken[room] or [(7 * 60, 24 * 60)]
+                pre = [(s, e, "Booked", False) for s, e in windows]
+            self.bookings[key] = pre
+        return self.bookings[key]
+
+    def search(self, sp, dt):
+        with self.lock:
+            self.stats["searches"] += 1
+            room = sp[2:] if sp.startswith("SP") else sp
+            if not sp or not dt or room in self.no_results:
+                return {"available": False, "list": []}
+            return {"available": True, "list": [
+                {"start": _hhmm(s), "end": _hhmm(e), "title": t} for s, e, t, _ in self._day_bookings(sp, dt)
+            ]}
+
+    def insert(self, form):
+        sp, dt = form.get("SPACE_CD", ""), form.get("SPACE_RESER_USE_DT", "")
+        try:
+            start = int(form["SPACE_RESER_FR_T"]) * 60 + int(form["SPACE_RESER_FR_M"])
+            end = int(form["SPACE_RESER_TO_T"]) * 60 + int(form["SPACE_RESER_TO_M"])
+        except (KeyError, ValueError):
+            return {"result": "fail", "msg": "시간을 확인해 주세요."}
+        if end <= start:
+            return {"result": "fail", "msg": "시간을 확인해 주세요."}
+        if form.get("PERS_INFO_UTILIZ_CONSNT_YN") != "Y" or form.get("ATTNT_CTNT_CONSNT_YN") != "Y":
+            return {"result": "fail", "msg": "개인정보 이용 및 주의사항에 동의해 주세요."}
+        with self.lock:
+            self.stats["inserts"] += 1
+            day = self._day_bookings(sp, dt)
+            clash = any(s < end and start < e for s, e, _, _ in day)
+            if not clash and self.rng.random() < self.contention:
+                day.append((start, end, "Someone else", False))
+                clash = True
+            if clash:
+                self.stats["duplicate"] += 1
+                return {"result": "fail", "msg": DUPLICATE_MSG}
+            day.append((start, end, form.get("SPACE_RESER_TTL", ""), True))
+            self.stats["success"] += 1
+            return {"result": "success", "msg": SUCCESS_MSG}
+
+    def my_bookings(self):
+        with self.lock:
+            return [(sp, dt, _hhmm(s), _hhmm(e)) for (sp, dt), day in self.bookings.items()
+                    for s, e, _, mine in day if mine]
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _delay(self):
+                with mock.lock:
+                    mock.stats["requests"] += 1
+                    extra = mock.rng.random() * mock.jitter_ms
+                if mock.latency_ms or extra:
+                    time.sleep((mock.latency_ms + extra) / 1000.0)
+
+            def _send(self, code, body, ctype="text/html; charset=utf-8", headers=None):
+                data = body if isinstance(body, bytes) else body.encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(data)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(data)
+
+            def _logged_in(self):
+                return not mock.require_login or f"{SESSION_COOKIE}=" in (self.headers.get("Cookie") or "")
+
+            def _form(self):
+                n = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(n).decode("utf-8") if n else ""
+                return {k: v[0] for k, v in parse_qs(raw, keep_blank_values=True).items()}
+
+            def do_HEAD(self):
+                self.do_GET()
+
+            def do_GET(self):
+                self._delay()
+                u = urlparse(self.path)
+                if u.path in ("/", "/index.do") and not self._logged_in():
+                    return self._send(200, login_page())
+                if u.path in ("/", "/index.do"):
+                    return self._send(200, home_page(mock.datepicker_delay_ms, mock.jquery))
+                if u.path == "/reservation":
+                    if not self._logged_in():
+                        return self._send(200, login_page())
+                    q = {k: v[0] for k, v in parse_qs(u.query).items()}
+                    return self._send(200, form_page(q.get("bd", ""), q.get("sp", ""), q.get("dt", "")))
+                if u.path in STATIC:
+                    with mock.lock:
+                        mock.stats["static"] += 1
+                    ctype, data = STATIC[u.path]
+                    return self._send(200, data, ctype, {"Cache-Control": "no-store"})
+                if u.path == "/favicon.ico":
+                    return self._send(204, "")
+                return self._send(404, "not found", "text/plain")
+
+            def do_POST(self):
+                self._delay()
+                u = urlparse(self.path)
+                form = self._form()
+                if u.path == "/login":
+                    return self._send(302, "", headers={
+                        "Location": "/", "Set-Cookie": f"{SESSION_COOKIE}=mock{random.randrange(10**6)}; Path=/"})
+                if not self._logged_in():
+                    return self._send(401, login_page())
+                if u.path == SEARCH_PATH:
+                    res = mock.search(form.get("S_SPACE_CD", ""), form.get("S_SPACE_RESER_USE_DT", ""))
+                    return self._send(200, json.dumps(res, ensure_ascii=False), "application/json; charset=utf-8")
+                if u.path == INSERT_PATH:
+                    res = mock.insert(form)
+                    return self._send(200, json.dumps(res, ensure_ascii=False), "application/json; charset=utf-8")
+                return self._send(404, "not found", "text/plain")
+
+        return Handler
+
+def parse_taken(spec):
+    """'302,311@13:00-14:00' -> {"302": [], "311": [(780, 840)]}"""
+    taken = {}
+    for part in filter(None, (p.strip() for p in (spec or "").split(","))):
+        room, _, window = part.partition("@")
+        windows = taken.setdefault(room, [])
+        if window:
+            a, b = window.split("-")
+            windows.append((_minutes(a), _minutes(b)))
+    return taken
+
+def main():
+    ap = argparse.ArgumentParser(description="Local stand-in for SSIMS room booking")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=int, default=0, help="ms added to every response")
+    ap.add_argument("--jitter", type=int, default=0, help="up to this many extra ms per response")
+    ap.add_argument("--taken", default="", help="pre-booked rooms, e.g. 302,311@13:00-14:00")
+    ap.add_argument("--contention", type=float, default=0.0, help="chance a free slot is lost at submit")
+    ap.add_argument("--no-results", default="", help="rooms whose search is empty, e.g. 318")
+    ap.add_argument("--login", action="store_true", help="serve the nsso password page first")
+    ap.add_argument("--no-jquery", action="store_true", help="no $.datepicker API (month walking only)")
+    args = ap.parse_args()
+
+    mock = MockSSIMS(args.host, args.port, latency_ms=args.latency, jitter_ms=args.jitter,
+                     taken=parse_taken(args.taken), contention=args.contention,
+                     no_results=[r for r in args.no_results.split(",") if r], require_login=args.login,
+                     jquery=not args.no_jquery)
+    print(f"Mock SSIMS on {mock.url}  (Ctrl+C to stop)")
+    try:
+        mock.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mock.httpd.server_close()
+        print("bookings made:", mock.my_bookings())
+
+if __name__ == "__main__":
+    main()
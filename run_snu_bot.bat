@@ -1,4 +1,4 @@
 @echo off
 set "SNU_PW=Blackpink1!"
 cd /d C:\SNU_Booker
-"C:\Program Files\Python312\python.exe" "C:\SNU_Booker\snu_practice_room_bot.py" >> "C:\SNU_Booker\run.log" 2>&1
+"C:\Program Files\Python312\python.exe" -m snu_practice_room_bot >> "C:\SNU_Booker\run.log" 2>&1
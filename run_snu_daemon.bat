@@ -0,0 +1,3 @@
+@echo off
+cd /d C:\SNU_Booker
+"C:\Program Files\Python312\python.exe" "C:\SNU_Booker\snu_browser_daemon.py" >> "C:\SNU_Booker\daemon.log" 2>&1
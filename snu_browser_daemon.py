@@ -0,0 +1,126 @@
+# snu_browser_daemon.py
+# Keeps one Chrome with the bot's profile running on DAEMON_PORT so scheduled
+# runs can attach (ATTACH_TO_DAEMON = True) instead of cold-starting Chrome.
+#   - health check on /json/version every HEALTH_INTERVAL s; relaunch if Chrome died
+#   - every DAEMON_KEEPALIVE_SECONDS, fetch START_URL inside the SSIMS tab (CDP
+#     Runtime.evaluate) so the session cookies stay warm
+# Start it at logon (run_snu_daemon.bat) and leave it running.
+import json
+import os
+import subprocess
+import sys
+import time
+
+import requests
+import websocket
+
+from snu_practice_room_bot import (
+    DAEMON_KEEPALIVE_SECONDS, DAEMON_PORT, PROFILE_DIR, START_URL, find_chrome, log, now_kst,
+)
+
+HEALTH_INTERVAL = 10
+LAUNCH_WAIT = 30
+
+def ts():
+    return now_kst().strftime("%H:%M:%S")
+
+def devtools(path, timeout=2.0, method="GET"):
+    return requests.request(method, f"http://127.0.0.1:{DAEMON_PORT}{path}", timeout=timeout)
+
+def healthy():
+    try:
+        return "webSocketDebuggerUrl" in devtools("/json/version").json()
+    except Exception:
+        return False
+
+def launch():
+    chrome = find_chrome()
+    if not chrome:
+        raise FileNotFoundError("Chrome not found; set CHROME_BINARY in snu_practice_room_bot.py")
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    args = [
+        chrome,
+        f"--remote-debugging-port={DAEMON_PORT}",
+        f"--user-data-dir={PROFILE_DIR}",
+        "--profile-directory=Default",
+        "--start-maximized",
+        "--no-first-run",
+        "--no-default-browser-check",
+        "--disable-gpu",
+        START_URL,
+    ]
+    log(f"[daemon {ts()}] launching {chrome} on port {DAEMON_PORT}")
+    proc = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    end = time.time() + LAUNCH_WAIT
+    while time.time() < end:
+        if healthy():
+            log(f"[daemon {ts()}] browser up (pid {proc.pid})")
+            return proc
+        if proc.poll() is not None:
+            break
+        time.sleep(0.5)
+    raise RuntimeError("Chrome did not open its remote-debugging port")
+
+def ssims_tab():
+    """The page target showing SSIMS (opened if none)."""
+    host = START_URL.split("//", 1)[-1].split("/", 1)[0]
+    for t in devtools("/json/list").json():
+        if t.get("type") == "page" and host in t.get("url", ""):
+            return t
+    # /json/new must be PUT on current Chrome versions
+    return devtools(f"/json/new?{START_URL}", timeout=5, method="PUT").json()
+
+def keepalive():
+    """Fetch START_URL with the tab's cookies; report whether the session still looks logged in."""
+    tab = ssims_tab()
+    ws = websocket.create_connection(tab["webSocketDebuggerUrl"], timeout=15, suppress_origin=True)
+    try:
+        expr = ("fetch(%s, {credentials: 'include', cache: 'no-store'})"
+                ".then(r => r.text().then(t => r.status + ' ' + (t.indexOf('login_pwd') !== -1 ? 'login' : 'ok')))"
+                % json.dumps(START_URL))
+        ws.send(json.dumps({"id": 1, "method": "Runtime.evaluate",
+                            "params": {"expression": expr, "awaitPromise": True, "returnByValue": True}}))
+        while True:
+            msg = json.loads(ws.recv())
+            if msg.get("id") == 1:
+                return ((msg.get("result") or {}).get("result") or {}).get("value") or "no result"
+    finally:
+        ws.close()
+
+def main():
+    proc = None
+    if healthy():
+        log(f"[daemon {ts()}] a browser is already listening on port {DAEMON_PORT}; supervising it.")
+    else:
+        proc = launch()
+    last_keepalive = 0.0
+    try:
+        while True:
+            if not healthy() or (proc is not None and proc.poll() is not None):
+                log(f"[daemon {ts()}] browser not answering; relaunching.")
+                if proc is not None and proc.poll() is None:
+                    proc.kill()
+                try:
+                    proc = launch()
+                except Exception as e:
+                    log(f"[daemon {ts()}] relaunch failed: {e}")
+                    time.sleep(HEALTH_INTERVAL)
+                    continue
+                last_keepalive = 0.0
+            if time.time() - last_keepalive >= DAEMON_KEEPALIVE_SECONDS:
+                try:
+                    status = keepalive()
+                    log(f"[daemon {ts()}] keepalive: {status}"
+                        + (" (session expired; the next run will log in)" if status.endswith("login") else ""))
+                except Exception as e:
+                    log(f"[daemon {ts()}] keepalive failed: {e}")
+                last_keepalive = time.time()
+            time.sleep(HEALTH_INTERVAL)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if proc is not None and proc.poll() is None:
+            proc.terminate()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,617 @@
+# snu_cdp_driver.py
+# BROWSER_BACKEND = "cdp": a WebDriver look-alike that talks Chrome DevTools
+# Protocol directly over one websocket, without chromedriver.
+#   - CDPConnection is asyncio-native: commands are pipelined (sent without waiting
+#     for earlier replies, matched by id) and every event is pushed to listeners.
+#   - CDPDriver runs that connection on a background event loop and exposes the
+#     subset of the Selenium WebDriver / WebElement API the bot's helpers use
+#     (execute_script, execute_async_script, execute_cdp_cmd, get, window handles,
+#     switch_to, find_element, click / send_keys / ...), raising the same
+#     selenium.common.exceptions, so the helpers run unchanged on either backend.
+#   - Window handles, page loads and crashes come from pushed Target / Page /
+#     Inspector events, so e.g. waiting for a new window costs no round trips.
+#   - Limitation: the bot's helpers each wait for their answer before the next
+#     call (one execute_script per helper, most already do a whole step in one
+#     script), so pipelining only saves round trips inside the driver: switching
+#     to a new window (attach, then enables + activate in one batch) and a click
+#     (mouse press + release). The gain over chromedriver is mostly that each call
+#     is one websocket frame instead of an HTTP request relayed by chromedriver.
+import asyncio
+import itertools
+import json
+import os
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    JavascriptException,
+    NoSuchElementException,
+    NoSuchWindowException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+from wsproto import ConnectionType, WSConnection
+from wsproto.events import AcceptConnection, CloseConnection, Ping, RejectConnection, Request, TextMessage
+
+COMMAND_TIMEOUT = 30
+BROWSER = "browser"   # _pipeline: command for the browser endpoint, not the page session
+PAGE_LOAD_TIMEOUT = 300
+LAUNCH_TIMEOUT = 30
+
+class CDPError(Exception):
+    def __init__(self, method, error):
+        super().__init__(f"{method}: {error.get('message')} ({error.get('code')})")
+        self.method, self.code, self.message = method, error.get("code"), error.get("message", "")
+
+# ---------- ASYNCIO CONNECTION ----------
+class CDPConnection:
+    """
+    One DevTools websocket (the browser endpoint, with flat target sessions).
+    send() writes the frame and awaits its own reply; any number can be in flight.
+    on(method, callback) receives pushed events as callback(params, session_id).
+    """
+
+    def __init__(self):
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._listeners = defaultdict(list)
+        self._ws = WSConnection(ConnectionType.CLIENT)
+        self._reader = self._writer = self._task = None
+        self.closed = asyncio.Event()
+
+    async def connect(self, url):
+        parts = urlsplit(url)
+        self._reader, self._writer = await asyncio.open_connection(parts.hostname, parts.port)
+        self._writer.write(self._ws.send(Request(host=parts.netloc, target=parts.path)))
+        while True:
+            data = await self._reader.read(1 << 16)
+            if not data:
+                raise ConnectionError("DevTools closed the connection during the handshake")
+            self._ws.receive_data(data)
+            for event in self._ws.events():
+                if isinstance(event, AcceptConnection):
+                    self._task = asyncio.ensure_future(self._read_loop())
+                    return
+                if isinstance(event, RejectConnection):
+                    raise ConnectionError(f"DevTools refused the websocket (HTTP {event.status_code})")
+
+    def on(self, method, callback):
+        self._listeners[method].append(callback)
+
+    def off(self, method, callback):
+        if callback in self._listeners[method]:
+            self._listeners[method].remove(callback)
+
+    async def send(self, method, params=None, session_id=None, timeout=COMMAND_TIMEOUT):
+        if self.closed.is_set():
+            raise ConnectionError("chrome not reachable")
+        msg_id = next(self._ids)
+        msg = {"id": msg_id, "method": method, "params": params or {}}
+        if session_id:
+            msg["sessionId"] = session_id
+        fut = asyncio.get_running_loop().create_future()
+        self._pending[msg_id] = (method, fut)
+        self._writer.write(self._ws.send(TextMessage(data=json.dumps(msg))))
+        try:
+            return await asyncio.wait_for(fut, timeout)
+        finally:
+            self._pending.pop(msg_id, None)
+
+    def wait_event(self, method, predicate=None, session_id=None):
+        """Future for the next `method` event (on session_id) matching predicate(params)."""
+        fut = asyncio.get_running_loop().create_future()
+
+        def listener(params, sid):
+            if (session_id is None or sid == session_id) and (predicate is None or predicate(params)):
+                self.off(method, listener)
+                if not fut.done():
+                    fut.set_result(params)
+
+        self.on(method, listener)
+        fut.add_done_callback(lambda _: self.off(method, listener))
+        return fut
+
+    async def _read_loop(self):
+        parts = []
+        try:
+            while True:
+                data = await self._reader.read(1 << 16)
+                if not data:
+                    break
+                self._ws.receive_data(data)
+                for event in self._ws.events():
+                    if isinstance(event, TextMessage):
+                        parts.append(event.data)
+                        if event.message_finished:
+                            self._dispatch(json.loads("".join(parts)))
+                            parts = []
+                    elif isinstance(event, Ping):
+                        self._writer.write(self._ws.send(event.response()))
+                    elif isinstance(event, CloseConnection):
+                        return
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.closed.set()
+            for method, fut in list(self._pending.values()):
+                if not fut.done():
+                    fut.set_exception(ConnectionError("chrome not reachable"))
+
+    def _dispatch(self, msg):
+        if "id" in msg:
+            method, fut = self._pending.get(msg["id"], (None, None))
+            if fut is not None and not fut.done():
+                if "error" in msg:
+                    fut.set_exception(CDPError(method, msg["error"]))
+                else:
+                    fut.set_result(msg.get("result", {}))
+            return
+        for callback in list(self._listeners.get(msg.get("method"), ())):
+            callback(msg.get("params", {}), msg.get("sessionId"))
+
+    async def close(self):
+        if self._writer is not None:
+            try:
+                self._writer.write(self._ws.send(CloseConnection(code=1000)))
+                self._writer.close()
+            except Exception:
+                pass
+        if self._task is not None:
+            self._task.cancel()
+
+# ---------- SCRIPT BRIDGE ----------
+# Scripts run through Runtime.evaluate with returnByValue. DOM nodes cross the
+# boundary as {"__cdp_node__": n, "doc": token}: the page keeps them in
+# window.__cdpNodes, so a CDPElement is that index plus the document's token
+# (stale once the document is replaced).
+_BRIDGE_JS = """
+const reg = window.__cdpNodes || (window.__cdpNodes = []);
+const ids = window.__cdpIds || (window.__cdpIds = new WeakMap());
+const doc = window.__cdpDoc || (window.__cdpDoc = Math.random().toString(36).slice(2));
+const dec = v => {
+  if (!v || typeof v !== 'object') return v;
+  if ('__cdp_node__' in v) {
+    const n = v.doc === doc ? reg[v.__cdp_node__] : null;
+    if (!n || !n.isConnected) throw new Error('stale element reference');
+    return n;
+  }
+  return Array.isArray(v) ? v.map(dec) : Object.fromEntries(Object.entries(v).map(([k, x]) => [k, dec(x)]));
+};
+const enc = v => {
+  if (v instanceof Node) {
+    if (!ids.has(v)) ids.set(v, reg.push(v) - 1);
+    return {__cdp_node__: ids.get(v), doc};
+  }
+  if (Array.isArray(v) || v instanceof NodeList || v instanceof HTMLCollection) return Array.from(v, enc);
+  if (v && typeof v === 'object' && !(v instanceof Window))
+    return Object.fromEntries(Object.entries(v).map(([k, x]) => [k, enc(x)]));
+  return v === undefined ? null : v;
+};
+"""
+
+_SYNC_WRAPPER = "(() => {%s\nconst args = dec(%s);\nreturn enc(function () {\n%s\n}.apply(window, args));\n})()"
+
+_ASYNC_WRAPPER = ("(() => {%s\nconst args = dec(%s);\nreturn new Promise((resolve, reject) => {\n"
+                  "  args.push(v => { try { resolve(enc(v)); } catch (e) { reject(e); } });\n"
+                  "  try { (function () {\n%s\n}).apply(window, args); } catch (e) { reject(e); }\n"
+                  "});\n})()")
+
+def _encode_args(args):
+    def enc(v):
+        if isinstance(v, CDPElement):
+            return {"__cdp_node__": v._key, "doc": v._doc}
+        if isinstance(v, (list, tuple)):
+            return [enc(x) for x in v]
+        if isinstance(v, dict):
+            return {k: enc(x) for k, x in v.items()}
+        return v
+    return json.dumps(enc(list(args)))
+
+# ---------- ELEMENT ----------
+_BY_JS = {
+    "css selector": "root.querySelectorAll(sel)",
+    "id": "root.querySelectorAll('#' + CSS.escape(sel))",
+    "name": "root.querySelectorAll('[name=\"' + CSS.escape(sel) + '\"]')",
+    "tag name": "root.getElementsByTagName(sel)",
+    "xpath": ("(() => { const r = document.evaluate(sel, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);"
+              " return Array.from({length: r.snapshotLength}, (_, i) => r.snapshotItem(i)); })()"),
+}
+
+def _find_script(by, single):
+    if by not in _BY_JS:
+        raise WebDriverException(f"locator strategy not supported by the CDP backend: {by}")
+    pick = "found[0] || null" if single else "found"
+    return f"const root = arguments[0] || document, sel = arguments[1]; const found = Array.from({_BY_JS[by]}); return {pick};"
+
+class CDPElement:
+    """WebElement stand-in: a node index in the page's bridge registry."""
+
+    def __init__(self, driver, key, doc):
+        self._driver, self._key, self._doc = driver, key, doc
+
+    def __repr__(self):
+        return f"<CDPElement {self._key}>"
+
+    def _js(self, body, *args):
+        return self._driver.execute_script(body, self, *args)
+
+    @property
+    def tag_name(self):
+        return self._js("return arguments[0].tagName.toLowerCase();")
+
+    @property
+    def text(self):
+        return self._js("return (arguments[0].innerText || arguments[0].textContent || '').trim();")
+
+    def get_attribute(self, name):
+        return self._js("const e = arguments[0], n = arguments[1];"
+                        "const p = e[n]; if (p !== undefined && p !== null && typeof p !== 'object' && typeof p !== 'function')"
+                        " return typeof p === 'boolean' ? (p ? 'true' : null) : String(p);"
+                        "return e.getAttribute(n);", name)
+
+    def get_dom_attribute(self, name):
+        return self._js("return arguments[0].getAttribute(arguments[1]);", name)
+
+    def value_of_css_property(self, name):
+        return self._js("return getComputedStyle(arguments[0]).getPropertyValue(arguments[1]);", name)
+
+    def is_selected(self):
+        return bool(self._js("return !!(arguments[0].checked || arguments[0].selected);"))
+
+    def is_enabled(self):
+        return bool(self._js("return !arguments[0].disabled;"))
+
+    def is_displayed(self):
+        return bool(self._js("const e = arguments[0]; return !!((e.offsetWidth || e.offsetHeight || e.getClientRects().length)"
+                             " && getComputedStyle(e).visibility !== 'hidden');"))
+
+    def find_element(self, by, value):
+        el = self._driver.execute_script(_find_script(by, True), self, value)
+        if el is None:
+            raise NoSuchElementException(f"no element for {by}={value}")
+        return el
+
+    def find_elements(self, by, value):
+        return self._driver.execute_script(_find_script(by, False), self, value)
+
+    def click(self):
+        """Trusted mouse click at the element's centre (options are selected like chromedriver does)."""
+        spot = self._js("""
+const e = arguments[0];
+if (e.tagName === 'OPTION') {
+  const s = e.closest('select');
+  if (!e.selected) { e.selected = true; if (s) ['input', 'change'].forEach(t => s.dispatchEvent(new Event(t, {bubbles: true}))); }
+  return {done: true};
+}
+e.scrollIntoView({block: 'center', inline: 'center'});
+const r = e.getBoundingClientRect();
+const x = r.left + r.width / 2, y = r.top + r.height / 2;
+if (!r.width && !r.height) return {hidden: true};
+const hit = document.elementFromPoint(x, y);
+if (window !== window.top) { e.click(); return {done: true}; }
+return {x, y, covered: !!hit && hit !== e && !e.contains(hit) && !hit.contains(e),
+        by: hit ? hit.tagName + (hit.id ? '#' + hit.id : '') : ''};
+""")
+        if spot.get("done"):
+            return
+        if spot.get("hidden"):
+            raise WebDriverException("element not interactable")
+        if spot.get("covered"):
+            raise ElementClickInterceptedException(f"element click intercepted: {spot.get('by')} would receive the click")
+        base = {"x": spot["x"], "y": spot["y"], "button": "left", "clickCount": 1}
+        self._driver._pipeline([("Input.dispatchMouseEvent", dict(base, type="mousePressed")),
+                                ("Input.dispatchMouseEvent", dict(base, type="mouseReleased"))])
+
+    def clear(self):
+        self._js("const e = arguments[0]; e.focus(); e.value = '';"
+                 "['input', 'change'].forEach(t => e.dispatchEvent(new Event(t, {bubbles: true})));")
+
+    def send_keys(self, *value):
+        self._js("arguments[0].focus();")
+        self._driver.execute("Input.insertText", {"text": "".join(str(v) for v in value)})
+
+# ---------- DRIVER ----------
+class _SwitchTo:
+    def __init__(self, driver):
+        self._d = driver
+
+    def window(self, handle):
+        self._d._switch_window(handle)
+
+    def default_content(self):
+        self._d._context = None
+
+    def frame(self, element):
+        self._d._switch_frame(element)
+
+    def new_window(self, type_hint="tab"):
+        target = self._d._call(self._d._conn.send("Target.createTarget", {"url": "about:blank"}))["targetId"]
+        self._d._targets.setdefault(target, {"type": "page", "url": "about:blank"})
+        self._d._switch_window(target)
+
+class CDPDriver:
+    """Selenium-compatible driver over a raw DevTools connection (see the module header)."""
+
+    def __init__(self, ws_url, port, process=None):
+        self._port = port
+        self._process = process
+        self.service = SimpleNamespace(process=process)
+        self.capabilities = {"browserName": "chrome", "goog:chromeOptions": {"debuggerAddress": f"127.0.0.1:{port}"}}
+        self._script_timeout = 30.0
+        self._targets = {}      # targetId -> {"type", "url"}, insertion order = window order
+        self._sessions = {}     # targetId -> sessionId
+        self._crashed = set()   # sessionIds
+        self._contexts = defaultdict(dict)   # sessionId -> {frameId: default execution context id}
+        self._handle = None
+        self._context = None    # execution context of a switched-to frame (None = top document)
+        self.switch_to = _SwitchTo(self)
+
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, name="cdp-loop", daemon=True).start()
+        self._conn = CDPConnection()
+        self._call(self._conn.connect(ws_url), timeout=10)
+        self._conn.on("Target.targetCreated", self._on_target)
+        self._conn.on("Target.targetInfoChanged", self._on_target)
+        self._conn.on("Target.targetDestroyed", lambda p, _: self._targets.pop(p["targetId"], None))
+        self._conn.on("Target.detachedFromTarget", self._on_detached)
+        self._conn.on("Inspector.targetCrashed", lambda p, sid: self._crashed.add(sid))
+        self._conn.on("Runtime.executionContextCreated", self._on_context)
+        self._conn.on("Runtime.executionContextsCleared", lambda p, sid: self._contexts[sid].clear())
+        self._call(self._conn.send("Target.setDiscoverTargets", {"discover": True}))
+        pages = self.window_handles
+        if not pages:
+            self.switch_to.new_window("tab")
+        else:
+            self._switch_window(pages[0])
+
+    # --- construction ---
+    @classmethod
+    def launch(cls, chrome, args, profile_dir, timeout=LAUNCH_TIMEOUT):
+        """Start Chrome on a free debugging port (read back from DevToolsActivePort) and connect."""
+        port_file = os.path.join(profile_dir, "DevToolsActivePort")
+        try:
+            os.remove(port_file)
+        except OSError:
+            pass
+        proc = subprocess.Popen([chrome, "--remote-debugging-port=0", *args, "about:blank"],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        end = time.time() + timeout
+        while time.time() < end:
+            try:
+                with open(port_file, encoding="utf-8") as f:
+                    port, path = f.read().split("\n")[:2]
+                return cls(f"ws://127.0.0.1:{int(port)}{path}", int(port), proc)
+            except (OSError, ValueError):
+                pass
+            if proc.poll() is not None:
+                break
+            time.sleep(0.05)
+        proc.kill()
+        raise WebDriverException("Chrome did not open its remote-debugging port")
+
+    @classmethod
+    def attach(cls, port, timeout=2.0):
+        """Connect to a Chrome already listening on `port` (the warm-browser daemon)."""
+        import requests
+        info = requests.get(f"http://127.0.0.1:{port}/json/version", timeout=timeout).json()
+        return cls(info["webSocketDebuggerUrl"], port)
+
+    # --- event handlers (loop thread) ---
+    def _on_target(self, params, _):
+        info = params["targetInfo"]
+        self._targets[info["targetId"]] = {"type": info["type"], "url": info.get("url", "")}
+
+    def _on_detached(self, params, _):
+        target = params.get("targetId") or next((t for t, s in self._sessions.items() if s == params["sessionId"]), None)
+        self._sessions.pop(target, None)
+
+    def _on_context(self, params, sid):
+        ctx = params["context"]
+        aux = ctx.get("auxData") or {}
+        if aux.get("isDefault") and aux.get("frameId"):
+            self._contexts[sid][aux["frameId"]] = ctx["id"]
+
+    # --- plumbing ---
+    def _call(self, coro, timeout=None):
+        fut = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        try:
+            return fut.result(timeout)
+        except CDPError as e:
+            raise self._map_error(e) from e
+        except ConnectionError as e:
+            raise WebDriverException(f"chrome not reachable: {e}") from e
+        except (asyncio.TimeoutError, TimeoutError) as e:
+            fut.cancel()
+            raise TimeoutException("DevTools command timed out") from e
+
+    def _map_error(self, e):
+        msg = e.message.lower()
+        if "session" in msg and ("no session" in msg or "not found" in msg) or "no target" in msg:
+            return NoSuchWindowException(f"no such window: {e}")
+        if "context" in msg or "navigated" in msg or "destroyed" in msg:
+            return JavascriptException(f"javascript error: {e}")
+        return WebDriverException(str(e))
+
+    def _session(self):
+        sid = self._sessions.get(self._handle)
+        if sid is None:
+            raise NoSuchWindowException("no such window: target window already closed")
+        if sid in self._crashed:
+            raise WebDriverException("tab crashed")
+        return sid
+
+    def _pipeline(self, commands, session_id=None):
+        """
+        Send several commands at once; returns their results in order. Commands are
+        (method, params) on session_id (default: the current page) or
+        (method, params, BROWSER) for the browser endpoint. Chrome runs them in order.
+        """
+        sid = session_id or self._session()
+
+        async def run():
+            return await asyncio.gather(*(self._conn.send(c[0], c[1], None if c[2:] == (BROWSER,) else sid)
+                                          for c in commands))
+        return self._call(run())
+
+    def execute(self, method, params=None):
+        """One DevTools command on the current page; scripts, navigation helpers and elements all go through here."""
+        params = params or {}
+        timeout = self._script_timeout if params.get("awaitPromise") else COMMAND_TIMEOUT
+        return self._call(self._conn.send(method, params, self._session(), timeout=timeout), timeout + 1)
+
+    # --- windows ---
+    @property
+    def window_handles(self):
+        return [t for t, info in list(self._targets.items()) if info["type"] == "page"]
+
+    @property
+    def current_window_handle(self):
+        if self._handle not in self._targets:
+            raise NoSuchWindowException("no such window: target window already closed")
+        return self._handle
+
+    def _switch_window(self, handle):
+        if handle not in self._targets:
+            raise NoSuchWindowException(f"no such window: {handle}")
+        if handle not in self._sessions:
+            sid = self._call(self._conn.send("Target.attachToTarget", {"targetId": handle, "flatten": True}))["sessionId"]
+            self._sessions[handle] = sid
+            self._pipeline([("Page.enable", {}), ("Runtime.enable", {}), ("Inspector.enable", {}),
+                            ("Target.activateTarget", {"targetId": handle}, BROWSER)], sid)
+        else:
+            self._call(self._conn.send("Target.activateTarget", {"targetId": handle}))
+        self._handle, self._context = handle, None
+
+    def _switch_frame(self, element):
+        params = {"expression": f"window.__cdpDoc === {json.dumps(element._doc)} && window.__cdpNodes[{int(element._key)}]"}
+        if self._context is not None:
+            params["contextId"] = self._context
+        obj = self.execute("Runtime.evaluate", params)["result"]
+        if "objectId" not in obj:
+            raise StaleElementReferenceException("stale element reference: frame element is gone")
+        node = self.execute("DOM.describeNode", {"objectId": obj["objectId"]})["node"]
+        ctx = self._contexts[self._session()].get(node.get("frameId"))
+        if ctx is None:
+            raise NoSuchElementException("frame has no script context (cross-origin or not loaded)")
+        self._context = ctx
+
+    def close(self):
+        self._call(self._conn.send("Target.closeTarget", {"targetId": self.current_window_handle}))
+        self._targets.pop(self._handle, None)
+
+    # --- navigation ---
+    def get(self, url):
+        sid = self._session()
+        self._context = None
+
+        async def navigate():
+            loaded = self._conn.wait_event("Page.loadEventFired", session_id=sid)
+            try:
+                res = await self._conn.send("Page.navigate", {"url": url}, sid)
+                if res.get("errorText"):
+                    raise WebDriverException(f"unknown error: net::{res['errorText']} for {url}")
+                if res.get("loaderId"):
+                    await asyncio.wait_for(loaded, PAGE_LOAD_TIMEOUT)
+            finally:
+                loaded.cancel()
+        self._call(navigate())
+
+    @property
+    def current_url(self):
+        return self._evaluate("location.href", top=True)
+
+    @property
+    def page_source(self):
+        return self._evaluate("document.documentElement.outerHTML")
+
+    # --- scripts ---
+    def set_script_timeout(self, seconds):
+        self._script_timeout = float(seconds)
+
+    def _evaluate(self, expression, await_promise=False, top=False):
+        params = {"expression": expression, "returnByValue": True, "awaitPromise": await_promise}
+        if self._context is not None and not top:
+            params["contextId"] = self._context
+        res = self.execute("Runtime.evaluate", params)
+        if "exceptionDetails" in res:
+            details = res["exceptionDetails"]
+            text = (details.get("exception") or {}).get("description") or details.get("text", "")
+            if "stale element reference" in text:
+                raise StaleElementReferenceException("stale element reference: element is not attached to the page document")
+            raise JavascriptException(f"javascript error: {text}")
+        return self._wrap(res.get("result", {}).get("value"))
+
+    def _wrap(self, value):
+        if isinstance(value, dict):
+            if set(value) == {"__cdp_node__", "doc"}:
+                return CDPElement(self, value["__cdp_node__"], value["doc"])
+            return {k: self._wrap(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._wrap(v) for v in value]
+        return value
+
+    def execute_script(self, script, *args):
+        return self._evaluate(_SYNC_WRAPPER % (_BRIDGE_JS, _encode_args(args), script))
+
+    def execute_async_script(self, script, *args):
+        try:
+            return self._evaluate(_ASYNC_WRAPPER % (_BRIDGE_JS, _encode_args(args), script), await_promise=True)
+        except TimeoutException:
+            raise TimeoutException("script timeout") from None
+
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        return self.execute(cmd, cmd_args)
+
+    # --- elements / cookies ---
+    def find_element(self, by, value):
+        el = self.execute_script(_find_script(by, True), None, value)
+        if el is None:
+            raise NoSuchElementException(f"no element for {by}={value}")
+        return el
+
+    def find_elements(self, by, value):
+        return self.execute_script(_find_script(by, False), None, value)
+
+    def get_cookies(self):
+        cookies = self.execute("Network.getCookies", {}).get("cookies", [])
+        for c in cookies:
+            if c.get("expires", -1) > 0:
+                c["expiry"] = int(c["expires"])
+        return cookies
+
+    # --- async access ---
+    def on(self, method, callback):
+        """Push subscription to a DevTools event: callback(params, session_id) on the loop thread."""
+        self._loop.call_soon_threadsafe(self._conn.on, method, callback)
+
+    @property
+    def connection(self):
+        """The asyncio CDPConnection (use from coroutines on self.loop)."""
+        return self._conn
+
+    @property
+    def loop(self):
+        return self._loop
+
+    def quit(self):
+        try:
+            if self._process is not None:
+                self._call(self._conn.send("Browser.close"), timeout=5)
+        except Exception:
+            pass
+        try:
+            self._call(self._conn.close(), timeout=2)
+        except Exception:
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._process is not None:
+            try:
+                self._process.wait(5)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
@@ -0,0 +1,175 @@
+# snu_fleet.py
+# Book for several people at once: one snu_practice_room_bot.main() per account,
+# each in its own process with its own Chrome profile, password, times and rooms.
+#   python snu_fleet.py [accounts.json] [--workers 4]
+#
+# accounts.json (see accounts.example.json):
+#   [{"name": "minji",
+#     "profile_dir": "C:\\SNU_Booker\\profiles\\minji",    # default: PROFILES_ROOT\<name>
+#     "password_env": "SNU_PW_MINJI",                      # default: SNU_PW_<NAME>
+#     "time_config": {"1": ["13", "00", "14", "00"]},      # weekday -> (start h, start m, end h, end m)
+#                                                          #   or a flexible TIME_CONFIG dict
+#     "room_priority": {"1": ["302", "311", "318"]},
+#     "config": {"RESERVATION_TITLE": "Piano"}}]           # any other bot setting
+#
+# Accounts whose slots overlap on the same day never get the same room: rooms are
+# dealt out in file order, each account taking its next preferred room that no
+# overlapping account holds yet.
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+import snu_practice_room_bot as bot
+
+ACCOUNTS_FILE = "accounts.json"
+PROFILES_ROOT = r"C:\SNU_Booker\profiles"
+FLEET_WORKERS = 4
+RESULTS_FILE = "fleet_results.json"
+
+def load_accounts(path):
+    with open(path, encoding="utf-8") as f:
+        accounts = json.load(f)
+    names = set()
+    for acc in accounts:
+        name = acc["name"]
+        if name in names:
+            raise ValueError(f"duplicate account name '{name}'")
+        names.add(name)
+        acc.setdefault("profile_dir", os.path.join(PROFILES_ROOT, name))
+        acc.setdefault("password_env", f"SNU_PW_{name.upper()}")
+        acc["time_config"] = {int(k): v if isinstance(v, dict) else tuple(v)
+                              for k, v in (acc.get("time_config") or {}).items()}
+        acc["room_priority"] = {int(k): list(v) for k, v in (acc.get("room_priority") or {}).items()}
+    profiles = [os.path.normcase(os.path.abspath(a["profile_dir"])) for a in accounts]
+    if len(set(profiles)) != len(profiles):
+        raise ValueError("accounts must not share a profile_dir (Chrome locks it)")
+    return accounts
+
+def slot_minutes(acc, weekday):
+    """(start, end) the account may book on weekday; a flexible slot counts with its tolerance."""
+    entry = acc["time_config"].get(weekday) or bot.TIME_CONFIG.get(weekday, bot.DEFAULT_TIMES)
+    if not isinstance(entry, dict):
+        return bot.slot_window(entry)
+    start, end = bot.slot_window(entry["window"])
+    tolerance = int(entry.get("tolerance", 0))
+    return start - tolerance, end + tolerance
+
+def assign_rooms(accounts, weekday):
+    """
+    {name: rooms} for the day with no room shared by two accounts whose slots overlap.
+    Rounds in file order: each account takes its next preferred room that no
+    overlapping account has taken yet.
+    """
+    wanted = {a["name"]: list(a["room_priority"].get(weekday) or bot.ROOM_PRIORITY.get(weekday, [])) for a in accounts}
+    slots = {a["name"]: slot_minutes(a, weekday) for a in accounts}
+    rivals = {
+        a["name"]: [b["name"] for b in accounts if b is not a
+                    and slots[a["name"]][0] < slots[b["name"]][1] and slots[b["name"]][0] < slots[a["name"]][1]]
+        for a in accounts
+    }
+    assigned = {name: [] for name in wanted}
+    progress = True
+    while progress:
+        progress = False
+        for name, rooms in wanted.items():
+            while rooms:
+                room = rooms.pop(0)
+                if not any(room in assigned[r] for r in rivals[name]):
+                    assigned[name].append(room)
+                    progress = True
+                    break
+    return assigned
+
+def run_account(acc, rooms, weekday, log_dir, check=False):
+    """
+    Worker process: point the bot module at this account and run one booking
+    (check=True applies the settings and reports them without booking).
+    """
+    name = acc["name"]
+    out = open(os.path.join(log_dir, f"fleet_{name}.log"), "a", encoding="utf-8")
+    sys.stdout = sys.stderr = out
+    t0 = time.time()
+    try:
+        bot.PROFILE_DIR = acc["profile_dir"]
+        bot.TIME_CONFIG = {**bot.TIME_CONFIG, **acc["time_config"]}
+        bot.ROOM_PRIORITY = {**bot.ROOM_PRIORITY, weekday: rooms}
+        bot.TRACE_FILE = bot.TRACE_FILE and os.path.join(log_dir, f"run_timeline_{name}.jsonl")
+        bot.SESSION_CACHE_FILE = bot.SESSION_CACHE_FILE and os.path.join(
+            os.path.dirname(os.path.abspath(acc["profile_dir"])), f"session_cache_{name}.json")
+        bot.ATTACH_TO_DAEMON = "daemon_port" in acc
+        bot.DAEMON_PORT = acc.get("daemon_port", bot.DAEMON_PORT)
+        for key, value in (acc.get("config") or {}).items():
+            if not hasattr(bot, key):
+                raise ValueError(f"unknown setting {key}")
+            setattr(bot, key, value)
+        password = os.environ.get(acc["password_env"], "")
+        if password:
+            os.environ["SNU_PW"] = password
+        else:
+            os.environ.pop("SNU_PW", None)
+            bot.log(f"[fleet] {acc['password_env']} not set; the run only works if the profile is still logged in.")
+        bot.log(f"[fleet] account {name}: rooms {', '.join(rooms) or '-'}")
+        if not rooms:
+            outcome, room = "no_rooms", None
+        elif check:
+            bot.check_time_config()
+            bot.log(f"[fleet] account {name}: slot {bot.slot_spec(weekday)[0]}, profile {bot.PROFILE_DIR}")
+            outcome, room = "checked", None
+        else:
+            outcome, room = bot.main()
+    except SystemExit:
+        outcome, room = "skipped", None    # not a booking day for this account
+    except BaseException as e:
+        bot.log(f"[fleet] account {name} crashed: {e}")
+        outcome, room = f"error:{type(e).__name__}", None
+    finally:
+        out.flush()
+    return {"account": name, "outcome": outcome, "room": room, "rooms": rooms,
+            "seconds": round(time.time() - t0, 1)}
+
+def main():
+    ap = argparse.ArgumentParser(description="Run the booking bot for several accounts in parallel")
+    ap.add_argument("accounts", nargs="?", default=ACCOUNTS_FILE)
+    ap.add_argument("--workers", type=int, default=FLEET_WORKERS, help="max accounts running at once")
+    ap.add_argument("--log-dir", default=".")
+    ap.add_argument("--check", action="store_true",
+                    help="apply every account's settings in its worker and report them, without booking")
+    args = ap.parse_args()
+
+    accounts = load_accounts(args.accounts)
+    today = bot.next_release_kst() if bot.SCHEDULE_MODE else bot.now_kst()
+    weekday = (today + timedelta(days=bot.BOOK_AHEAD_DAYS)).weekday()   # the booked day's settings
+    assigned = assign_rooms(accounts, weekday)
+    for acc in accounts:
+        print(f"[fleet] {acc['name']}: slot {slot_minutes(acc, weekday)} rooms {assigned[acc['name']]}")
+    if len(accounts) > args.workers:
+        print(f"[fleet] {len(accounts)} accounts but {args.workers} workers: the rest start when one finishes.")
+
+    os.makedirs(args.log_dir, exist_ok=True)
+    # one process per account: a reused worker would keep the previous account's
+    # settings and the bot's session, space-code and occupancy caches
+    with ProcessPoolExecutor(max_workers=max(1, args.workers), max_tasks_per_child=1) as pool:
+        futures = [pool.submit(run_account, acc, assigned[acc["name"]], weekday, args.log_dir, args.check)
+                   for acc in accounts]
+        results = []
+        for acc, fut in zip(accounts, futures):
+            try:
+                results.append(fut.result())
+            except Exception as e:   # worker process died
+                results.append({"account": acc["name"], "outcome": f"error:{type(e).__name__}", "room": None,
+                                "rooms": assigned[acc["name"]], "seconds": None})
+
+    print()
+    print(f"{'account':<16}{'outcome':<14}{'room':<8}{'seconds':>8}")
+    for r in results:
+        print(f"{r['account']:<16}{r['outcome']:<14}{r['room'] or '-':<8}{r['seconds'] if r['seconds'] is not None else '-':>8}")
+    with open(os.path.join(args.log_dir, RESULTS_FILE), "w", encoding="utf-8") as f:
+        json.dump({"date": today.strftime("%Y-%m-%d"), "results": results}, f, indent=2, ensure_ascii=False)
+    return 0 if all(r["outcome"] in ("success", "skipped", "checked") for r in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+# snu_history.py
+# Run history in SQLite (HISTORY_DB of snu_practice_room_bot.py) and what it says
+# about the room order:  python snu_history.py [run_history.sqlite] [--weekday 1] [--runs 30]
+#
+# The bot stores every room it tried (or found gone in the pre-scan) with the
+# outcome and how long the attempt took. Per weekday and room that gives
+#   p    chance the room books (successes + 1) / (tries + 2)
+#   cost mean seconds an attempt on it takes, on one path: "ui" / "race" / "http"
+#        attempts time different things (full attempt, submit only, one request),
+#        so the path with the most timed attempts that weekday ranks every room
+# Rooms are tried until one books, so the expected time to a booking of an order
+# is sum_k P(first k-1 rooms failed) * p_k * (cost_1 + ... + cost_k), divided by
+# P(any room books). Sorting by p / cost (highest first) minimises it.
+import argparse
+import itertools
+import os
+import sqlite3
+import sys
+from collections import defaultdict
+
+MIN_RUNS = 5          # runs of a weekday before its learned order is used
+LAST_RUNS = 30        # only the most recent runs count (popularity shifts over a semester)
+DEFAULT_COST = 10.0   # seconds per attempt for a room never attempted
+COST_VIAS = ("ui", "race", "http")
+MAX_PERMUTED = 7      # the report ranks every ordering up to this many rooms
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run TEXT PRIMARY KEY, started TEXT, outcome TEXT, room TEXT
+);
+CREATE TABLE IF NOT EXISTS attempts (
+    run TEXT, seq INTEGER, weekday INTEGER, target_date TEXT, slot TEXT,
+    room TEXT, via TEXT, outcome TEXT, t REAL, seconds REAL,
+    PRIMARY KEY (run, seq)
+);
+CREATE INDEX IF NOT EXISTS attempts_weekday ON attempts (weekday, room);
+"""
+
+def connect(path):
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=10)
+    conn.executescript(_SCHEMA)
+    return conn
+
+def save_run(path, run, started, outcome, room, attempts):
+    """
+    One run and its attempts, in one transaction. attempts: dicts with weekday,
+    target_date, slot, room, via ("prescan" | "http" | "race" | "ui"),
+    outcome ("success" | "duplicate" | "fail" | "unknown" | "gone"), t (s since run start), seconds.
+    """
+    conn = connect(path)
+    try:
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?)", (run, started, outcome, room))
+            conn.execute("DELETE FROM attempts WHERE run = ?", (run,))
+            conn.executemany(
+                "INSERT INTO attempts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run, seq, a["weekday"], a["target_date"], a["slot"], a["room"], a["via"], a["outcome"],
+                  round(a["t"], 3), round(a["seconds"], 3)) for seq, a in enumerate(attempts)])
+    finally:
+        conn.close()
+
+def room_stats(conn, weekday, last_runs=LAST_RUNS):
+    """
+    ({room: {"tries", "wins", "gone", "p", "costs", "cost"}}, runs) over the weekday's
+    last `last_runs` runs. costs: mean seconds per via; cost: the one used for ranking.
+    """
+    runs = [r for (r,) in conn.execute(
+        "SELECT run FROM runs WHERE run IN (SELECT run FROM attempts WHERE weekday = ?) "
+        "ORDER BY started DESC LIMIT ?", (weekday, last_runs or -1))]
+    if not runs:
+        return {}, 0
+    rows = conn.execute(
+        f"SELECT room, via, outcome, seconds FROM attempts WHERE weekday = ? AND run IN ({','.join('?' * len(runs))})",
+        [weekday] + runs).fetchall()
+    stats = defaultdict(lambda: {"tries": 0, "wins": 0, "gone": 0, "times": defaultdict(list)})
+    for room, via, outcome, seconds in rows:
+        s = stats[room]
+        s["tries"] += 1
+        s["wins"] += outcome == "success"
+        if outcome == "gone":
+            s["gone"] += 1
+        elif via in COST_VIAS:
+            s["times"][via].append(seconds)
+    timed = {via: sum(len(s["times"][via]) for s in stats.values()) for via in COST_VIAS}
+    ranking_via = max(COST_VIAS, key=lambda via: timed[via])
+    for s in stats.values():
+        s["p"] = (s["wins"] + 1) / (s["tries"] + 2)
+        s["costs"] = {via: sum(t) / len(t) for via, t in s["times"].items() if t}
+        s["cost"] = s["costs"].get(ranking_via)
+        del s["times"]
+    return dict(stats), len(runs)
+
+def _filled(rooms, stats):
+    """Stats for every room in rooms; rooms without data get the prior and the typical cost."""
+    costs = sorted(s["cost"] for s in stats.values() if s["cost"])
+    typical = costs[len(costs) // 2] if costs else DEFAULT_COST
+    return {r: {"p": stats[r]["p"] if r in stats else 0.5,
+                "cost": (stats.get(r) or {}).get("cost") or typical} for r in rooms}
+
+def expected(order, stats):
+    """(P(some room books), expected seconds to the booking given it books) for trying rooms in order."""
+    filled = _filled(order, stats)
+    none_yet, elapsed, weighted = 1.0, 0.0, 0.0
+    for room in order:
+        s = filled[room]
+        elapsed += s["cost"]
+        weighted += none_yet * s["p"] * elapsed
+        none_yet *= 1 - s["p"]
+    p_ok = 1 - none_yet
+    return p_ok, (weighted / p_ok if p_ok else None)
+
+def best_order(rooms, stats):
+    """rooms by p / cost, highest first (configured order on ties)."""
+    filled = _filled(rooms, stats)
+    return sorted(rooms, key=lambda r: -filled[r]["p"] / filled[r]["cost"])
+
+def learned_order(path, weekday, rooms, min_runs=MIN_RUNS):
+    """
+    (order, (p, seconds) before, (p, seconds) after) for the bot; the configured
+    order and None, None while the weekday has fewer than min_runs runs.
+    """
+    if not os.path.exists(path):
+        return list(rooms), None, None
+    conn = connect(path)
+    try:
+        stats, n_runs = room_stats(conn, weekday)
+    finally:
+        conn.close()
+    if n_runs < min_runs:
+        return list(rooms), None, None
+    order = best_order(rooms, stats)
+    return order, expected(rooms, stats), expected(order, stats)
+
+def _fmt(p, seconds):
+    return f"p={p:.2f}  E[t]={seconds:.1f}s" if seconds is not None else f"p={p:.2f}  E[t]=-"
+
+def report(conn, weekday, rooms, last_runs, top):
+    stats, n_runs = room_stats(conn, weekday, last_runs)
+    if not stats:
+        return
+    names = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+    print(f"== {names[weekday]} ({n_runs} runs)")
+    print(f"{'room':<8}{'tries':>6}{'wins':>6}{'gone':>6}{'p':>7}" + "".join(f"{via + ' s':>8}" for via in COST_VIAS))
+    for room in sorted(stats, key=lambda r: -stats[r]["p"]):
+        s = stats[room]
+        costs = "".join(f"{s['costs'][via]:>8.1f}" if via in s["costs"] else f"{'-':>8}" for via in COST_VIAS)
+        print(f"{room:<8}{s['tries']:>6}{s['wins']:>6}{s['gone']:>6}{s['p']:>7.2f}{costs}")
+    rooms = rooms or sorted(stats)
+    print(f"configured {' '.join(rooms):<28}{_fmt(*expected(rooms, stats))}")
+    learned = best_order(rooms, stats)
+    print(f"learned    {' '.join(learned):<28}{_fmt(*expected(learned, stats))}")
+    if 1 < len(rooms) <= MAX_PERMUTED and top:
+        ranked = sorted(itertools.permutations(rooms), key=lambda o: expected(o, stats)[1] or float("inf"))
+        for i, order in enumerate(ranked[:top], start=1):
+            print(f"  #{i:<7} {' '.join(order):<28}{_fmt(*expected(order, stats))}")
+    print()
+
+def main():
+    ap = argparse.ArgumentParser(description="Per-room success rate and expected time to a booking per room order")
+    ap.add_argument("path", nargs="?", default="run_history.sqlite")
+    ap.add_argument("--weekday", type=int, action="append", help="0=Mon ... 6=Sun (default: all with history)")
+    ap.add_argument("--runs", type=int, default=LAST_RUNS, help="only the last N runs per weekday (0 = all)")
+    ap.add_argument("--rooms", help='order to evaluate, e.g. "302,311,318" (default: ROOM_PRIORITY)')
+    ap.add_argument("--top", type=int, default=3, help="also list the N best orderings (0 = off)")
+    args = ap.parse_args()
+
+    if not os.path.exists(args.path):
+        print(f"No history at {args.path}")
+        sys.exit(1)
+    conn = connect(args.path)
+    try:
+        weekdays = args.weekday or [w for (w,) in conn.execute("SELECT DISTINCT weekday FROM attempts ORDER BY weekday")]
+        n_runs, outcomes = 0, defaultdict(int)
+        for outcome, n in conn.execute("SELECT outcome, COUNT(*) FROM runs GROUP BY outcome"):
+            outcomes[outcome] += n
+            n_runs += n
+        print(f"{n_runs} runs: " + ", ".join(f"{k}={v}" for k, v in sorted(outcomes.items())))
+        print()
+        for weekday in weekdays:
+            if args.rooms:
+                rooms = args.rooms.split(",")
+            else:
+                try:
+                    import snu_practice_room_bot as bot
+                    rooms = list(bot.ROOM_PRIORITY.get(weekday, []))
+                except Exception:
+                    rooms = []
+            report(conn, weekday, rooms, args.runs, args.top)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
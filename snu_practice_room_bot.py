@@ -1,9 +1,23 @@
 # snu_practice_room_bot.py
 from datetime import datetime, timedelta, timezone
 import time
+_STARTUP = {"module": time.perf_counter()}   # --startup-benchmark marks (perf_counter)
 import os
 import sys
 import random
+import json
+import base64
+import bisect
+import functools
+import glob
+import gzip
+import importlib.util
+import queue
+import re
+import shutil
+import subprocess
+import threading
+from contextlib import contextmanager
 
 # --- Make stdout/stderr UTF-8 and never crash on weird chars ---
 try:
@@ -12,16 +26,29 @@ try:
 except Exception:
     pass
 
-from selenium import webdriver
+def _lazy_import(name):
+    """The module, executed only on first attribute access (keeps start-up light)."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
 from selenium.common.exceptions import (
     WebDriverException,
     StaleElementReferenceException,
     NoSuchElementException,
+    TimeoutException,
+    JavascriptException,
 )
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait, Select
-from selenium.webdriver.support import expected_conditions as EC
+# selenium.webdriver, requests and websocket take most of the import time and are
+# not needed until the browser or the first HTTP request starts.
+webdriver = _lazy_import("selenium.webdriver")
+requests = _lazy_import("requests")
+websocket = _lazy_import("websocket")
 
 # ---------- CONFIG ----------
 PROFILE_DIR = r"C:\SNU_Booker\chrome_snu_profile"
@@ -31,15 +58,181 @@ START_URL = "https://ssims.snu.ac.kr/"
 BOOK_DAYS = {0, 1, 2, 3, 4}
 
 CLICK_PAUSE = 1.5
+PARANOID_WAITS = False   # True = keep the old fixed sleeps after every interaction
+SETTLE_QUIET_MS = 120    # DOM quiet time that counts as "settled"
+SCRIPT_TIMEOUT = 60      # upper bound for in-page (async script) waits
+PROBE_INTERVAL = 0.05    # polling loops: max pause between page-state probes
 CALENDAR_WAIT = 20
 RES_BUTTON_WAIT = 4
 FORM_WAIT = 10
 DEBUG = True
+# Debug artifacts (JPEG screenshot + gzipped HTML) are captured and written by
+# background threads into DEBUG_DIR, which is trimmed to the caps below after every write.
+# DEBUG_CAPTURE = "on_fail" keeps the latest failure page in memory and saves it as one
+# DOM snapshot (plus the list of failure points) only if the run ends without a booking.
+DEBUG_CAPTURE = "always"    # "always" | "on_fail"
+DEBUG_DIR = "debug_artifacts"
+DEBUG_JPEG_QUALITY = 60
+DEBUG_MAX_FILES = 60
+DEBUG_MAX_MB = 50
+DEBUG_MAX_AGE_HOURS = 72
+FAST_DATEPICKER = True   # set the date via the widget API in one call; month walking is the fallback
+BULK_FORM_FILL = True    # fill the whole reservation form in one call; per-field entry only for fields that did not stick
+TRACE_FILE = "run_timeline.jsonl"   # per-phase spans of every run ("" = off); see snu_run_report.py
 
 # Optional: auto-fill these ONLY if blank
 OPTIONAL_PHONE = ""        # e.g. "01012345678"
 OPTIONAL_EMAIL = ""        # e.g. "you@snu.ac.kr"
 
+# Reservation text (same for both engines)
+RESERVATION_TITLE = "Vocal Music"
+RESERVATION_CONTENT = "Practicing Vocal Music"
+PURPOSE_OTHERS = "RV14000099"
+DUPLICATE_MSG = "예약이 중복되었습니다"
+NET_RESULT = True        # classify the submit from the insert response (CDP Network events); popups are only cross-checked
+NET_REQUEST_WAIT = 2.0   # after the confirm prompt, how long to wait for the insert request to go out
+SWAL_CROSSCHECK_WAIT = 1.0
+IN_PLACE_RETRY = True   # after a duplicate, switch the room on the filled form and resubmit (no go_home)
+
+# ---------- HTTP ENGINE CONFIG ----------
+# When True, rooms are first tried by replaying the search / reservation-insert
+# requests over a keep-alive HTTP session (cookies taken from the logged-in Chrome).
+# Any room the HTTP engine cannot settle falls back to the Selenium UI path.
+HTTP_ENGINE = False
+HTTP_BASE_URL = START_URL.rstrip("/")          # point at a local stand-in server for testing
+HTTP_SEARCH_PATH = "/resv/space/selectSpaceReserList.do"
+HTTP_INSERT_PATH = "/resv/space/insertSpaceReser.do"
+HTTP_TIMEOUT = 5
+HTTP_POOL_SIZE = 4
+HTTP_DATE_FORMAT = "%Y-%m-%d"
+HTTP_BUILDING_CODE = ""    # S_BD_CD value; discovered from the filter list if blank
+HTTP_SPACE_CODES = {}      # room code -> S_SPACE_CD value, e.g. {"311": "..."}; discovered if missing
+
+# ---------- LEAN BROWSER ----------
+# LEAN_BROWSER launches Chrome headless with background services off and blocks
+# sub-resources the booking flow never reads (images, fonts, trackers) via CDP
+# Network.setBlockedURLs. HEADLESS alone only hides the window.
+LEAN_BROWSER = False
+HEADLESS = False
+LEAN_CHROME_ARGS = [
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-extensions",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-features=Translate,OptimizationHints,MediaRouter",
+    "--metrics-recording-only",
+    "--no-pings",
+    "--mute-audio",
+    "--blink-settings=imagesEnabled=false",
+]
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*facebook.net*", "*wcs.naver.net*", "*hotjar.com*",
+]
+
+# ---------- WARM BROWSER DAEMON ----------
+# snu_browser_daemon.py keeps one Chrome (PROFILE_DIR) alive on DAEMON_PORT.
+# With ATTACH_TO_DAEMON, runs attach to it instead of launching Chrome; if the
+# daemon is not answering, build_driver launches Chrome as before.
+ATTACH_TO_DAEMON = False
+DAEMON_PORT = 9222
+DAEMON_KEEPALIVE_SECONDS = 240   # how often the daemon touches START_URL to keep the session warm
+CHROME_BINARY = ""               # blank = auto-detect (used by the daemon)
+
+# ---------- DRIVER CACHE ----------
+# Chrome + chromedriver paths are resolved once (Selenium Manager) and cached with
+# their versions and file stamps; later launches pass them to webdriver.Chrome
+# directly, so Selenium Manager (which may go to the network) does not run.
+# A changed file triggers a version check and, on a major-version mismatch, a new
+# resolution.  python snu_practice_room_bot.py --startup-benchmark prints the time
+# from process start to the first page load, then exits without booking.
+DRIVER_CACHE_FILE = r"C:\SNU_Booker\driver_cache.json"   # "" = resolve on every launch
+CHROMEDRIVER_PATH = ""           # explicit chromedriver (used with CHROME_BINARY); blank = resolve + cache
+
+# ---------- BROWSER BACKEND ----------
+# "selenium": chromedriver + WebDriver (default).
+# "cdp": snu_cdp_driver.CDPDriver talks to Chrome's DevTools socket directly over
+# asyncio (no chromedriver process, no HTTP hop per command; commands pipelined,
+# page loads / new windows / crashes pushed as events). It implements the part of
+# the WebDriver API the helpers below use, so they run unchanged on either backend.
+BROWSER_BACKEND = "selenium"
+
+# ---------- SESSION CACHE ----------
+# After a good run the SSIMS/nsso cookies and the filter state (page URL, language,
+# building) are saved here. The next run checks them with one HTTP request; if the
+# session is still live they are injected into Chrome and login / English /
+# building are skipped. A stale cache is deleted and the run logs in as usual.
+SESSION_CACHE_FILE = r"C:\SNU_Booker\session_cache.json"   # "" = off; holds session cookies, keep private
+SESSION_CACHE_MAX_AGE = 12 * 3600   # seconds; older caches are not even checked
+SESSION_CHECK_TIMEOUT = 3
+SESSION_COOKIE_DOMAINS = ("snu.ac.kr",)   # cookies kept besides START_URL's host
+
+# ---------- HOT SPARE ----------
+# With SPARE_DRIVER, a second Chrome (own profile; Chrome locks a profile to one
+# process) is launched in the background once the first submit has its answer
+# (never during the release-time attempt), gets this session's cookies and parks
+# on the filtered home view. When the working browser crashes the bot switches to
+# the spare instead of launching and logging in again, and warms a new spare after
+# its next submit.
+SPARE_DRIVER = False
+SPARE_PROFILE_DIR = ""   # blank = PROFILE_DIR + "_spare"
+SPARE_WAIT = 30          # seconds a crash waits for a spare that is still warming up
+
+# ---------- RELEASE SCHEDULER CONFIG ----------
+# When True, main() does all the slow preparation (launch, login, filters, date,
+# filled form) before RELEASE_TIME and fires #reserInsertBtn at the release instant,
+# measured on the SSIMS server clock rather than the host clock.
+SCHEDULE_MODE = False
+RELEASE_TIME = (1, 0, 0)   # KST (hour, minute, second) when the new day opens
+PREP_LEAD_SECONDS = 150    # start preparing this long before release
+CLOCK_SAMPLES = 8          # HTTP Date samples for the server clock offset
+
+# ---------- MULTI-ROOM RACE ----------
+# Stage this many rooms from ROOM_PRIORITY in parallel tabs before submitting
+# (0/1 = off, rooms are tried one at a time as before).
+RACE_ROOMS = 0
+
+# ---------- AVAILABILITY PRE-SCAN ----------
+# Before the first attempt, search every room in ROOM_SELECTORS concurrently over
+# HTTP (the same request the calendar renders from) and drop rooms whose
+# TIME_CONFIG slot is already booked. Rooms whose answer cannot be read are kept.
+PRESCAN = False
+PRESCAN_TTL = 30       # seconds a room's scan result is reused
+PRESCAN_WORKERS = 6
+
+# ---------- BATCH JOBS ----------
+# Book several slots in one session: (date, start, end, rooms or None) per job;
+# None = ROOM_PRIORITY of that date's weekday. When set, main() runs these
+# instead of the single today + BOOK_AHEAD_DAYS booking. A date opens for booking
+# at RELEASE_TIME, BOOK_AHEAD_DAYS before it; jobs are run most recently opened first.
+BOOKING_JOBS = [
+    # ("2025-09-16", "13:00", "14:00", ["302", "311"]),
+    # ("2025-09-16", "19:00", "20:00", None),
+]
+BOOK_AHEAD_DAYS = 7
+
+# ---------- CANCELLATION WATCH ----------
+# Targets for snu_watcher.py, same format as BOOKING_JOBS. Empty = every BOOK_DAYS
+# date that is already open (today up to BOOK_AHEAD_DAYS ahead) with its
+# TIME_CONFIG slot and ROOM_PRIORITY rooms.
+WATCH_TARGETS = [
+    # ("2025-09-18", "19:00", "21:00", ["302", "311"]),
+]
+
+# ---------- RUN HISTORY ----------
+# Every run stores each room it tried (HTTP, race or UI) or found gone in the
+# pre-scan, with outcome and attempt time, in HISTORY_DB (SQLite, "" = off).
+# python snu_history.py shows per weekday how often each room books, what an
+# attempt costs, and the expected time to a booking of the configured order vs
+# the best one. LEARNED_PRIORITY tries ROOM_PRIORITY[weekday] in that best order
+# once the weekday has HISTORY_MIN_RUNS runs (same rooms, only the order changes).
+HISTORY_DB = "run_history.sqlite"
+LEARNED_PRIORITY = False
+HISTORY_MIN_RUNS = 5
+
 # ---------- TIMEZONE: use Korea time regardless of host PC ----------
 KST = timezone(timedelta(hours=9))
 def now_kst():
@@ -47,6 +240,12 @@ def now_kst():
 
 # ---------- TIME CONFIG (per weekday) ----------
 # 0=Mon ... 6=Sun   ->  (start_hour, start_min, end_hour, end_min)
+# or a flexible slot: {"window": (start_hour, start_min, end_hour, end_min),
+#                      "min_minutes": 60, "tolerance": 30}
+# "window" is the preferred slot; the booking may reach up to "tolerance" minutes
+# before or after it and be as short as "min_minutes" (never longer than the
+# window). The free slot closest to the window (then longest, then by
+# ROOM_PRIORITY) is picked from the calendar occupancy of the rooms and booked.
 TIME_CONFIG = {
     0: ("19", "00", "20", "00"),  # Mon
     1: ("13", "00", "14", "00"),  # Tue
@@ -59,6 +258,67 @@ TIME_CONFIG = {
 }
 DEFAULT_TIMES = ("07", "00", "08", "00")
 
+SLOT_STEP = 10   # minutes; the form's minute lists go in steps of 10
+
+_JOB = {}    # active batch job: {"times": (start_hour, start_min, end_hour, end_min)}
+_PICK = {}   # flexible slot picked for the room being tried: {"room", "times"}
+
+def slot_window(times):
+    """(start_hour, start_min, end_hour, end_min) -> (start, end) in minutes since midnight."""
+    sh, sm, eh, em = (int(x) for x in times)
+    return sh * 60 + sm, eh * 60 + em
+
+def slot_spec(weekday):
+    """
+    The slot wanted on weekday: (preferred times, min_minutes, tolerance).
+    The active batch job's times are exact; so is a plain TIME_CONFIG tuple.
+    """
+    entry = _JOB.get("times") or TIME_CONFIG.get(weekday, DEFAULT_TIMES)
+    if not isinstance(entry, dict):
+        start, end = slot_window(entry)
+        return tuple(entry), end - start, 0
+    start, end = slot_window(entry["window"])
+    return tuple(entry["window"]), int(entry.get("min_minutes") or end - start), int(entry.get("tolerance", 0))
+
+def check_time_config():
+    """Raise ValueError for a flexible TIME_CONFIG entry that can never give a slot."""
+    for weekday, entry in TIME_CONFIG.items():
+        if not isinstance(entry, dict):
+            continue
+        start, end = slot_window(entry["window"])
+        min_minutes = int(entry.get("min_minutes") or end - start)
+        if min_minutes > end - start:
+            raise ValueError(f"TIME_CONFIG[{weekday}]: min_minutes {min_minutes} is longer than the "
+                             f"{end - start}-minute window")
+        if not slot_candidates(tuple(entry["window"]), min_minutes, int(entry.get("tolerance", 0))):
+            raise ValueError(f"TIME_CONFIG[{weekday}]: no {SLOT_STEP}-minute aligned slot fits the window")
+
+def slot_is_flexible(weekday):
+    times, min_minutes, tolerance = slot_spec(weekday)
+    start, end = slot_window(times)
+    return tolerance > 0 or min_minutes < end - start
+
+def slot_times(weekday):
+    """(start_hour, start_min, end_hour, end_min) to book: the picked flexible slot, else the preferred one."""
+    return _PICK.get("times") or slot_spec(weekday)[0]
+
+@contextmanager
+def job_times(times, record=True):
+    """
+    Book with exact times (start_hour, start_min, end_hour, end_min) inside the block;
+    None keeps TIME_CONFIG (flexible entries included). record=False drops the room
+    attempts made inside from the run history.
+    """
+    n = len(_HISTORY)
+    if times:
+        _JOB["times"] = tuple(times)
+    try:
+        yield
+    finally:
+        _JOB.clear()
+        if not record:
+            del _HISTORY[n:]
+
 # ---------- ROOM PRIORITY (per weekday) ----------
 ROOM_PRIORITY = {
     0: ["311", "302", "318", "303", "305", "304"],  # Mon
@@ -79,22 +339,210 @@ ROOM_SELECTORS = {
     "305": "#S_SPACE_CD > ul > li:nth-child(11)",
 }
 
+# ---------- DRIVER RESOLUTION ----------
+_DRIVER_PATHS = {}
+
+def _file_stamp(path):
+    st = os.stat(path)
+    return [st.st_size, int(st.st_mtime)]
+
+def _major(version):
+    return (version or "").split(".", 1)[0]
+
+def binary_version(path):
+    """Version string of chromedriver or Chrome ("" if unknown). Never starts a browser window."""
+    if os.name == "nt" and not os.path.basename(path).lower().startswith("chromedriver"):
+        # chrome.exe --version opens a window; the install keeps a folder per version next to it
+        folder = os.path.dirname(path)
+        versions = [d for d in os.listdir(folder) if re.fullmatch(r"\d+\.\d+\.\d+\.\d+", d)]
+        return max(versions, key=lambda v: [int(x) for x in v.split(".")], default="")
+    try:
+        out = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    m = re.search(r"\d+\.\d+\.\d+\.\d+", out)
+    return m.group(0) if m else ""
+
+def _load_driver_cache():
+    try:
+        with open(DRIVER_CACHE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _cache_still_valid(cache):
+    """
+    Both files unchanged (stat only), or changed but still the same major version.
+    A version that cannot be read counts as a mismatch.
+    """
+    try:
+        stamps = [_file_stamp(cache["chrome"]), _file_stamp(cache["driver"])]
+    except (KeyError, OSError):
+        return False
+    if stamps == [cache.get("chrome_stamp"), cache.get("driver_stamp")]:
+        return True
+    chrome_major, driver_major = _major(binary_version(cache["chrome"])), _major(binary_version(cache["driver"]))
+    if not chrome_major or chrome_major != driver_major:
+        return False
+    cache["chrome_stamp"], cache["driver_stamp"] = stamps
+    return True
+
+def _resolve_with_selenium_manager():
+    from selenium.webdriver.common.selenium_manager import SeleniumManager
+    args = ["--browser", "chrome"]
+    if CHROME_BINARY:
+        args += ["--browser-path", CHROME_BINARY]
+    out = SeleniumManager().binary_paths(args)
+    return out["browser_path"], out["driver_path"]
+
+def resolve_browser():
+    """
+    (chrome path, chromedriver path) for webdriver.Chrome, from CHROMEDRIVER_PATH,
+    the in-process result, DRIVER_CACHE_FILE or a fresh Selenium Manager run (cached).
+    (None, None) = could not resolve; Selenium Manager gets its usual turn at launch.
+    """
+    if CHROMEDRIVER_PATH:
+        return CHROME_BINARY or None, CHROMEDRIVER_PATH
+    if _DRIVER_PATHS:
+        return _DRIVER_PATHS["chrome"], _DRIVER_PATHS["driver"]
+    if not DRIVER_CACHE_FILE:
+        return None, None
+    cache = _load_driver_cache()
+    stamps = [cache.get("chrome_stamp"), cache.get("driver_stamp")]
+    if not (cache and (not CHROME_BINARY or cache.get("chrome") == CHROME_BINARY) and _cache_still_valid(cache)):
+        t0 = time.perf_counter()
+        try:
+            chrome, driver = _resolve_with_selenium_manager()
+        except Exception as e:
+            log(f"[driver] could not resolve chromedriver: {e}")
+            return None, None
+        cache = {"chrome": chrome, "driver": driver,
+                 "chrome_version": binary_version(chrome), "driver_version": binary_version(driver),
+                 "chrome_stamp": _file_stamp(chrome), "driver_stamp": _file_stamp(driver)}
+        log(f"[driver] resolved Chrome {cache['chrome_version'] or '?'} / chromedriver "
+            f"{cache['driver_version'] or '?'} in {(time.perf_counter() - t0) * 1000:.0f} ms; cached.")
+    if [cache["chrome_stamp"], cache["driver_stamp"]] != stamps:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(DRIVER_CACHE_FILE)), exist_ok=True)
+            with open(DRIVER_CACHE_FILE, "w", encoding="utf-8") as f:
+                json.dump(cache, f, indent=2)
+        except OSError as e:
+            log(f"[driver] could not write {DRIVER_CACHE_FILE}: {e}")
+    _DRIVER_PATHS.update(chrome=cache["chrome"], driver=cache["driver"])
+    return cache["chrome"], cache["driver"]
+
+_CHROME_CANDIDATES = [
+    r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+    r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+    os.path.expandvars(r"%LOCALAPPDATA%\Google\Chrome\Application\chrome.exe"),
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+]
+
+def find_chrome():
+    """
+    Chrome binary alone, without Selenium Manager (the CDP backend and the daemon
+    need no chromedriver): CHROME_BINARY, the driver cache, the usual install paths,
+    PATH, then Selenium's download cache. "" if none.
+    """
+    if CHROME_BINARY:
+        return CHROME_BINARY
+    cached = _DRIVER_PATHS.get("chrome") or (_load_driver_cache().get("chrome") if DRIVER_CACHE_FILE else None)
+    if cached and os.path.isfile(cached):
+        return cached
+    for path in _CHROME_CANDIDATES:
+        if os.path.isfile(path):
+            return path
+    for name in ("chrome", "google-chrome", "google-chrome-stable", "chromium", "chromium-browser"):
+        found = shutil.which(name)
+        if found:
+            return found
+    downloaded = glob.glob(os.path.expanduser("~/.cache/selenium/chrome/*/*/chrome*"))
+    return sorted(downloaded)[-1] if downloaded else ""
+
+def chrome_service():
+    """webdriver.ChromeService on the resolved chromedriver (Selenium Manager is skipped when known)."""
+    _, driver_path = resolve_browser()
+    return webdriver.ChromeService(executable_path=driver_path) if driver_path else webdriver.ChromeService()
+
 # ---------- BROWSER ----------
-def build_driver(headless=False):
-    options = webdriver.ChromeOptions()
-    options.add_argument(f"--user-data-dir={PROFILE_DIR}")
-    options.add_argument("--profile-directory=Default")
-    options.add_argument("--start-maximized")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--no-first-run")
-    options.add_argument("--no-default-browser-check")
+def daemon_alive(port=None, timeout=1.0):
+    """True if a Chrome is answering on the daemon's remote-debugging port."""
+    try:
+        r = requests.get(f"http://127.0.0.1:{port or DAEMON_PORT}/json/version", timeout=timeout)
+        return r.status_code == 200 and "webSocketDebuggerUrl" in r.json()
+    except Exception:
+        return False
+
+def attach_driver(port=None):
+    """Driver session on the daemon's already-running Chrome (no launch, no profile load)."""
+    if BROWSER_BACKEND == "cdp":
+        from snu_cdp_driver import CDPDriver
+        driver = CDPDriver.attach(port or DAEMON_PORT)
+    else:
+        options = webdriver.ChromeOptions()
+        options.debugger_address = f"127.0.0.1:{port or DAEMON_PORT}"
+        driver = webdriver.Chrome(options=options, service=chrome_service())
+    driver.set_script_timeout(SCRIPT_TIMEOUT)
+    return driver
+
+def lean_tab(driver):
+    """Per-tab part of LEAN_BROWSER (CDP settings apply to the current target only)."""
+    if not LEAN_BROWSER:
+        return
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+        ua = driver.execute_script("return navigator.userAgent;")
+        if "HeadlessChrome" in ua:
+            driver.execute_cdp_cmd("Network.setUserAgentOverride", {"userAgent": ua.replace("HeadlessChrome", "Chrome")})
+    except Exception as e:
+        log(f"[lean] could not set up resource blocking: {e}")
+
+def chrome_args(profile_dir, headless):
+    """Command-line switches for a bot-launched Chrome (both backends)."""
+    args = [
+        f"--user-data-dir={profile_dir}",
+        "--profile-directory=Default",
+        "--start-maximized",
+        "--disable-gpu",
+        "--no-sandbox",
+        "--disable-dev-shm-usage",
+        "--no-first-run",
+        "--no-default-browser-check",
+    ]
+    if LEAN_BROWSER:
+        args += LEAN_CHROME_ARGS
     if headless:
-        options.add_argument("--headless=new")
-        options.add_argument("--window-size=1920,1080")
-    # Use Selenium Manager (built-in)
-    return webdriver.Chrome(options=options)
+        args += ["--headless=new", "--window-size=1920,1080"]
+    return args
+
+def build_driver(headless=None, profile_dir=None):
+    """New Chrome session on PROFILE_DIR (or attached to the daemon); profile_dir = a separate browser."""
+    headless = (HEADLESS or LEAN_BROWSER) if headless is None else headless
+    if ATTACH_TO_DAEMON and profile_dir is None:
+        if daemon_alive():
+            log(f"-> Attaching to warm browser on port {DAEMON_PORT}")
+            driver = attach_driver()
+            lean_tab(driver)
+            return driver
+        log(f"[daemon] nothing on port {DAEMON_PORT}; launching Chrome.")
+    if BROWSER_BACKEND == "cdp":
+        from snu_cdp_driver import CDPDriver
+        chrome = find_chrome()
+        if not chrome:
+            raise WebDriverException("Chrome not found for the CDP backend; set CHROME_BINARY")
+        driver = CDPDriver.launch(chrome, chrome_args(profile_dir or PROFILE_DIR, headless), profile_dir or PROFILE_DIR)
+    else:
+        chrome, _ = resolve_browser()
+        options = webdriver.ChromeOptions()
+        for arg in chrome_args(profile_dir or PROFILE_DIR, headless):
+            options.add_argument(arg)
+        if chrome:
+            options.binary_location = chrome
+        driver = webdriver.Chrome(options=options, service=chrome_service())
+    driver.set_script_timeout(SCRIPT_TIMEOUT)
+    lean_tab(driver)
+    return driver
 
 # ---------- UTILS ----------
 def log(step):
@@ -106,36 +554,337 @@ def log(step):
         except Exception:
             print("[LOG] (unprintable message)", flush=True)
 
+# ---------- PHASE TRACING ----------
+# Every run appends its spans to TRACE_FILE as JSON lines:
+#   {"run", "phase", "t": start (s since run start, monotonic), "ms", "outcome", "room"}
+# plus one {"phase": "run"} line with the final outcome.
+_TRACE = {"run": None, "t0": 0.0, "room": None}
+
+def trace_start_run():
+    _TRACE["run"] = f"{now_kst().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+    _TRACE["t0"] = time.monotonic()
+    _TRACE["room"] = None
+
+def trace_room(room):
+    _TRACE["room"] = room
+
+def trace_event(phase, start, end, outcome, **fields):
+    if not TRACE_FILE or not _TRACE["run"]:
+        return
+    rec = {
+        "run": _TRACE["run"], "phase": phase,
+        "t": round(start - _TRACE["t0"], 4), "ms": round((end - start) * 1000, 1),
+        "outcome": outcome, "room": _TRACE["room"],
+    }
+    rec.update(fields)
+    try:
+        with open(TRACE_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    except Exception:
+        pass
+
+@contextmanager
+def span(phase, **fields):
+    """Time a phase. The yielded dict may set "outcome" (default "ok"; exceptions record "error:<Type>")."""
+    rec = {"outcome": "ok"}
+    start = time.monotonic()
+    try:
+        yield rec
+    except BaseException as e:
+        rec["outcome"] = f"error:{type(e).__name__}"
+        raise
+    finally:
+        trace_event(phase, start, time.monotonic(), rec.pop("outcome"), **fields, **rec)
+
+def trace_end_run(outcome, room=None):
+    if _TRACE["run"]:
+        trace_room(room)
+        trace_event("run", _TRACE["t0"], time.monotonic(), outcome)
+
+# ---------- RUN HISTORY ----------
+_HISTORY = []   # this run's room attempts, written to HISTORY_DB when the run ends
+
+def note_attempt(target_date, room, outcome, start, via):
+    """One room attempt (start = time.monotonic() when it began) for the run history."""
+    if not HISTORY_DB or outcome == "session":   # a lost session says nothing about the room
+        return
+    sh, sm, eh, em = slot_times(target_date.weekday())
+    end = time.monotonic()
+    _HISTORY.append({"weekday": target_date.weekday(), "target_date": target_date.strftime("%Y-%m-%d"),
+                     "slot": f"{sh}:{sm}-{eh}:{em}", "room": room, "via": via, "outcome": outcome,
+                     "t": start - _TRACE["t0"], "seconds": end - start})
+
+def save_history(outcome, room=None):
+    """Write the run and its attempts to HISTORY_DB (never fails the run)."""
+    if not HISTORY_DB or not _TRACE["run"]:
+        return
+    try:
+        import snu_history
+        snu_history.save_run(HISTORY_DB, _TRACE["run"], now_kst().isoformat(timespec="seconds"),
+                             outcome, room, _HISTORY)
+    except Exception as e:
+        log(f"[history] could not write {HISTORY_DB}: {e}")
+    _HISTORY.clear()
+
+def room_priority(weekday):
+    """ROOM_PRIORITY[weekday], in the order the history says books fastest with LEARNED_PRIORITY."""
+    rooms = list(ROOM_PRIORITY.get(weekday, ["311", "302", "318"]))
+    if not (LEARNED_PRIORITY and HISTORY_DB):
+        return rooms
+    try:
+        import snu_history
+        order, before, after = snu_history.learned_order(HISTORY_DB, weekday, rooms, HISTORY_MIN_RUNS)
+    except Exception as e:
+        log(f"[history] could not read {HISTORY_DB}: {e}")
+        return rooms
+    if before is None:
+        log(f"[history] fewer than {HISTORY_MIN_RUNS} runs for this weekday; keeping ROOM_PRIORITY.")
+    elif order != rooms:
+        log(f"[history] learned order {', '.join(order)} (expected {after[1]:.1f}s to a booking, "
+            f"configured {before[1]:.1f}s).")
+    return order
+
+# ---------- EVENT-DRIVEN WAITS ----------
+# Waits resolve inside the page: a MutationObserver and fetch/XHR counters are
+# installed once per document, and element predicates are re-checked on every
+# DOM mutation, all within a single execute_async_script round trip.
+# settle(driver, pause) replaces the old fixed sleeps: it returns as soon as the
+# DOM has been quiet for SETTLE_QUIET_MS with no request in flight, and never
+# waits longer than the sleep it replaces. PARANOID_WAITS keeps the old sleeps.
+# A document that is being navigated away from (beforeunload fired) never counts
+# as quiet, so a navigation click settles on the new document, not the old one.
+_WAIT_HOOK_JS = """
+if (!window.__snuWait) {
+  const w = window.__snuWait = {last: performance.now(), inflight: 0, leaving: false};
+  const bump = () => { w.last = performance.now(); };
+  window.addEventListener('beforeunload', () => { w.leaving = true; });
+  new MutationObserver(bump).observe(document.documentElement,
+    {subtree: true, childList: true, attributes: true, characterData: true});
+  if (window.fetch) {
+    const of = window.fetch;
+    window.fetch = function () {
+      w.inflight++; bump();
+      return of.apply(this, arguments).finally(() => { w.inflight--; bump(); });
+    };
+  }
+  const os = XMLHttpRequest.prototype.send;
+  XMLHttpRequest.prototype.send = function () {
+    w.inflight++; bump();
+    this.addEventListener('loadend', () => { w.inflight--; bump(); });
+    return os.apply(this, arguments);
+  };
+}
+"""
+
+_QUIET_JS = _WAIT_HOOK_JS + """
+const quiet = arguments[0], timeout = arguments[1], done = arguments[arguments.length - 1];
+const w = window.__snuWait, t0 = performance.now();
+(function tick() {
+  const now = performance.now();
+  const busy = w.leaving || w.inflight > 0 || (window.jQuery && jQuery.active > 0) || document.readyState !== 'complete';
+  if (!busy && now - w.last >= quiet) return done(true);
+  if (now - t0 >= timeout) return done(false);
+  setTimeout(tick, 20);
+})();
+"""
+
+_UNTIL_JS = _WAIT_HOOK_JS + """
+const timeout = arguments[0], done = arguments[arguments.length - 1];
+let finished = false, obs = null, iv = null, to = null;
+const finish = v => {
+  if (finished) return;
+  finished = true; if (obs) obs.disconnect(); clearInterval(iv); clearTimeout(to); done(v);
+};
+const check = () => { let v = null; try { v = (%s); } catch (e) {} if (v) finish(v); };
+obs = new MutationObserver(check);
+obs.observe(document.documentElement, {subtree: true, childList: true, attributes: true, characterData: true});
+iv = setInterval(check, 50);
+to = setTimeout(() => finish(null), timeout);
+check();
+"""
+
+_CHANGE_JS = _WAIT_HOOK_JS + """
+const timeout = arguments[0], done = arguments[arguments.length - 1];
+let to = null;
+const obs = new MutationObserver(() => { obs.disconnect(); clearTimeout(to); done(true); });
+obs.observe(document.documentElement, {subtree: true, childList: true, attributes: true, characterData: true});
+to = setTimeout(() => { obs.disconnect(); done(false); }, timeout);
+"""
+
+# --- element-state predicates (JS expressions; truthy value resolves the wait) ---
+_JS_VISIBLE_FN = "(e => !!(e && (e.offsetWidth || e.offsetHeight || e.getClientRects().length) && getComputedStyle(e).visibility !== 'hidden'))"
+
+def js_present(css):
+    return f"document.querySelector({json.dumps(css)})"
+
+def js_visible(css):
+    return f"[...document.querySelectorAll({json.dumps(css)})].find({_JS_VISIBLE_FN})"
+
+def js_clickable(css):
+    return f"[...document.querySelectorAll({json.dumps(css)})].find(e => {_JS_VISIBLE_FN}(e) && !e.disabled)"
+
+def js_xpath_visible(xpath):
+    return (f"(() => {{ const r = document.evaluate({json.dumps(xpath)}, document, null, "
+            f"XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null); "
+            f"for (let i = 0; i < r.snapshotLength; i++) {{ if ({_JS_VISIBLE_FN}(r.snapshotItem(i))) return r.snapshotItem(i); }} "
+            f"return null; }})()")
+
+def js_first_visible_text(*selectors):
+    """innerText of the first match of the first selector whose first match is visible."""
+    return (f"(() => {{ for (const s of {json.dumps(list(selectors))}) {{ const e = document.querySelector(s); "
+            f"if ({_JS_VISIBLE_FN}(e)) return (e.innerText || '').trim(); }} return ''; }})()")
+
+def js_xpath_clickable(xpath):
+    return (f"(() => {{ const r = document.evaluate({json.dumps(xpath)}, document, null, "
+            f"XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null); "
+            f"for (let i = 0; i < r.snapshotLength; i++) {{ const e = r.snapshotItem(i); "
+            f"if ({_JS_VISIBLE_FN}(e) && !e.disabled) return e; }} return null; }})()")
+
+def wait_js(driver, expr, timeout=20, message=""):
+    """
+    Resolve when the JS expression `expr` becomes truthy (checked on every DOM mutation
+    and every 50 ms) and return its value (DOM nodes come back as WebElements).
+    Survives navigations by re-arming; raises TimeoutException after `timeout` seconds.
+    """
+    end = time.time() + timeout
+    script = _UNTIL_JS % expr
+    while True:
+        remaining = end - time.time()
+        if remaining <= 0:
+            raise TimeoutException(message or f"condition not met: {expr[:80]}")
+        try:
+            value = driver.execute_async_script(script, int(remaining * 1000))
+        except (TimeoutException, JavascriptException, StaleElementReferenceException):
+            # page navigated / document replaced mid-wait: re-arm on the new document
+            time.sleep(0.05)
+            continue
+        if value:
+            return value
+
+# ---------- PAGE-STATE PROBE ----------
+# A probe is a dict of name -> JS expression. probe_state() evaluates all of
+# them in ONE execute_script and returns {name: value} (DOM nodes come back as
+# WebElements, a throwing predicate gives None), so each polling tick costs a
+# single WebDriver round trip however many things it looks at.
+_PROBE_SCRIPTS = {}
+
+def _probe_script(predicates):
+    key = tuple(sorted(predicates.items()))
+    script = _PROBE_SCRIPTS.get(key)
+    if script is None:
+        parts = ",\n".join(
+            f"  {json.dumps(name)}: (() => {{ try {{ return ({expr}); }} catch (e) {{ return null; }} }})()"
+            for name, expr in key
+        )
+        script = _PROBE_SCRIPTS[key] = "return {\n" + parts + "\n};"
+    return script
+
+def probe_state(driver, predicates):
+    return driver.execute_script(_probe_script(predicates)) or {}
+
+def poll_state(driver, predicates, done, timeout, interval=None):
+    """
+    Probe until done(state) is truthy; returns that state, or None on timeout.
+    Between ticks it waits for the next DOM change, at most `interval` seconds.
+    """
+    interval = PROBE_INTERVAL if interval is None else interval
+    end = time.time() + timeout
+    while True:
+        try:
+            state = probe_state(driver, predicates)
+        except (JavascriptException, StaleElementReferenceException):
+            state = {}
+        if done(state):
+            return state
+        if time.time() >= end:
+            return None
+        poll_pause(driver, interval)
+
+def wait_page_quiet(driver, quiet_ms=None, timeout=2.0):
+    """
+    DOM quiet for quiet_ms and no fetch/XHR/jQuery request in flight on a loaded
+    document that is not being left (a pending navigation waits for the next one). Returns bool.
+    """
+    quiet_ms = SETTLE_QUIET_MS if quiet_ms is None else quiet_ms
+    end = time.time() + timeout
+    while True:
+        remaining = end - time.time()
+        if remaining <= 0:
+            return False
+        try:
+            return bool(driver.execute_async_script(_QUIET_JS, quiet_ms, int(remaining * 1000)))
+        except (TimeoutException, JavascriptException, StaleElementReferenceException):
+            time.sleep(0.05)   # navigating; wait on the next document
+        except WebDriverException:
+            return False
+
+def wait_dom_change(driver, timeout=0.5):
+    """Block until the next DOM mutation (or timeout). Returns bool."""
+    try:
+        return bool(driver.execute_async_script(_CHANGE_JS, int(timeout * 1000)))
+    except WebDriverException:
+        return False
+
+def poll_pause(driver, pause):
+    """Pause between polling-loop iterations: next DOM change instead of a fixed sleep."""
+    if PARANOID_WAITS:
+        time.sleep(pause)
+    else:
+        wait_dom_change(driver, timeout=pause)
+
+def settle(driver, pause):
+    """Replacement for time.sleep(pause) after an interaction."""
+    if PARANOID_WAITS:
+        time.sleep(pause)
+        return
+    if pause > 0:
+        wait_page_quiet(driver, timeout=pause)
+
+def jitter():
+    """Human-ish pause before a click; only kept in paranoid mode."""
+    if PARANOID_WAITS:
+        time.sleep(0.12 + random.random() * 0.25)
+
 def wait_for_idle(driver, timeout=20):
-    WebDriverWait(driver, timeout).until(lambda d: d.execute_script("return document.readyState") == "complete")
+    wait_js(driver, "document.readyState === 'complete'", timeout=timeout, message="page did not finish loading")
 
 def wait_find_css(driver, css, timeout=20):
-    return WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.CSS_SELECTOR, css)))
+    return wait_js(driver, js_present(css), timeout=timeout, message=f"element not present: {css}")
+
+def wait_clickable_css(driver, css, timeout=20):
+    return wait_js(driver, js_clickable(css), timeout=timeout, message=f"element not clickable: {css}")
+
+def wait_visible_css(driver, css, timeout=20):
+    return wait_js(driver, js_visible(css), timeout=timeout, message=f"element not visible: {css}")
+
+def click_element(driver, el):
+    driver.execute_script("arguments[0].scrollIntoView({block:'center'});", el)
+    jitter()
+    try:
+        el.click()
+    except Exception:
+        driver.execute_script("arguments[0].click();", el)
 
 def wait_click_css(driver, css, timeout=20, retries=4, post_pause=CLICK_PAUSE):
     """
     Resilient click helper:
-    - waits for clickable
+    - waits (in-page, on DOM mutations) for a visible, enabled match
     - scrolls into view
-    - tiny random pause to avoid race
     - JS-click fallback
+    - settles until the page is quiet (at most post_pause)
     - retries on stale / transient WebDriver errors
     """
     last_err = None
     for _ in range(retries):
         try:
-            el = WebDriverWait(driver, timeout).until(EC.element_to_be_clickable((By.CSS_SELECTOR, css)))
-            driver.execute_script("arguments[0].scrollIntoView({block:'center'});", el)
-            time.sleep(0.12 + random.random() * 0.25)
-            try:
-                el.click()
-            except Exception:
-                driver.execute_script("arguments[0].click();", el)
-            time.sleep(post_pause)
+            el = wait_clickable_css(driver, css, timeout=timeout)
+            click_element(driver, el)
+            settle(driver, post_pause)
             return el
         except (StaleElementReferenceException, NoSuchElementException, WebDriverException) as e:
             last_err = e
-            time.sleep(0.5 + random.random() * 0.4)
+            if PARANOID_WAITS:
+                time.sleep(0.5 + random.random() * 0.4)
     raise last_err
 
 def type_text_css(driver, css, text, clear_first=True, timeout=20):
@@ -147,26 +896,153 @@ def type_text_css(driver, css, text, clear_first=True, timeout=20):
     except Exception:
         pass
     el.send_keys(text)
-    time.sleep(CLICK_PAUSE)
+    settle(driver, CLICK_PAUSE)
     return el
 
-def dump_debug(driver, tag="debug"):
-    ts = now_kst().strftime("%Y%m%d_%H%M%S")
-    png = f"snu_bot_{tag}_{ts}.png"
-    html = f"snu_bot_{tag}_{ts}.html"
+# ---------- DEBUG ARTIFACTS ----------
+# The caller only looks up its tab. A capture thread reads the page over its own
+# DevTools connection (outerHTML first, then a CDP screenshot), so the booking
+# loop never waits for it; decoding, compression, disk writes and retention
+# happen on the writer thread. The queue is bounded: when it is full an artifact
+# is dropped rather than making anything wait.
+_DEBUG_Q = queue.Queue(maxsize=8)
+_DEBUG = {"thread": None, "tags": [], "captures": [], "page": None}   # page: (seq, failure point, html)
+
+def _debug_writer():
+    while True:
+        item = _DEBUG_Q.get()
+        try:
+            if item is None:
+                return
+            base, shot_b64, html = item
+            os.makedirs(DEBUG_DIR, exist_ok=True)
+            if shot_b64:
+                with open(base + ".jpg", "wb") as f:
+                    f.write(base64.b64decode(shot_b64))
+            if html is not None:
+                with open(base + ".html.gz", "wb") as f:
+                    f.write(gzip.compress(html.encode("utf-8"), compresslevel=6))
+            trim_debug_dir()
+        except Exception as e:
+            log(f"[DEBUG] writer error: {e}")
+        finally:
+            _DEBUG_Q.task_done()
+
+def trim_debug_dir():
+    """Ring buffer on disk: drop artifacts older than DEBUG_MAX_AGE_HOURS, then the oldest until under the caps."""
     try:
-        driver.save_screenshot(png)
-    except Exception:
-        pass
+        entries = [os.path.join(DEBUG_DIR, n) for n in os.listdir(DEBUG_DIR)]
+        files = sorted(((os.path.getmtime(p), os.path.getsize(p), p) for p in entries if os.path.isfile(p)))
+    except OSError:
+        return
+    cutoff = time.time() - DEBUG_MAX_AGE_HOURS * 3600
+    total = sum(size for _, size, _ in files)
+    while files and (files[0][0] < cutoff or len(files) > DEBUG_MAX_FILES or total > DEBUG_MAX_MB * 2**20):
+        _, size, path = files.pop(0)
+        total -= size
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def _queue_artifact(base, shot_b64, html):
+    if _DEBUG["thread"] is None or not _DEBUG["thread"].is_alive():
+        _DEBUG["thread"] = threading.Thread(target=_debug_writer, daemon=True)
+        _DEBUG["thread"].start()
+    try:
+        _DEBUG_Q.put_nowait((base, shot_b64, html))
+        return True
+    except queue.Full:
+        return False
+
+def _page_html(driver):
     try:
-        with open(html, "w", encoding="utf-8") as f:
-            f.write(driver.page_source)
+        return driver.execute_script("return document.documentElement.outerHTML;")
     except Exception:
-        pass
+        return None
+
+def _capture_tab(ws_url, screenshot=True):
+    """(JPEG base64 or None, outerHTML or None) of a tab, read over a DevTools connection of its own."""
+    calls = [("Runtime.evaluate", {"expression": "document.documentElement.outerHTML", "returnByValue": True})]
+    if screenshot:
+        calls.append(("Page.captureScreenshot", {"format": "jpeg", "quality": DEBUG_JPEG_QUALITY}))
+    ws = websocket.create_connection(ws_url, timeout=10, suppress_origin=True)
+    try:
+        for i, (method, params) in enumerate(calls, start=1):
+            ws.send(json.dumps({"id": i, "method": method, "params": params}))
+        results = {}
+        while len(results) < len(calls):
+            msg = json.loads(ws.recv())
+            if msg.get("id"):
+                results[msg["id"]] = msg.get("result") or {}
+    finally:
+        ws.close()
+    return results.get(2, {}).get("data"), (results[1].get("result") or {}).get("value")
+
+def _capture_job(ws_url, base, point, seq):
+    on_fail = DEBUG_CAPTURE == "on_fail"
+    try:
+        shot, html = _capture_tab(ws_url, screenshot=not on_fail)
+    except Exception as e:
+        log(f"[DEBUG] capture failed for {point}: {e}")
+        return
+    if on_fail:
+        page = _DEBUG["page"]
+        if html is not None and (page is None or page[0] < seq):
+            _DEBUG["page"] = (seq, point, html)
+    elif _queue_artifact(base, shot, html):
+        print(f"[DEBUG] Queued debug artifacts: {base}.jpg / .html.gz")
+    else:
+        print(f"[DEBUG] Writer busy; dropped artifacts for {point}.")
+
+def dump_debug(driver, tag="debug"):
+    """
+    Capture the current tab at a failure point without waiting for it: "always" queues
+    a screenshot + HTML for disk, "on_fail" keeps the page for finish_debug.
+    """
+    stamp = now_kst()
+    point = f"{stamp.strftime('%H:%M:%S')} {tag}"
+    _DEBUG["tags"].append(point)
     try:
-        print(f"[DEBUG] Saved debug artifacts: {png} and {html}")
+        ws_url = tab_ws_url(driver)
     except Exception:
-        print("[DEBUG] Artifacts saved.")
+        ws_url = None
+    if not ws_url:
+        log(f"[DEBUG] DevTools not reachable; nothing captured for {tag}.")
+        return
+    base = os.path.join(DEBUG_DIR, f"snu_bot_{tag}_{stamp.strftime('%Y%m%d_%H%M%S')}")
+    thread = threading.Thread(target=_capture_job, args=(ws_url, base, point, len(_DEBUG["tags"])), daemon=True)
+    _DEBUG["captures"].append(thread)
+    thread.start()
+
+def finish_debug(driver, failed, timeout=10):
+    """
+    End of run: wait for pending captures; in on_fail mode save the latest failure page
+    (the final page if no failure point was captured) if the run failed; let the writer finish.
+    """
+    for thread in _DEBUG["captures"]:
+        thread.join(timeout)
+    _DEBUG["captures"].clear()
+    if DEBUG and DEBUG_CAPTURE == "on_fail" and failed:
+        base = os.path.join(DEBUG_DIR, f"snu_bot_run_failed_{now_kst().strftime('%Y%m%d_%H%M%S')}")
+        page = _DEBUG["page"]
+        if page:
+            html, taken = page[2], f"page captured at: {page[1]}"
+        else:
+            html, taken = _page_html(driver), "page captured at: end of run"
+        if html is not None:
+            html = "<!-- failure points:\n" + "\n".join(_DEBUG["tags"] + [taken]) + "\n-->\n" + html
+        _queue_artifact(base, None, html)
+        print(f"[DEBUG] Run failed; saving DOM snapshot {base}.html.gz")
+    _DEBUG["tags"].clear()
+    _DEBUG["page"] = None
+    thread = _DEBUG["thread"]
+    if thread is not None and thread.is_alive():
+        try:
+            _DEBUG_Q.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
 
 def body_contains_text(driver, txt):
     try:
@@ -178,12 +1054,11 @@ def body_contains_text(driver, txt):
         return False
 
 def wait_for_text_present(driver, txt, timeout=4):
-    end = time.time() + timeout
-    while time.time() < end:
-        if body_contains_text(driver, txt):
-            return True
-        time.sleep(0.2)
-    return False
+    expr = f"document.body && document.body.innerText && document.body.innerText.indexOf({json.dumps(txt)}) !== -1"
+    try:
+        return bool(wait_js(driver, expr, timeout=timeout))
+    except TimeoutException:
+        return False
 
 # ---------- DATEPICKER (ROBUST, WITH HEADER LOGGING) ----------
 _MONTH_ABBR_MAP = {
@@ -192,16 +1067,20 @@ _MONTH_ABBR_MAP = {
     "Jul": 7, "Aug": 8, "Sep": 9, "Sept": 9, "Oct": 10, "Nov": 11, "Dec": 12,
 }
 
+DATEPICKER_HEADER_PROBE = {
+    "month": "document.querySelector('#ui-datepicker-div > div > div > span.ui-datepicker-month').textContent",
+    "year": "document.querySelector('#ui-datepicker-div > div > div > span.ui-datepicker-year').textContent",
+}
+
 def _read_dp_year_month(driver):
     """Return (year, month_int) and print the header raw text that the widget shows."""
-    wait_find_css(driver, "#ui-datepicker-div", timeout=20)
-
-    # Raw header elements (as you described)
-    mo_el = driver.find_element(By.CSS_SELECTOR, "#ui-datepicker-div > div > div > span.ui-datepicker-month")
-    yr_el = driver.find_element(By.CSS_SELECTOR, "#ui-datepicker-div > div > div > span.ui-datepicker-year")
+    # Raw header elements (as you described), read in one probe
+    state = poll_state(driver, DATEPICKER_HEADER_PROBE, lambda st: st.get("month") is not None, timeout=20)
+    if state is None:
+        raise TimeoutException("datepicker header did not appear")
 
-    mo_raw = (mo_el.text or "").strip()   # e.g., "Aug" or "Sept" (title-cased)
-    yr_raw = (yr_el.text or "").strip()   # e.g., "2025"
+    mo_raw = (state.get("month") or "").strip()   # e.g., "Aug" or "Sept" (title-cased)
+    yr_raw = (state.get("year") or "").strip()    # e.g., "2025"
 
     # Log raw header text
     log(f"[datepicker] header raw -> month='{mo_raw}', year='{yr_raw}'")
@@ -232,6 +1111,45 @@ def _read_dp_year_month(driver):
     log(f"[datepicker] parsed -> {year}-{month:02d}")
     return year, month
 
+_SET_DATE_JS = """
+const input = document.querySelector('#S_SPACE_RESER_USE_DT');
+const $ = window.jQuery;
+if (!input) return {ok: false, reason: 'no #S_SPACE_RESER_USE_DT'};
+if (!($ && $.fn && $.fn.datepicker && $(input).hasClass('hasDatepicker'))) return {ok: false, reason: 'no datepicker widget'};
+const date = new Date(arguments[0], arguments[1] - 1, arguments[2]);
+$(input).datepicker('setDate', date);
+// setDate does not run onSelect; a click on a day would, so run it too
+const onSelect = $(input).datepicker('option', 'onSelect');
+if (typeof onSelect === 'function') onSelect.call(input, input.value);
+input.dispatchEvent(new Event('input', {bubbles: true}));
+input.dispatchEvent(new Event('change', {bubbles: true}));
+$(input).datepicker('hide');
+const got = $(input).datepicker('getDate');
+return {ok: true, value: input.value,
+        got: got ? [got.getFullYear(), got.getMonth() + 1, got.getDate()] : null};
+"""
+
+def set_date_fast(driver, target_date):
+    """
+    One round trip: $.datepicker setDate on #S_SPACE_RESER_USE_DT, fire its
+    input/change events, then read back widget date and input value.
+    Returns True only when both match target_date.
+    """
+    try:
+        res = driver.execute_script(_SET_DATE_JS, target_date.year, target_date.month, target_date.day) or {}
+    except Exception as e:
+        log(f"[datepicker] fast path error: {e}")
+        return False
+    want = [target_date.year, target_date.month, target_date.day]
+    value = (res.get("value") or "").strip()
+    digits = [int(x) for x in "".join(ch if ch.isdigit() else " " for ch in value).split()]
+    ok = res.get("ok") and res.get("got") == want and all(x in digits for x in want)
+    if ok:
+        log(f"[datepicker] fast path set '{value}'")
+    else:
+        log(f"[datepicker] fast path not verified ({res.get('reason') or value or res.get('got')}); walking months.")
+    return bool(ok)
+
 def pick_date_with_rules(driver, today, target_date):
     """
     Robust: normalize the datepicker to the target year/month by reading its header
@@ -255,7 +1173,7 @@ def pick_date_with_rules(driver, today, target_date):
         else:
             # click prev month
             wait_click_css(driver, "#ui-datepicker-div .ui-datepicker-prev", timeout=5, post_pause=0.25)
-        time.sleep(0.15)
+        settle(driver, 0.15)
         cy, cm = _read_dp_year_month(driver)  # read after each nav
         steps += 1
 
@@ -272,94 +1190,74 @@ def _click_day_by_text(driver, day_int):
     day_xpath = ("//div[@id='ui-datepicker-div']"
                  "//td[not(contains(@class,'ui-datepicker-other-month'))]"
                  f"/a[normalize-space()='{day_int}']")
-    el = WebDriverWait(driver, 15).until(EC.element_to_be_clickable((By.XPATH, day_xpath)))
-    driver.execute_script("arguments[0].scrollIntoView({block:'center'});", el)
-    try:
-        el.click()
-    except Exception:
-        driver.execute_script("arguments[0].click();", el)
-    time.sleep(CLICK_PAUSE)
+    el = wait_js(driver, js_xpath_clickable(day_xpath), timeout=15, message=f"day {day_int} not clickable")
+    click_element(driver, el)
+    settle(driver, CLICK_PAUSE)
 
 # ---------- MODAL / IFRAME AWARE WAIT ----------
-def find_visible_modal_root(driver):
-    for sel in ["div[role='dialog']", ".ui-dialog", ".modal", ".swal2-container"]:
-        for el in driver.find_elements(By.CSS_SELECTOR, sel):
-            try:
-                if el.is_displayed():
-                    return el
-            except Exception:
-                continue
-    return None
+RESERVATION_BUTTON_XPATH = "//button[contains(normalize-space(.), 'Reservation') or contains(normalize-space(.), '예약')]"
+NO_RESULTS_XPATH = "//*[contains(text(),'No data') or contains(text(),'검색 결과가 없습니다')]"
+
+_MODAL_ROOTS = ["div[role='dialog']", ".ui-dialog", ".modal", ".swal2-container"]
+
+CALENDAR_PROBE = {
+    # visible iframe inside the first visible modal root (calendar may render in it)
+    "modal_iframe": (f"(() => {{ const vis = {_JS_VISIBLE_FN}; for (const s of {json.dumps(_MODAL_ROOTS)}) {{ "
+                     f"const m = [...document.querySelectorAll(s)].find(vis); "
+                     f"if (m) return [...m.querySelectorAll('iframe')].find(vis) || null; }} return null; }})()"),
+    "buttons": f"!!{js_xpath_visible(RESERVATION_BUTTON_XPATH)}",
+    "toolbar": f"!!{js_visible('.fc-header-toolbar, #calendarZone .fc-header-toolbar')}",
+    "no_results": f"!!{js_xpath_visible(NO_RESULTS_XPATH)}",
+}
 
-def switch_into_iframe_if_any(driver, container):
-    try:
-        if not container:
-            return False
-        for fr in container.find_elements(By.TAG_NAME, "iframe"):
-            if fr.is_displayed():
-                driver.switch_to.frame(fr)
-                return True
-    except Exception:
-        pass
-    return False
+RES_BUTTON_PROBE = {
+    "button": js_xpath_clickable(RESERVATION_BUTTON_XPATH),
+    "toolbar_button": js_visible("#calendarZone > div.fc-header-toolbar.fc-toolbar > div:nth-child(3) > button"),
+}
 
 def wait_for_calendar_render(driver, timeout=CALENDAR_WAIT):
     end = time.time() + timeout
     tried_iframe = False
     while time.time() < end:
-        modal = find_visible_modal_root(driver)
-        if modal and not tried_iframe:
-            tried_iframe = switch_into_iframe_if_any(driver, modal)
-            if tried_iframe:
-                time.sleep(0.5)
-
-        btns = driver.find_elements(By.XPATH, "//button[contains(normalize-space(.), 'Reservation') or contains(normalize-space(.), '예약')]")
-        if any(b.is_displayed() for b in btns):
+        st = poll_state(driver, CALENDAR_PROBE,
+                        lambda st: any(st.get(k) for k in ("buttons", "toolbar", "no_results"))
+                        or (st.get("modal_iframe") and not tried_iframe),
+                        timeout=max(0.0, end - time.time()))
+        if st is None:
+            break
+        if st.get("modal_iframe") and not tried_iframe:
+            try:
+                driver.switch_to.frame(st["modal_iframe"])
+                tried_iframe = True
+                settle(driver, 0.5)
+                continue
+            except Exception:
+                tried_iframe = True
+
+        if st.get("buttons"):
             log("Reservation button detected.")
             return "buttons"
-
-        tubs = driver.find_elements(By.CSS_SELECTOR, ".fc-header-toolbar, #calendarZone .fc-header-toolbar")
-        if any(t.is_displayed() for t in tubs):
+        if st.get("toolbar"):
             log("FullCalendar toolbar detected.")
             return "toolbar"
-
-        none = driver.find_elements(By.XPATH, "//*[contains(text(),'No data') or contains(text(),'검색 결과가 없습니다')]")
-        if any(n.is_displayed() for n in none):
+        if st.get("no_results"):
             log("No-results message detected.")
             return "no-results"
-
-        time.sleep(0.5)
     raise TimeoutError("Calendar/Reservation UI did not appear.")
 
 def click_reservation_button(driver, timeout=RES_BUTTON_WAIT):
     end = time.time() + timeout
     while time.time() < end:
+        st = poll_state(driver, RES_BUTTON_PROBE, lambda st: st.get("button") or st.get("toolbar_button"),
+                        timeout=max(0.0, end - time.time()))
+        if st is None:
+            break
         try:
-            btn = WebDriverWait(driver, 2).until(EC.element_to_be_clickable((By.XPATH, "//button[contains(normalize-space(.), 'Reservation') or contains(normalize-space(.), '예약')]")))
-            driver.execute_script("arguments[0].scrollIntoView({block:'center'});", btn)
-            time.sleep(0.12 + random.random() * 0.2)
-            try:
-                btn.click()
-            except Exception:
-                driver.execute_script("arguments[0].click();", btn)
-            time.sleep(CLICK_PAUSE)
+            click_element(driver, st.get("button") or st["toolbar_button"])
+            settle(driver, CLICK_PAUSE)
             return True
-        except Exception:
-            pass
-        try:
-            btn = driver.find_element(By.CSS_SELECTOR, "#calendarZone > div.fc-header-toolbar.fc-toolbar > div:nth-child(3) > button")
-            if btn.is_displayed():
-                driver.execute_script("arguments[0].scrollIntoView({block:'center'});", btn)
-                time.sleep(0.1)
-                try:
-                    btn.click()
-                except Exception:
-                    driver.execute_script("arguments[0].click();", btn)
-                time.sleep(CLICK_PAUSE)
-                return True
-        except Exception:
-            pass
-        time.sleep(0.5)
+        except (StaleElementReferenceException, WebDriverException):
+            continue   # re-rendered between probe and click; probe again
     return False
 
 # ---------- AFTER RESERVATION ----------
@@ -370,45 +1268,44 @@ def land_on_reservation_form(driver, previous_handles, timeout=FORM_WAIT):
         new_handles = [h for h in current if h not in previous_handles]
         if new_handles:
             driver.switch_to.window(new_handles[-1])
+            lean_tab(driver)
             break
-        time.sleep(0.3)
+        time.sleep(0.3 if PARANOID_WAITS else 0.05)
 
     try:
         driver.switch_to.default_content()
     except Exception:
         pass
 
-    WebDriverWait(driver, timeout).until(
-        EC.any_of(
-            EC.visibility_of_element_located((By.ID, "bodyContentArea-RESV")),
-            EC.url_contains("reser"),
-            EC.url_contains("Apply"),
-            EC.url_contains("Reservation")
-        )
-    )
-    time.sleep(0.5)
+    wait_js(driver, f"{js_visible('#bodyContentArea-RESV')} || /reser|Apply|Reservation/.test(location.href)",
+            timeout=timeout, message="reservation form did not load")
+    settle(driver, 0.5)
 
 # ---------- PURPOSE & TIME ----------
 def select_purpose_others(driver, timeout=10):
-    sel = WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.ID, "RESER_APLY_TYPE_CD")))
-    WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.CSS_SELECTOR, "#RESER_APLY_TYPE_CD option[value='RV14000099']")))
-    Select(sel).select_by_value("RV14000099")
-    time.sleep(0.5)
+    wait_find_css(driver, f"#RESER_APLY_TYPE_CD option[value='{PURPOSE_OTHERS}']", timeout=timeout)
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import Select
+    sel = driver.find_element(By.ID, "RESER_APLY_TYPE_CD")
+    Select(sel).select_by_value(PURPOSE_OTHERS)
+    settle(driver, 0.5)
 
 def select_dropdown_by_text(driver, selector, visible_text, timeout=10):
-    sel = WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
+    from selenium.webdriver.support.ui import Select
+    sel = wait_find_css(driver, selector, timeout=timeout)
     Select(sel).select_by_visible_text(visible_text)
 
 def select_times_for_day(driver, weekday):
-    start_hour, start_min, end_hour, end_min = TIME_CONFIG.get(weekday, DEFAULT_TIMES)
+    start_hour, start_min, end_hour, end_min = slot_times(weekday)
     select_dropdown_by_text(driver, "#SPACE_RESER_FR_T", f"{start_hour} h")
     select_dropdown_by_text(driver, "#SPACE_RESER_FR_M", f"{start_min} min")
     select_dropdown_by_text(driver, "#SPACE_RESER_TO_T", f"{end_hour} h")
     select_dropdown_by_text(driver, "#SPACE_RESER_TO_M", f"{end_min} min")
-    time.sleep(0.5)
+    settle(driver, 0.5)
 
 # ---------- OPTIONAL ----------
 def fill_contact_if_empty(driver):
+    from selenium.webdriver.common.by import By
     try:
         phone = driver.find_element(By.ID, "APLYT_CNTINFO")
         email = driver.find_element(By.ID, "APLYT_EMAIL")
@@ -416,35 +1313,131 @@ def fill_contact_if_empty(driver):
         return
     try:
         if phone.get_attribute("value").strip() == "" and OPTIONAL_PHONE:
-            phone.clear(); phone.send_keys(OPTIONAL_PHONE); time.sleep(0.2)
+            phone.clear(); phone.send_keys(OPTIONAL_PHONE); settle(driver, 0.2)
         if email.get_attribute("value").strip() == "" and OPTIONAL_EMAIL:
-            email.clear(); email.send_keys(OPTIONAL_EMAIL); time.sleep(0.2)
+            email.clear(); email.send_keys(OPTIONAL_EMAIL); settle(driver, 0.2)
     except Exception:
         pass
 
+# ---------- BULK FORM FILL ----------
+# A field map is a list of dicts, one per form control:
+#   {"css", "option": value}        select, by option value
+#   {"css", "option_text": text}    select, by visible text
+#   {"css", "value": text}          input / textarea ("if_empty": only fill a blank one;
+#                                   such a field may also be missing from the page)
+#   {"css", "checked": bool}        checkbox
+# bulk_fill() sets all of them in one script (with input/change events, checkboxes
+# via click() so their handlers run), lets queued handlers run, then reads every
+# value back; only the fields that did not stick go through WebDriver one by one.
+_BULK_FILL_JS = """
+const fields = arguments[0], done = arguments[arguments.length - 1];
+const fire = (el, ...types) => types.forEach(t => el.dispatchEvent(new Event(t, {bubbles: true})));
+const pick = (el, f) => [...el.options].find(o => 'option' in f ? o.value === f.option : o.text.trim() === f.option_text);
+for (const f of fields) {
+  const el = document.querySelector(f.css);
+  if (!el) continue;
+  try {
+    if ('checked' in f) {
+      if (el.checked !== f.checked) el.click();
+      if (el.checked !== f.checked) { el.checked = f.checked; fire(el, 'input', 'change'); }
+    } else if (el.tagName === 'SELECT') {
+      const opt = pick(el, f);
+      if (opt) { el.value = opt.value; fire(el, 'input', 'change'); }
+    } else if (!(f.if_empty && el.value.trim())) {
+      const proto = el.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+      el.focus();
+      Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, f.value);
+      fire(el, 'input', 'change');
+      el.blur();
+    }
+  } catch (e) {}
+}
+setTimeout(() => done(fields.map(f => {
+  const el = document.querySelector(f.css);
+  if (!el) return !!f.if_empty;
+  if ('checked' in f) return el.checked === f.checked;
+  if (el.tagName === 'SELECT') { const o = el.options[el.selectedIndex]; return !!o && o === pick(el, f); }
+  return f.if_empty ? el.value.trim() !== '' : el.value === f.value;
+})), 0);
+"""
+
+def reservation_fields(times):
+    """Field map of the reservation form for times = (start h, start m, end h, end m)."""
+    start_hour, start_min, end_hour, end_min = times
+    fields = [
+        {"css": "#RESER_APLY_TYPE_CD", "option": PURPOSE_OTHERS},
+        {"css": "#SPACE_RESER_FR_T", "option_text": f"{start_hour} h"},
+        {"css": "#SPACE_RESER_FR_M", "option_text": f"{start_min} min"},
+        {"css": "#SPACE_RESER_TO_T", "option_text": f"{end_hour} h"},
+        {"css": "#SPACE_RESER_TO_M", "option_text": f"{end_min} min"},
+    ]
+    if OPTIONAL_PHONE:
+        fields.append({"css": "#APLYT_CNTINFO", "value": OPTIONAL_PHONE, "if_empty": True})
+    if OPTIONAL_EMAIL:
+        fields.append({"css": "#APLYT_EMAIL", "value": OPTIONAL_EMAIL, "if_empty": True})
+    fields += [
+        {"css": "#SPACE_RESER_TTL", "value": RESERVATION_TITLE},
+        {"css": "#SPACE_RESER_CTNT", "value": RESERVATION_CONTENT},
+        {"css": "#PERS_INFO_UTILIZ_CONSNT_YN", "checked": True},
+        {"css": "#ATTNT_CTNT_CONSNT_YN", "checked": True},
+    ]
+    return fields
+
+def bulk_fill(driver, fields):
+    """Set and read back the whole field map in one call. Returns the fields that did not stick."""
+    stuck = driver.execute_async_script(_BULK_FILL_JS, fields) or []
+    return [f for f, ok in zip(fields, stuck) if not ok] + fields[len(stuck):]
+
+def fill_field(driver, f):
+    """Per-field fallback through WebDriver."""
+    if "checked" in f:
+        if wait_find_css(driver, f["css"], timeout=10).is_selected() != f["checked"]:
+            wait_click_css(driver, f["css"])
+    elif "option" in f:
+        from selenium.webdriver.support.ui import Select
+        Select(wait_find_css(driver, f["css"], timeout=10)).select_by_value(f["option"])
+    elif "option_text" in f:
+        select_dropdown_by_text(driver, f["css"], f["option_text"])
+    else:
+        type_text_css(driver, f["css"], f["value"])
+
 # ---------- NAV HELPERS ----------
 def click_english(driver):
     try:
         wait_click_css(driver, "#Tmp_resvUserTop > div.top > div > div > a:nth-child(8)", timeout=8)
-        time.sleep(0.8)
+        settle(driver, 0.8)
     except Exception:
         pass
 
-def open_filters_and_select_building(driver):
+BUILDING_BUTTON_CSS = "#Tmp_resvUserBody > div > div:nth-child(1) > ul > li:nth-child(1) > div > button"
+BUILDING_CSS = "#S_BD_CD > ul > li:nth-child(4)"
+
+def select_building(driver):
+    wait_click_css(driver, BUILDING_BUTTON_CSS, retries=4)
+    wait_click_css(driver, BUILDING_CSS)
+
+def open_filters_and_select_building(driver, state=None):
     # First attempt only: English + Building
     click_english(driver)
-    wait_click_css(driver, "#Tmp_resvUserBody > div > div:nth-child(1) > ul > li:nth-child(1) > div > button", retries=4)
-    wait_click_css(driver, "#S_BD_CD > ul > li:nth-child(4)")
+    select_building(driver)
+    note_filter_state(driver, state)
 
 def select_room_by_code(driver, room_code):
     wait_click_css(driver, "#Tmp_resvUserBody > div > div:nth-child(1) > ul > li.col-lg-4 > div > button", retries=4)
     css = ROOM_SELECTORS[room_code]
     wait_click_css(driver, css)
 
+LOGO_CSS = "#Tmp_resvUserTop > div.logoarea > div > a > img"
+
 def go_home(driver):
-    # Click home logo and WAIT 4 SECONDS before doing anything else
-    wait_click_css(driver, "#Tmp_resvUserTop > div.logoarea > div > a > img", timeout=15)
-    time.sleep(4.0)
+    # Click home logo and let the home page settle (up to 4 s) before doing anything else
+    if LEAN_BROWSER:
+        # images are blocked, so the logo may have no size to click; follow its link instead
+        wait_find_css(driver, LOGO_CSS, timeout=15)
+        driver.execute_script("document.querySelector(arguments[0]).closest('a').click();", LOGO_CSS)
+    else:
+        wait_click_css(driver, LOGO_CSS, timeout=15)
+    settle(driver, 4.0)
     # Ensure top-level context & alive; if not, force rebuild by raising
     try:
         driver.switch_to.default_content()
@@ -454,71 +1447,227 @@ def go_home(driver):
         raise RuntimeError("SESSION_LOST_AFTER_HOME")
 
 # ---------- SWEETALERT HANDLER ----------
+SWAL_SHOWN_CSS = "div.swal2-container.swal2-center.swal2-backdrop-show"
+
+SWAL_TEXT_PROBE = {"text": js_first_visible_text("#swal2-html-container", "#swal2-content", ".swal2-title")}
+
 def _read_swal_text(driver):
-    for sel in ("#swal2-html-container", "#swal2-content", ".swal2-title"):
-        try:
-            el = driver.find_element(By.CSS_SELECTOR, sel)
-            if el.is_displayed():
-                return (el.text or "").strip()
-        except Exception:
-            continue
-    return ""
+    try:
+        return probe_state(driver, SWAL_TEXT_PROBE).get("text") or ""
+    except Exception:
+        return ""
 
 def handle_swal_after_reserve(driver, timeout=12):
     try:
-        WebDriverWait(driver, timeout).until(
-            EC.visibility_of_element_located((By.CSS_SELECTOR, "div.swal2-container.swal2-center.swal2-backdrop-show"))
-        )
+        wait_visible_css(driver, SWAL_SHOWN_CSS, timeout=timeout)
     except Exception:
         return "none"
 
     text1 = _read_swal_text(driver)
     if DEBUG: print(f"[SWAL #1] {text1}")
-    confirm_css = "div.swal2-container.swal2-center.swal2-backdrop-show button.swal2-confirm.swal2-styled"
+    confirm_css = f"{SWAL_SHOWN_CSS} button.swal2-confirm.swal2-styled"
     try:
-        confirm_btn = WebDriverWait(driver, 6).until(EC.element_to_be_clickable((By.CSS_SELECTOR, confirm_css)))
+        confirm_btn = wait_clickable_css(driver, confirm_css, timeout=6)
     except Exception:
         confirm_btn = None
 
-    if "예약이 중복되었습니다" in text1:
+    if DUPLICATE_MSG in text1:
         if confirm_btn:
             try: confirm_btn.click()
             except Exception: driver.execute_script("arguments[0].click();", confirm_btn)
-        time.sleep(0.4)
+        settle(driver, 0.4)
         return "duplicate"
 
     if confirm_btn:
         try: confirm_btn.click()
         except Exception: driver.execute_script("arguments[0].click();", confirm_btn)
-        time.sleep(0.6)
+        settle(driver, 0.6)
 
     try:
-        WebDriverWait(driver, 2.5).until(
-            EC.visibility_of_element_located((By.CSS_SELECTOR, "div.swal2-container.swal2-center.swal2-backdrop-show"))
-        )
+        wait_visible_css(driver, SWAL_SHOWN_CSS, timeout=2.5)
         text2 = _read_swal_text(driver)
         if DEBUG: print(f"[SWAL #2] {text2}")
         try:
-            confirm_btn2 = WebDriverWait(driver, 3).until(EC.element_to_be_clickable((By.CSS_SELECTOR, confirm_css)))
+            confirm_btn2 = wait_clickable_css(driver, confirm_css, timeout=3)
         except Exception:
             confirm_btn2 = None
 
-        if "예약이 중복되었습니다" in text2:
+        if DUPLICATE_MSG in text2:
             if confirm_btn2:
                 try: confirm_btn2.click()
                 except Exception: driver.execute_script("arguments[0].click();", confirm_btn2)
-            time.sleep(0.4)
+            settle(driver, 0.4)
             return "duplicate"
 
         if confirm_btn2:
             try: confirm_btn2.click()
             except Exception: driver.execute_script("arguments[0].click();", confirm_btn2)
-            time.sleep(0.4)
+            settle(driver, 0.4)
 
         return "confirmed" if text2 else "other"
     except Exception:
         return "confirmed" if text1 else "other"
 
+# ---------- NETWORK-LEVEL SUBMIT RESULT ----------
+# A second DevTools connection to the form's tab (the driver's window handle is
+# the CDP target id) receives Network events in a background thread. When the
+# HTTP_INSERT_PATH response finishes loading its body is fetched and classified,
+# so the outcome is known the moment the server answers.
+class SubmitWatcher:
+    def __init__(self, ws_url):
+        self.ws = websocket.create_connection(ws_url, timeout=5, suppress_origin=True)
+        self.ws.settimeout(None)
+        self._lock = threading.RLock()   # guards _inserts / _bodies / result against reset()
+        self._ids = 0
+        self._bodies = {}   # getResponseBody command id -> requestId
+        self._inserts = {}  # requestId -> HTTP status, for the current submit
+        self.result = None
+        self.sent = threading.Event()
+        self.done = threading.Event()
+        self.alive = True
+        self._send("Network.enable")
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def reset(self):
+        """Forget the previous submit (the Events are cleared in place: waiters keep the same objects)."""
+        with self._lock:
+            self._inserts.clear()
+            self.result = None
+            self.sent.clear()
+            self.done.clear()
+
+    def _send(self, method, params=None):
+        with self._lock:
+            self._ids += 1
+            self.ws.send(json.dumps({"id": self._ids, "method": method, "params": params or {}}))
+            return self._ids
+
+    def _finish(self, result):
+        self.result = result
+        self.done.set()
+
+    def _run(self):
+        while True:
+            try:
+                msg = json.loads(self.ws.recv())
+            except Exception:
+                self.alive = False
+                self.done.set()
+                return
+            method, params = msg.get("method"), msg.get("params") or {}
+            rid = params.get("requestId")
+            with self._lock:
+                if method == "Network.requestWillBeSent" and HTTP_INSERT_PATH in params.get("request", {}).get("url", ""):
+                    self._inserts[rid] = None
+                    self.sent.set()
+                elif method == "Network.responseReceived" and rid in self._inserts:
+                    self._inserts[rid] = params.get("response", {}).get("status")
+                elif method == "Network.loadingFinished" and rid in self._inserts:
+                    self._bodies[self._send("Network.getResponseBody", {"requestId": rid})] = rid
+                elif method == "Network.loadingFailed" and rid in self._inserts:
+                    self._finish(None)
+                elif msg.get("id") in self._bodies:
+                    rid = self._bodies.pop(msg["id"])
+                    if rid not in self._inserts:   # body of a submit from before the last reset()
+                        continue
+                    res = msg.get("result") or {}
+                    body = res.get("body", "")
+                    if res.get("base64Encoded"):
+                        body = base64.b64decode(body).decode("utf-8", "replace")
+                    verdict = classify_reserve_response(self._inserts.get(rid), body)
+                    if DEBUG: print(f"[net] insert -> HTTP {self._inserts.get(rid)}: {body[:200]}")
+                    self._finish(verdict if verdict != "fail" else None)
+
+    def wait(self, timeout):
+        """The verdict ("success" | "duplicate" | "invalid" | "session") or None if none (yet)."""
+        self.done.wait(timeout)
+        return self.result
+
+    def close(self):
+        try:
+            self.ws.close()
+        except Exception:
+            pass
+
+_WATCHERS = {}   # window handle -> SubmitWatcher
+
+def tab_ws_url(driver, handle=None):
+    """DevTools websocket URL of a tab (default: the current one); None without a debugger address."""
+    addr = (driver.capabilities.get("goog:chromeOptions") or {}).get("debuggerAddress")
+    if not addr:
+        return None
+    handle = handle or driver.current_window_handle
+    return f"ws://{addr}/devtools/page/{handle.replace('CDwindow-', '')}"
+
+def arm_submit_watch(driver):
+    """
+    Watcher for the current tab (created once per tab); None if DevTools is not reachable.
+    Watchers of tabs this driver no longer has (closed, or from a rebuilt browser)
+    or whose connection dropped are closed first.
+    """
+    handle = driver.current_window_handle
+    handles = set(driver.window_handles)
+    close_submit_watches([h for h, w in _WATCHERS.items() if h not in handles or not w.alive])
+    if handle in _WATCHERS:
+        return _WATCHERS[handle]
+    ws_url = tab_ws_url(driver, handle)
+    if not ws_url:
+        return None
+    try:
+        watch = SubmitWatcher(ws_url)
+    except Exception as e:
+        log(f"[net] cannot watch the network ({e}); reading the popups instead.")
+        return None
+    _WATCHERS[handle] = watch
+    return watch
+
+def close_submit_watches(handles=None):
+    for handle in list(_WATCHERS) if handles is None else handles:
+        watch = _WATCHERS.pop(handle, None)
+        if watch:
+            watch.close()
+
+def _click_swal_confirm(driver):
+    driver.execute_script("const b = document.querySelector(arguments[0]); if (b) b.click();",
+                          f"{SWAL_SHOWN_CSS} button.swal2-confirm")
+
+def await_submit_result(driver, watch, timeout=12):
+    """
+    Network-first outcome of a submit: "success" | "duplicate" | "invalid" | "session",
+    or None when no insert response was seen (the caller then reads the popups).
+    The confirm prompt is accepted as usual; the result popup is dismissed and its
+    text only compared with the network verdict.
+    """
+    end = time.time() + timeout
+    result = watch.wait(0)
+    if result is None and not watch.sent.is_set():
+        try:
+            wait_visible_css(driver, SWAL_SHOWN_CSS, timeout=timeout)
+        except Exception:
+            return watch.wait(0)
+        if not watch.sent.wait(0.05):
+            text1 = _read_swal_text(driver)
+            if DEBUG: print(f"[SWAL #1] {text1}")
+            if DUPLICATE_MSG in text1:
+                return None   # answered without a request we saw; let the popup path handle it
+            _click_swal_confirm(driver)
+            if not watch.sent.wait(NET_REQUEST_WAIT):
+                return None
+    result = watch.wait(max(0.0, end - time.time()))
+    if result is None:
+        return None
+
+    try:
+        wait_visible_css(driver, SWAL_SHOWN_CSS, timeout=SWAL_CROSSCHECK_WAIT)
+        text = _read_swal_text(driver)
+        _click_swal_confirm(driver)
+    except Exception:
+        text = ""
+    if DEBUG and text: print(f"[SWAL] {text}")
+    if text and (DUPLICATE_MSG in text) != (result == "duplicate"):
+        log(f"[net] network says '{result}' but the popup says: {text}")
+    return result
+
 # ---------- N S S O  L O G I N  H O O K ----------
 def maybe_login_nsso(driver):
     """
@@ -526,9 +1675,7 @@ def maybe_login_nsso(driver):
     Reads password from env var SNU_PW; if missing, prompts once in console.
     """
     try:
-        pw_box = WebDriverWait(driver, 3).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "#login_pwd"))
-        )
+        pw_box = wait_find_css(driver, "#login_pwd", timeout=3)
         # We’re on the login page
         password = os.environ.get("SNU_PW", "")
         if not password:
@@ -537,218 +1684,1533 @@ def maybe_login_nsso(driver):
 
         pw_box.clear()
         pw_box.send_keys(password)
-        time.sleep(0.2)
+        settle(driver, 0.2)
 
-        btn = WebDriverWait(driver, 5).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, "#loginProcBtn"))
-        )
+        btn = wait_clickable_css(driver, "#loginProcBtn", timeout=5)
         try:
             btn.click()
         except Exception:
             driver.execute_script("arguments[0].click();", btn)
 
-        time.sleep(3.0)
+        settle(driver, 3.0)
         wait_for_idle(driver, timeout=20)
     except Exception:
         # No nsso login page; continue normally
         pass
 
+# ---------- HTTP ENGINE ----------
+def build_http_session(driver=None, base_url=None, cookies=None):
+    """
+    Keep-alive requests.Session carrying the authenticated SSIMS cookies.
+    Cookies come from the logged-in Chrome (driver) or an explicit list of
+    {"name", "value", "domain", "path"} dicts.
+    """
+    base_url = base_url or HTTP_BASE_URL
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "Accept": "application/json, text/javascript, */*; q=0.01",
+        "X-Requested-With": "XMLHttpRequest",
+        "Referer": base_url + "/",
+        "Origin": base_url,
+        "Connection": "keep-alive",
+    })
+    if driver is not None:
+        try:
+            session.headers["User-Agent"] = driver.execute_script("return navigator.userAgent;")
+        except Exception:
+            pass
+        if cookies is None:
+            cookies = driver.get_cookies()
+    for c in cookies or []:
+        session.cookies.set(c["name"], c["value"], domain=c.get("domain", ""), path=c.get("path", "/"))
+    return session
+
+def discover_http_codes(driver):
+    """
+    Read S_BD_CD / S_SPACE_CD values for our building and rooms from the filter
+    lists on the page (data-value / data-code / value attributes). Only fills gaps
+    left in HTTP_BUILDING_CODE / HTTP_SPACE_CODES.
+    """
+    js = """
+    const pick = el => el ? (el.getAttribute('data-value') || el.getAttribute('data-code')
+                             || el.getAttribute('value') || '') : '';
+    const out = {building: pick(document.querySelector(arguments[0])), rooms: {}};
+    for (const [code, css] of Object.entries(arguments[1])) out.rooms[code] = pick(document.querySelector(css));
+    return out;
+    """
+    building, rooms = HTTP_BUILDING_CODE, dict(HTTP_SPACE_CODES)
+    try:
+        found = driver.execute_script(js, "#S_BD_CD > ul > li:nth-child(4)", ROOM_SELECTORS) or {}
+    except Exception:
+        found = {}
+    if not building:
+        building = found.get("building", "")
+    for code, value in (found.get("rooms") or {}).items():
+        if value and not rooms.get(code):
+            rooms[code] = value
+    return building, rooms
+
+def build_reservation_payload(target_date, weekday, building_code, space_code):
+    """Same fields the reservation form posts on #reserInsertBtn."""
+    start_hour, start_min, end_hour, end_min = slot_times(weekday)
+    return {
+        "BD_CD": building_code,
+        "SPACE_CD": space_code,
+        "SPACE_RESER_USE_DT": target_date.strftime(HTTP_DATE_FORMAT),
+        "RESER_APLY_TYPE_CD": PURPOSE_OTHERS,
+        "SPACE_RESER_FR_T": start_hour,
+        "SPACE_RESER_FR_M": start_min,
+        "SPACE_RESER_TO_T": end_hour,
+        "SPACE_RESER_TO_M": end_min,
+        "SPACE_RESER_TTL": RESERVATION_TITLE,
+        "SPACE_RESER_CTNT": RESERVATION_CONTENT,
+        "APLYT_CNTINFO": OPTIONAL_PHONE,
+        "APLYT_EMAIL": OPTIONAL_EMAIL,
+        "PERS_INFO_UTILIZ_CONSNT_YN": "Y",
+        "ATTNT_CTNT_CONSNT_YN": "Y",
+    }
+
+LOGIN_PAGE_MARKERS = ("login_pwd", "loginProcBtn")   # element ids of the nsso password page
+
+def is_login_page(text):
+    return any(m in (text or "") for m in LOGIN_PAGE_MARKERS)
+
+def classify_reserve_response(status_code, body):
+    """
+    Map a reservation-insert response to "success" | "duplicate" | "session" | "invalid" | "fail".
+    Only an explicit positive result counts as success; "invalid" (validation error)
+    and "session" (login page) are explicit rejections; anything unrecognised is
+    "fail": the server may or may not have booked.
+    """
+    body = body or ""
+    if DUPLICATE_MSG in body:
+        return "duplicate"
+    if status_code in (401, 403) or is_login_page(body):
+        return "session"
+    if status_code != 200:
+        return "fail"
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return "fail"
+    if not isinstance(data, dict):
+        return "fail"
+    for key in ("result", "status", "resultCode", "RESULT"):
+        val = str(data.get(key, "")).strip().lower()
+        if val in ("success", "ok", "s", "y", "true", "0000"):
+            return "success"
+        if val in ("fail", "error", "e", "n", "false"):
+            return "invalid"
+    return "fail"
+
+def http_try_book_room(session, target_date, weekday, room_code, building_code, space_codes,
+                       base_url=None):
+    """
+    One room over HTTP: search the day for the room, then post the reservation insert.
+    Returns: "success" | "duplicate" | "fail" (nothing booked; let Selenium handle it)
+    | "unknown" (the insert went out and may have booked; the room must not be tried again)
+    """
+    base_url = base_url or HTTP_BASE_URL
+    space_code = space_codes.get(room_code, "")
+    if not building_code or not space_code:
+        log(f"[http] no building/space code for room {room_code}; skipping HTTP engine.")
+        return "fail"
+
+    day = target_date.strftime(HTTP_DATE_FORMAT)
+    t0 = time.perf_counter()
+    try:
+        r = session.post(base_url + HTTP_SEARCH_PATH, timeout=HTTP_TIMEOUT, data={
+            "S_BD_CD": building_code, "S_SPACE_CD": space_code, "S_SPACE_RESER_USE_DT": day,
+        })
+    except requests.RequestException as e:
+        log(f"[http] search for room {room_code} error: {e}; falling back.")
+        return "fail"
+    if r.status_code != 200 or is_login_page(r.text):
+        log(f"[http] search for room {room_code} -> HTTP {r.status_code}; falling back.")
+        return "fail"
+    if slot_is_flexible(weekday):
+        try:
+            note_occupancy(target_date.strftime("%Y-%m-%d"), room_code, booked_windows(json.loads(r.text)))
+        except ValueError:
+            pass
+        if not choose_slot(room_code, target_date.strftime("%Y-%m-%d"), weekday):
+            return "duplicate"
+
+    # once the insert is sent only a clear rejection hands the room to Selenium
+    payload = build_reservation_payload(target_date, weekday, building_code, space_code)
+    try:
+        r = session.post(base_url + HTTP_INSERT_PATH, data=payload, timeout=HTTP_TIMEOUT)
+    except requests.RequestException as e:
+        log(f"[http] room {room_code} insert error: {e}")
+        return verify_insert(session, target_date, weekday, room_code, building_code, space_code, base_url)
+    result = classify_reserve_response(r.status_code, r.text)
+    log(f"[http] room {room_code}: {result} (HTTP {r.status_code}, {(time.perf_counter() - t0) * 1000:.0f} ms)")
+    if result in ("success", "duplicate"):
+        return result
+    if result in ("invalid", "session"):
+        return "fail"
+    return verify_insert(session, target_date, weekday, room_code, building_code, space_code, base_url)
+
+def verify_insert(session, target_date, weekday, room_code, building_code, space_code, base_url=None):
+    """
+    After an insert without a clear answer, search the room's day again: a slot
+    that is still free was not booked ("fail"); taken or unreadable is "unknown"
+    (the booking may be ours).
+    """
+    state, body = fetch_room_day(session, target_date, building_code, space_code, base_url)
+    status = "unknown"
+    if state == "ok":
+        try:
+            status = slot_status(json.loads(body), slot_window(slot_times(weekday)))
+        except ValueError:
+            pass
+    log(f"[http] room {room_code} searched again after an unclear insert: slot {status}.")
+    return "fail" if status == "free" else "unknown"
+
+def http_book_rooms(driver, target_date, weekday, rooms):
+    """
+    Run the HTTP engine over rooms in priority order.
+    Returns (status, room, rooms_left_for_selenium): status "success" | "fail" |
+    "unknown" (room may be booked; the slot must end there).
+    """
+    session = build_http_session(driver)
+    building_code, space_codes = discover_http_codes(driver)
+    try:
+        for i, room in enumerate(rooms):
+            t0 = time.monotonic()
+            status = http_try_book_room(session, target_date, weekday, room, building_code, space_codes)
+            if status != "fail":   # "fail" = not settled; the UI path tries the room again
+                note_attempt(target_date, room, status, t0, "http")
+            if status in ("success", "unknown"):
+                return status, room, []
+            if status == "fail":
+                return "fail", None, rooms[i:]
+        return "fail", None, []
+    finally:
+        session.close()
+
+# ---------- AVAILABILITY PRE-SCAN ----------
+_PRESCAN_CACHE = {}   # (room, "YYYY-MM-DD", start_min, end_min) -> (monotonic time, status)
+
+def _minutes_of(value):
+    """'13:00', '1300', '13:00:00' or '2025-09-10T13:00:00' -> minutes since midnight (None if unreadable)."""
+    text = str(value or "").strip()
+    if "T" in text:
+        text = text.split("T", 1)[1]
+    elif " " in text:
+        text = text.rsplit(" ", 1)[1]
+    digits = text.replace(":", "")[:4]
+    if len(digits) < 4 or not digits.isdigit():
+        return None
+    return int(digits[:2]) * 60 + int(digits[2:])
+
+def booked_windows(data):
+    """(start_min, end_min) of every booking in a search response; None if the format is not recognised."""
+    rows = data
+    if isinstance(data, dict):
+        rows = next((data[k] for k in ("list", "data", "rows", "resultList", "events")
+                     if isinstance(data.get(k), list)), None)
+    if not isinstance(rows, list):
+        return None
+    windows = []
+    for row in rows:
+        if not isinstance(row, dict):
+            return None
+        if "SPACE_RESER_FR_T" in row:
+            start = _minutes_of(f"{row['SPACE_RESER_FR_T']}{row.get('SPACE_RESER_FR_M', '00')}")
+            end = _minutes_of(f"{row.get('SPACE_RESER_TO_T', '')}{row.get('SPACE_RESER_TO_M', '00')}")
+        else:
+            start, end = _minutes_of(row.get("start")), _minutes_of(row.get("end"))
+        if start is None or end is None:
+            return None
+        windows.append((start, end))
+    return windows
+
+def fetch_room_day(session, target_date, building_code, space_code, base_url=None):
+    """
+    The calendar search for one room's day.
+    Returns (state, body): state "ok" | "login" (session expired) | "error".
+    """
+    base_url = base_url or HTTP_BASE_URL
+    try:
+        r = session.post(base_url + HTTP_SEARCH_PATH, timeout=HTTP_TIMEOUT, data={
+            "S_BD_CD": building_code, "S_SPACE_CD": space_code,
+            "S_SPACE_RESER_USE_DT": target_date.strftime(HTTP_DATE_FORMAT),
+        })
+    except requests.RequestException:
+        return "error", None
+    if is_login_page(r.text) or r.status_code in (401, 403):
+        return "login", r.text
+    return ("ok" if r.status_code == 200 else "error"), r.text
+
+def slot_status(data, window):
+    """Slot (start_min, end_min) in a parsed search response: "free" | "taken" | "closed" | "unknown"."""
+    if isinstance(data, dict) and data.get("available") is False:
+        return "closed"
+    windows = booked_windows(data)
+    if windows is None:
+        return "unknown"
+    start, end = window
+    return "taken" if any(s < end and start < e for s, e in windows) else "free"
+
+def scan_room(session, target_date, room_code, building_code, space_code, window, base_url=None):
+    """
+    Search one room's day and check the slot.
+    Returns: "free" | "taken" | "closed" (search lists nothing bookable) | "unknown"
+    """
+    state, body = fetch_room_day(session, target_date, building_code, space_code, base_url)
+    if state != "ok":
+        return "unknown"
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return "unknown"
+    status = slot_status(data, window)
+    if status != "closed":
+        note_occupancy(target_date.strftime("%Y-%m-%d"), room_code, booked_windows(data))
+    return status
+
+def prescan_rooms(driver, target_date, weekday, rooms):
+    """
+    Scan every room in ROOM_SELECTORS at once and reorder `rooms` for the attempts:
+    free rooms first, then unreadable ones, each in priority order; taken/closed
+    rooms are dropped. Results are cached for PRESCAN_TTL seconds.
+    Returns (ordered_rooms, avoided_attempts).
+    """
+    window = slot_window(slot_spec(weekday)[0])
+    day = target_date.strftime("%Y-%m-%d")
+    now = time.monotonic()
+    status = {}
+    for room in ROOM_SELECTORS:
+        hit = _PRESCAN_CACHE.get((room, day) + window)
+        if hit and now - hit[0] < PRESCAN_TTL:
+            status[room] = hit[1]
+
+    todo = [r for r in ROOM_SELECTORS if r not in status]
+    if todo:
+        from concurrent.futures import ThreadPoolExecutor
+        building_code, space_codes = discover_http_codes(driver)
+        if not building_code:
+            log("[prescan] no building code; keeping the configured order.")
+            return list(rooms), 0
+        session = build_http_session(driver)
+        session.mount(HTTP_BASE_URL, requests.adapters.HTTPAdapter(pool_maxsize=PRESCAN_WORKERS, max_retries=0))
+        t0 = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=PRESCAN_WORKERS) as pool:
+                futures = {
+                    room: pool.submit(scan_room, session, target_date, room, building_code, space_codes[room], window)
+                    for room in todo if space_codes.get(room)
+                }
+                for room in todo:
+                    status[room] = futures[room].result() if room in futures else "unknown"
+                    _PRESCAN_CACHE[(room, day) + window] = (time.monotonic(), status[room])
+        finally:
+            session.close()
+        log(f"[prescan] scanned {len(todo)} rooms in {(time.perf_counter() - t0) * 1000:.0f} ms.")
+
+    log("[prescan] " + ", ".join(f"{r}={status.get(r, 'unknown')}" for r in rooms))
+    free = [r for r in rooms if status.get(r) == "free"]
+    if slot_is_flexible(weekday):
+        # a taken preferred slot may leave another acceptable one; best slot first
+        t0 = time.perf_counter()
+        ranked = best_slots(day, [r for r in rooms if status.get(r) in ("free", "taken")], weekday)
+        free = [r for r, _ in ranked]
+        if ranked:
+            room, (start, end) = ranked[0]
+            log(f"[slot] best: room {room} {start // 60:02d}:{start % 60:02d}-{end // 60:02d}:{end % 60:02d} "
+                f"({(time.perf_counter() - t0) * 1e6:.0f} us for {len(rooms)} rooms)")
+    unknown = [r for r in rooms if status.get(r, "unknown") == "unknown"]
+    avoided = len(rooms) - len(free) - len(unknown)
+    if avoided:
+        log(f"[prescan] skipping {avoided} occupied room(s): "
+            + ", ".join(r for r in rooms if r not in free and r not in unknown) + " (attempts avoided).")
+    return free + unknown, avoided
+
+# ---------- FLEXIBLE SLOT FINDER ----------
+# Occupancy index: ("YYYY-MM-DD", room) -> merged booked intervals in minutes,
+# sorted. Filled from the pre-scan / HTTP searches (every room) and from the
+# rendered FullCalendar view of the room being tried (one script call). A slot is
+# free when the last interval starting before its end is over by its start (bisect).
+_OCCUPANCY = {}
+
+_CALENDAR_EVENTS_JS = """
+const day = arguments[0];
+const zone = document.querySelector('#calendarZone') || document.querySelector('.fc');
+if (!zone) return null;
+const re = /(\\d{1,2}):(\\d{2})\\s*[-~\\u2013]\\s*(\\d{1,2}):(\\d{2})/;
+const out = [];
+for (const el of zone.querySelectorAll('.fc-event, .fc-timegrid-event, .fc-time-grid-event')) {
+  const col = el.closest('[data-date]');
+  if (col && /^\\d{4}-\\d{2}-\\d{2}$/.test(col.dataset.date) && col.dataset.date !== day) continue;
+  if (el.dataset.start && el.dataset.end) { out.push([el.dataset.start, el.dataset.end]); continue; }
+  const m = re.exec(el.textContent);
+  if (!m) return null;
+  out.push([m[1].padStart(2, '0') + ':' + m[2], m[3].padStart(2, '0') + ':' + m[4]]);
+}
+return out;
+"""
+
+def merge_intervals(windows):
+    merged = []
+    for start, end in sorted(windows):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def note_occupancy(day, room, windows):
+    """Index a room's booked windows for day (None = unreadable: forget what was known)."""
+    if windows is None:
+        _OCCUPANCY.pop((day, room), None)
+    else:
+        _OCCUPANCY[(day, room)] = merge_intervals(windows)
+
+def slot_free(busy, start, end):
+    i = bisect.bisect_left(busy, (end,))
+    return i == 0 or busy[i - 1][1] <= start
+
+@functools.lru_cache(maxsize=32)
+def slot_candidates(times, min_minutes, tolerance, step=SLOT_STEP):
+    """
+    Every acceptable (start, end), best first: closest to the preferred slot, then
+    longest, then earliest. Starts and ends are multiples of step (the form's minute
+    lists); the preferred window is widened to the step grid.
+    """
+    pref_start, pref_end = slot_window(times)
+    pref_start, pref_end = pref_start // step * step, -(-pref_end // step) * step
+    lo, hi = max(0, pref_start - tolerance), min(24 * 60, pref_end + tolerance)
+    longest = pref_end - pref_start
+    cands = [(start, end)
+             for start in range(-(-lo // step) * step, hi, step)
+             for end in range(-(-(start + max(min_minutes, step)) // step) * step, min(hi, start + longest) + 1, step)]
+    cands.sort(key=lambda w: (abs(w[0] - pref_start) + abs(w[1] - pref_end), w[0] - w[1], w[0]))
+    return tuple(cands)
+
+def best_slots(day, rooms, weekday):
+    """
+    [(room, (start, end))] for the rooms whose occupancy on day is indexed and that
+    have an acceptable free slot: each room's best slot, best rooms first (ties in
+    `rooms` order).
+    """
+    times, min_minutes, tolerance = slot_spec(weekday)
+    cands = slot_candidates(times, min_minutes, tolerance)
+    found = []
+    for rank, room in enumerate(rooms):
+        busy = _OCCUPANCY.get((day, room))
+        if busy is None:
+            continue
+        for i, (start, end) in enumerate(cands):
+            if slot_free(busy, start, end):
+                found.append((i, rank, room, (start, end)))
+                break
+    found.sort()
+    return [(room, window) for _, _, room, window in found]
+
+def choose_slot(room, day, weekday):
+    """
+    Set the times the form filler books in room (slot_times). A fixed slot, or a room
+    whose occupancy is not indexed, keeps the preferred times; otherwise the room's
+    best free slot is used. Returns False if the room has no acceptable free slot.
+    """
+    _PICK.clear()
+    if not slot_is_flexible(weekday) or (day, room) not in _OCCUPANCY:
+        return True
+    best = best_slots(day, [room], weekday)
+    if not best:
+        log(f"[slot] room {room}: nothing free within the tolerance on {day}.")
+        return False
+    start, end = best[0][1]
+    _PICK.update(room=room, times=(f"{start // 60:02d}", f"{start % 60:02d}", f"{end // 60:02d}", f"{end % 60:02d}"))
+    log(f"[slot] room {room}: booking{picked_note()}.")
+    return True
+
+def picked_note():
+    """' at HH:MM-HH:MM' when a flexible slot was picked (for the success message)."""
+    if not _PICK:
+        return ""
+    sh, sm, eh, em = _PICK["times"]
+    return f" at {sh}:{sm}-{eh}:{em}"
+
+def read_calendar_occupancy(driver, room, target_date):
+    """Index the booked windows of the rendered calendar view (one script call); None if unreadable."""
+    day = target_date.strftime("%Y-%m-%d")
+    try:
+        rows = driver.execute_script(_CALENDAR_EVENTS_JS, day)
+    except WebDriverException:
+        rows = None
+    if rows is None:
+        return None
+    windows = [(_minutes_of(start), _minutes_of(end)) for start, end in rows]
+    if any(None in w for w in windows):
+        return None
+    note_occupancy(day, room, windows)
+    return windows
+
+# ---------- SESSION CACHE ----------
+FILTER_STATE_PROBE = {
+    "url": "location.href",
+    "lang": "document.documentElement.lang || ''",
+    "building": f"(document.querySelector({json.dumps(BUILDING_BUTTON_CSS)}).innerText || '').trim()",
+    "login": f"!!{js_present('#login_pwd')}",
+}
+
+_SESSION = {}   # filter state of this run: url / lang / building
+
+def note_filter_state(driver, state=None):
+    """
+    Remember where the filtered home view lives (saved with the cookies at the end
+    of the run) in `state`, default _SESSION (the spare browser keeps its own).
+    """
+    try:
+        st = probe_state(driver, FILTER_STATE_PROBE)
+    except Exception:
+        return
+    if not st.get("login"):
+        (_SESSION if state is None else state).update({k: st.get(k) or "" for k in ("url", "lang", "building")})
+
+def _session_cookie_wanted(domain):
+    domain = (domain or "").lstrip(".")
+    host = START_URL.split("//", 1)[-1].split("/", 1)[0].split(":")[0]
+    return bool(domain) and (host.endswith(domain) or any(domain.endswith(d) for d in SESSION_COOKIE_DOMAINS))
+
+def load_session_cache():
+    if not SESSION_CACHE_FILE:
+        return None
+    try:
+        with open(SESSION_CACHE_FILE, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if time.time() - cache.get("saved_at", 0) > SESSION_CACHE_MAX_AGE or not cache.get("cookies"):
+        log("[session] cache too old; logging in normally.")
+        return None
+    return cache
+
+def clear_session_cache():
+    try:
+        os.remove(SESSION_CACHE_FILE)
+    except OSError:
+        pass
+
+def save_session_cache(driver):
+    """Persist this browser's SSIMS/nsso cookies plus the filter state noted during the run."""
+    if not SESSION_CACHE_FILE or not _SESSION.get("url"):
+        return
+    try:
+        # all domains (nsso lives on another host than SSIMS); get_cookies() only sees the current one
+        cookies = driver.execute_cdp_cmd("Network.getAllCookies", {}).get("cookies", [])
+    except Exception:
+        cookies = driver.get_cookies()
+    cookies = [c for c in cookies if _session_cookie_wanted(c.get("domain"))]
+    if not cookies:
+        return
+    cache = dict(_SESSION, cookies=cookies, saved_at=time.time())
+    try:
+        tmp = SESSION_CACHE_FILE + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False)
+        os.replace(tmp, SESSION_CACHE_FILE)
+        log(f"[session] saved {len(cookies)} cookies and filter state.")
+    except OSError as e:
+        log(f"[session] could not save cache: {e}")
+
+def session_cache_valid(cache):
+    """One cheap GET of START_URL with the cached cookies: True unless it lands on the login page."""
+    session = build_http_session(base_url=START_URL.rstrip("/"), cookies=cache["cookies"])
+    try:
+        r = session.get(START_URL, timeout=SESSION_CHECK_TIMEOUT)
+        return r.status_code == 200 and not is_login_page(r.text)
+    except requests.RequestException:
+        return False
+    finally:
+        session.close()
+
+def inject_cookies(driver, cookies):
+    keep = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite")
+    params = []
+    for c in cookies:
+        p = {k: c[k] for k in keep if k in c}
+        exp = c.get("expires", c.get("expiry"))
+        if exp and exp > 0 and not c.get("session"):
+            p["expires"] = exp
+        params.append(p)
+    driver.execute_cdp_cmd("Network.setCookies", {"cookies": params})
+
+def redo_filters(driver, want, st, state=None):
+    """Redo only the filter steps (English, building) the page shows differently from `want`."""
+    if want.get("lang") and st.get("lang") != want["lang"]:
+        click_english(driver)
+    if not want.get("building") or st.get("building") != want["building"]:
+        select_building(driver)
+    note_filter_state(driver, state)
+
+def restore_session(driver):
+    """
+    Warm start from SESSION_CACHE_FILE: validate, inject cookies, open the cached
+    filtered view and redo only the filter steps the page did not keep.
+    Returns True when the page is logged in with the building selected
+    (the first attempt can use start_mode="room_only"); False = go the normal way.
+    """
+    cache = load_session_cache()
+    if not cache:
+        return False
+    t0 = time.perf_counter()
+    if not session_cache_valid(cache):
+        log(f"[session] cached session expired ({(time.perf_counter() - t0) * 1000:.0f} ms check); logging in normally.")
+        clear_session_cache()
+        return False
+    try:
+        inject_cookies(driver, cache["cookies"])
+    except Exception as e:
+        log(f"[session] could not inject cookies: {e}")
+        return False
+
+    driver.get(cache.get("url") or START_URL)
+    wait_for_idle(driver)
+    st = probe_state(driver, FILTER_STATE_PROBE)
+    if st.get("login"):
+        log("[session] landed on the login page despite a valid check; logging in normally.")
+        clear_session_cache()
+        return False
+    redo_filters(driver, cache, st)
+    log(f"[session] warm start from cache ({(time.perf_counter() - t0) * 1000:.0f} ms).")
+    return True
+
+# ---------- IN-PLACE ROOM SWITCH ----------
+# After a duplicate the filled form is still open; only its space field has to
+# change. Space codes are read from the filter list while on the home page.
+_SPACE_CODES = {}
+
+def remember_space_codes(driver):
+    if all(code in _SPACE_CODES for code in ROOM_SELECTORS):
+        return
+    _, rooms = discover_http_codes(driver)
+    _SPACE_CODES.update({code: value for code, value in rooms.items() if value})
+
+_SWITCH_SPACE_JS = """
+const code = arguments[0];
+const fields = [...document.querySelectorAll("#SPACE_CD, [name='SPACE_CD']")];
+if (!fields.length) return {ok: false, reason: 'no SPACE_CD field on the form'};
+for (const f of fields) {
+  if (f.tagName === 'SELECT' && ![...f.options].some(o => o.value === code)) return {ok: false, reason: 'room not offered'};
+  f.value = code;
+  f.dispatchEvent(new Event('change', {bubbles: true}));
+}
+const v = id => { const e = document.getElementById(id); return e ? (e.type === 'checkbox' ? e.checked : e.value) : null; };
+return {ok: fields.every(f => f.value === code),
+        purpose: v('RESER_APLY_TYPE_CD'), title: v('SPACE_RESER_TTL'), date: v('SPACE_RESER_USE_DT'),
+        from_t: v('SPACE_RESER_FR_T'), from_m: v('SPACE_RESER_FR_M'),
+        to_t: v('SPACE_RESER_TO_T'), to_m: v('SPACE_RESER_TO_M'),
+        consent: v('PERS_INFO_UTILIZ_CONSNT_YN') && v('ATTNT_CTNT_CONSNT_YN')};
+"""
+
+def switch_room_in_place(driver, room_code, target_date):
+    """
+    Point the open, filled form at room_code and check nothing else was reset.
+    Returns True when the form can be resubmitted as is.
+    """
+    code = _SPACE_CODES.get(room_code)
+    if not code:
+        log(f"[switch] no space code for room {room_code}.")
+        return False
+    try:
+        res = driver.execute_script(_SWITCH_SPACE_JS, code) or {}
+    except Exception as e:
+        log(f"[switch] script error: {e}")
+        return False
+    if not res.get("ok") or not form_still_filled(res, target_date):
+        log(f"[switch] cannot reuse the form for room {room_code}: {res.get('reason') or res}")
+        return False
+    return True
+
+def form_still_filled(values, target_date):
+    """
+    values: purpose / title / date / from_t / from_m / to_t / to_m / consent as read
+    from the form. True only if all of them match what target_date's slot needs.
+    """
+    def number(value):   # "13 h", "13" -> 13
+        digits = re.match(r"\s*(\d+)", str(value or ""))
+        return int(digits.group(1)) if digits else None
+
+    times = [number(values.get(k)) for k in ("from_t", "from_m", "to_t", "to_m")]
+    return bool(values.get("purpose") == PURPOSE_OTHERS and values.get("title") == RESERVATION_TITLE
+                and re.sub(r"\D", "", str(values.get("date") or "")) == target_date.strftime("%Y%m%d")
+                and times == [int(x) for x in slot_times(target_date.weekday())] and values.get("consent"))
+
+def resubmit_for_room(driver, target_date, room_code):
+    """
+    Retry room_code on the form left open by a duplicate.
+    Returns: "success" | "duplicate" | "unknown" | "fail" ("fail" = form not reusable, nothing was submitted)
+    """
+    log(f"-> Switching the open form to room {room_code}")
+    trace_room(room_code)
+    with span("room_switch") as sp:
+        if not switch_room_in_place(driver, room_code, target_date):
+            sp["outcome"] = "fallback"
+            return "fail"
+    _CHECKPOINT["room"] = room_code
+    return submit_staged_form(driver, fast=True, home_after_duplicate=not IN_PLACE_RETRY)
+
+# ---------- HOT SPARE ----------
+_SPARE = {"driver": None, "thread": None, "state": {}}
+
+def _warm_spare(cookies, state):
+    """
+    Spare thread: launch, take over the session cookies, park on the filtered home
+    view. Its filter state goes to _SPARE["state"], never to the run's _SESSION.
+    """
+    t0 = time.monotonic()
+    driver = None
+    own = _SPARE["state"] = {}
+    try:
+        driver = build_driver(profile_dir=SPARE_PROFILE_DIR or PROFILE_DIR + "_spare")
+        inject_cookies(driver, cookies)
+        driver.get(state.get("url") or START_URL)
+        wait_for_idle(driver)
+        maybe_login_nsso(driver)
+        if state.get("url"):
+            redo_filters(driver, state, probe_state(driver, FILTER_STATE_PROBE), own)
+        else:   # the run has not set its filters yet
+            open_filters_and_select_building(driver, own)
+        _SPARE["driver"] = driver
+        trace_event("spare_warm", t0, time.monotonic(), "ok")
+        log(f"[spare] standby browser ready ({time.monotonic() - t0:.1f}s).")
+    except Exception as e:
+        trace_event("spare_warm", t0, time.monotonic(), f"error:{type(e).__name__}")
+        log(f"[spare] could not prepare a standby browser: {e}")
+        if driver is not None:
+            _quit_quietly(driver)
+
+def start_spare(driver):
+    """
+    Warm a standby browser from the logged-in `driver` (no-op if one exists or is
+    warming). Called once the first submit has its answer, so the second Chrome
+    never competes with the release-time attempt.
+    """
+    if not SPARE_DRIVER or _SPARE["driver"] is not None or (_SPARE["thread"] and _SPARE["thread"].is_alive()):
+        return
+    try:
+        cookies = driver.execute_cdp_cmd("Network.getAllCookies", {}).get("cookies", [])
+    except Exception as e:
+        log(f"[spare] no cookies to hand over: {e}")
+        return
+    state = {k: _SESSION.get(k) for k in ("url", "lang", "building")}
+    _SPARE["thread"] = threading.Thread(target=_warm_spare, args=(cookies, state), daemon=True)
+    _SPARE["thread"].start()
+
+def take_spare():
+    """The standby browser (waiting up to SPARE_WAIT if it is still warming), or None."""
+    thread = _SPARE["thread"]
+    if thread is not None and thread.is_alive():
+        thread.join(SPARE_WAIT)
+    driver, _SPARE["driver"] = _SPARE["driver"], None
+    return driver
+
+def _quit_quietly(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+def close_spare():
+    spare = take_spare()
+    if spare is not None:
+        _quit_quietly(spare)
+
+# ---------- CHECKPOINTS & RECOVERY ----------
+# stage_room records every phase it completes, with the values it set, in
+# _CHECKPOINT. After a failure recover() gets a working session back (the same
+# browser if it still answers, else a reattached daemon tab or a new browser) and
+# resume_mode() checks which checkpoint the page still satisfies, so the retry
+# only redoes the phases that were actually lost.
+_CHECKPOINT = {"room": None, "date": None, "done": [], "values": {}}
+
+CRASH_MARKERS = ("tab crashed", "invalid session id", "chrome not reachable", "no such window",
+                 "disconnected", "target window already closed")
+
+FORM_STATE_PROBE = dict(FILTER_STATE_PROBE, **{
+    "form": js_present("#SPACE_RESER_TTL"),
+    "purpose": "document.getElementById('RESER_APLY_TYPE_CD').value",
+    "title": "document.getElementById('SPACE_RESER_TTL').value",
+    "date": "(document.getElementById('SPACE_RESER_USE_DT') || {}).value",
+    "from_t": "document.getElementById('SPACE_RESER_FR_T').value",
+    "from_m": "document.getElementById('SPACE_RESER_FR_M').value",
+    "to_t": "document.getElementById('SPACE_RESER_TO_T').value",
+    "to_m": "document.getElementById('SPACE_RESER_TO_M').value",
+    "consent": "document.getElementById('PERS_INFO_UTILIZ_CONSNT_YN').checked"
+               " && document.getElementById('ATTNT_CTNT_CONSNT_YN').checked",
+})
+
+def start_checkpoint(room_code, target_date):
+    _CHECKPOINT.update(room=room_code, date=target_date.strftime("%Y-%m-%d"), done=[], values={})
+
+def checkpoint(phase, **values):
+    _CHECKPOINT["done"].append(phase)
+    _CHECKPOINT["values"].update(values)
+
+def submit_pending():
+    """True between the #reserInsertBtn click and its verdict: the insert may have gone out."""
+    done = _CHECKPOINT["done"]
+    return "submit" in done and "submitted" not in done
+
+def failure_kind(exc):
+    """"session_lost" | "driver_crash" for failures worth a resume, None for ordinary errors."""
+    if isinstance(exc, RuntimeError) and "SESSION_LOST_AFTER_HOME" in str(exc):
+        return "session_lost"
+    if isinstance(exc, WebDriverException) and any(m in str(exc).lower() for m in CRASH_MARKERS):
+        return "driver_crash"
+    return None
+
+def resume_mode(driver, room_code, target_date):
+    """
+    Where a retry of room_code can start, from what the browser still shows:
+    "filled" (this room's form is open and filled: only submit), "form" (its form
+    is open), "room_only" (home view with the building kept) or "full".
+    Switches to the window the mode refers to. Raises if the session is dead.
+    """
+    done = _CHECKPOINT["done"] if _CHECKPOINT["room"] == room_code else []
+    form_handle = _CHECKPOINT["values"].get("handle") if "form_landing" in done else None
+    handles = driver.window_handles
+    ordered = sorted(handles, key=lambda h: h != form_handle)
+    home = None
+    for handle in ordered:
+        driver.switch_to.window(handle)
+        driver.switch_to.default_content()
+        st = probe_state(driver, FORM_STATE_PROBE)
+        if st.get("login"):
+            continue
+        if handle == form_handle and st.get("form"):
+            return "filled" if "form_fill" in done and form_still_filled(st, target_date) else "form"
+        if home is None and _SESSION.get("building") and st.get("building") == _SESSION["building"]:
+            home = handle
+    if home is not None:
+        driver.switch_to.window(home)
+        return "room_only"
+    return "full"
+
+def reopen_start(driver):
+    """Back to the start page, logged in; through the session cache if it gives the filtered view."""
+    if SESSION_CACHE_FILE and restore_session(driver):
+        return "room_only"
+    driver.get(START_URL)
+    wait_for_idle(driver)
+    settle(driver, 1.0)
+    maybe_login_nsso(driver)
+    return "full"
+
+def fresh_driver(driver):
+    """
+    Drop a dead session for the hot spare if there is one (the dead browser is quit in
+    the background; a new spare is warmed after the next submit), else build_driver(),
+    which reattaches to the daemon when ATTACH_TO_DAEMON.
+    """
+    close_submit_watches()
+    spare = take_spare() if SPARE_DRIVER else None
+    if spare is None:
+        _quit_quietly(driver)
+        return build_driver()
+    log("[spare] switching to the standby browser.")
+    threading.Thread(target=_quit_quietly, args=(driver,), daemon=True).start()
+    if _SPARE["state"].get("url"):
+        _SESSION.update(_SPARE["state"])   # the run now lives on the spare's filtered view
+    return spare
+
+def recover(driver, kind, room_code, target_date):
+    """
+    Get a usable page back after a failure of `kind` ("session_lost" |
+    "driver_crash" | "hard_fail") and resume from the latest checkpoint still valid.
+    Returns (driver, start_mode). Recovery time is traced as a "recovery" span per kind.
+    """
+    with span("recovery", kind=kind) as sp:
+        try:
+            # after a lost session, tabs still showing the filtered view are stale:
+            # only a reload through the login gives a working page
+            mode = "full" if kind == "session_lost" else resume_mode(driver, room_code, target_date)
+        except Exception:
+            sp["new_driver"] = True
+            driver = fresh_driver(driver)
+            try:
+                mode = resume_mode(driver, room_code, target_date)   # a daemon tab may have survived
+            except Exception:
+                mode = "full"
+        if mode == "full":
+            mode = reopen_start(driver)
+        sp["outcome"] = mode
+    log(f"[recovery] {kind}: resuming with start_mode={mode}")
+    return driver, mode
+
 # ---------- ONE ATTEMPT FOR A GIVEN ROOM ----------
-def try_book_room(driver, today, target_date, room_code, start_mode="full"):
+def stage_room(driver, today, target_date, room_code, start_mode="full"):
     """
-    start_mode:
-      - "full": click English + select Building, then choose room (first attempt)
-      - "room_only": start from home and only change the room (after duplicate)
-    Returns: "success" | "duplicate" | "fail"
+    Everything up to (but not including) the #reserInsertBtn click:
+    filters, room, date, search, reservation button, filled form and consents.
+    start_mode "form" means the reservation form for room_code is already open.
+    Returns: "staged" | "fail"
     """
     log(f"-> Attempting room {room_code} (start_mode={start_mode})")
+    trace_room(room_code)
+    if not choose_slot(room_code, target_date.strftime("%Y-%m-%d"), target_date.weekday()):
+        return "fail"
 
+    if start_mode != "form":
+        start_checkpoint(room_code, target_date)
+        if open_reservation_form(driver, today, target_date, room_code, start_mode) != "form":
+            return "fail"
+    fill_reservation_form(driver, target_date.weekday())
+    if NET_RESULT:
+        arm_submit_watch(driver)
+    return "staged"
+
+def open_reservation_form(driver, today, target_date, room_code, start_mode="full"):
+    """Filters, room, date, search and the reservation button. Returns: "form" | "fail"."""
     if start_mode == "full":
-        open_filters_and_select_building(driver)
+        with span("building_select"):
+            open_filters_and_select_building(driver)
+        checkpoint("building_select", building=_SESSION.get("building"))
 
-    select_room_by_code(driver, room_code)
+    with span("room_select"):
+        if IN_PLACE_RETRY:
+            remember_space_codes(driver)
+        select_room_by_code(driver, room_code)
+    checkpoint("room_select", room=room_code)
 
     # Open calendar & pick date
-    wait_click_css(driver, "#S_SPACE_RESER_USE_DT")
-    pick_date_with_rules(driver, today, target_date)
+    with span("datepicker") as sp:
+        if FAST_DATEPICKER and set_date_fast(driver, target_date):
+            sp["outcome"] = "fast"
+        else:
+            wait_click_css(driver, "#S_SPACE_RESER_USE_DT")
+            pick_date_with_rules(driver, today, target_date)
+            sp["outcome"] = "walk"
+    checkpoint("datepicker", date=target_date.strftime("%Y-%m-%d"))
 
     # Search & wait for calendar UI
-    wait_click_css(driver, "#Tmp_resvUserBody > div > div:nth-child(1) > ul > li.col-lg-2 > div > button.btn2.searchPlusbtn")
+    with span("search"):
+        wait_click_css(driver, "#Tmp_resvUserBody > div > div:nth-child(1) > ul > li.col-lg-2 > div > button.btn2.searchPlusbtn")
     try:
-        state = wait_for_calendar_render(driver, timeout=CALENDAR_WAIT)
+        with span("calendar_render") as sp:
+            state = wait_for_calendar_render(driver, timeout=CALENDAR_WAIT)
+            sp["outcome"] = state
     except Exception:
         if DEBUG: dump_debug(driver, f"calendar_timeout_{room_code}")
         return "fail"
 
-    time.sleep(0.6)
+    settle(driver, 0.6)
     if state == "no-results":
         log("No available slots listed for this date/room.")
         return "fail"
+    if slot_is_flexible(target_date.weekday()):
+        with span("slot_pick") as sp:
+            read_calendar_occupancy(driver, room_code, target_date)
+            picked = choose_slot(room_code, target_date.strftime("%Y-%m-%d"), target_date.weekday())
+            sp["outcome"] = "picked" if picked else "none"
+            sp["times"] = slot_times(target_date.weekday()) if picked else None
+        if not picked:
+            return "fail"
 
     # Reservation button -> land on form
-    prev_handles = driver.window_handles[:]
-    if not click_reservation_button(driver, timeout=RES_BUTTON_WAIT):
-        if DEBUG: dump_debug(driver, f"no_res_btn_{room_code}")
-        return "fail"
-    land_on_reservation_form(driver, prev_handles, timeout=FORM_WAIT)
+    with span("form_landing") as sp:
+        prev_handles = driver.window_handles[:]
+        if not click_reservation_button(driver, timeout=RES_BUTTON_WAIT):
+            sp["outcome"] = "no_button"
+            if DEBUG: dump_debug(driver, f"no_res_btn_{room_code}")
+            return "fail"
+        land_on_reservation_form(driver, prev_handles, timeout=FORM_WAIT)
+    checkpoint("form_landing", handle=driver.current_window_handle)
+    return "form"
+
+def fill_reservation_form(driver, weekday):
+    """Purpose, times, contact, title/content and both consents on the open form."""
+    if BULK_FORM_FILL:
+        with span("form_fill") as sp:
+            wait_find_css(driver, f"#RESER_APLY_TYPE_CD option[value='{PURPOSE_OTHERS}']", timeout=10)
+            missed = bulk_fill(driver, reservation_fields(slot_times(weekday)))
+            for f in missed:
+                log(f"[form] {f['css']} did not stick; entering it field by field.")
+                fill_field(driver, f)
+            sp["outcome"] = "bulk" if not missed else "fallback"
+            sp["fallback"] = [f["css"] for f in missed]
+        checkpoint("form_fill", times=slot_times(weekday), title=RESERVATION_TITLE)
+        return
+
+    with span("form_fill"):
+        # Purpose + times
+        select_purpose_others(driver, timeout=10)
+        select_times_for_day(driver, weekday)
 
-    # Purpose + times
-    select_purpose_others(driver, timeout=10)
-    select_times_for_day(driver, today.weekday())
+        # Optional contact
+        fill_contact_if_empty(driver)
 
-    # Optional contact
-    fill_contact_if_empty(driver)
+        # Subject/Content
+        type_text_css(driver, "#SPACE_RESER_TTL", RESERVATION_TITLE)
+        type_text_css(driver, "#SPACE_RESER_CTNT", RESERVATION_CONTENT)
 
-    # Subject/Content
-    type_text_css(driver, "#SPACE_RESER_TTL", "Vocal Music")
-    type_text_css(driver, "#SPACE_RESER_CTNT", "Practicing Vocal Music")
+        # Agree (submit is left to the caller)
+        driver.execute_script("window.scrollBy(0, 400);"); settle(driver, CLICK_PAUSE)
+        wait_click_css(driver, "#PERS_INFO_UTILIZ_CONSNT_YN")
+        wait_click_css(driver, "#ATTNT_CTNT_CONSNT_YN")
+    checkpoint("form_fill", times=slot_times(weekday), title=RESERVATION_TITLE)
 
-    # Agree & submit
-    driver.execute_script("window.scrollBy(0, 400);"); time.sleep(CLICK_PAUSE)
-    wait_click_css(driver, "#PERS_INFO_UTILIZ_CONSNT_YN")
-    wait_click_css(driver, "#ATTNT_CTNT_CONSNT_YN")
-    wait_click_css(driver, "#reserInsertBtn")
+def submit_staged_form(driver, fast=False, home_after_duplicate=True):
+    """
+    Click #reserInsertBtn on a staged form and read the outcome.
+    fast=True fires the click in one script call (no wait/scroll/pause).
+    home_after_duplicate=False leaves the page as is (racing tabs are just closed).
+    With NET_RESULT the outcome comes from the insert response; the popups are the fallback.
+    Returns: "success" | "duplicate" | "fail" (rejected by the server: validation)
+    | "session" (answered with the login page: nothing booked, the session must be renewed)
+    | "unknown" (reading the answer failed after the click: the insert may have gone out)
+    """
+    watch = arm_submit_watch(driver) if NET_RESULT else None
+    if watch:
+        watch.reset()
+    # from here on a failure must not lead to a resubmit (see submit_pending)
+    _CHECKPOINT["done"] = [p for p in _CHECKPOINT["done"] if p not in ("submit", "submitted")]
+    checkpoint("submit")
+    with span("submit"):
+        if fast:
+            driver.execute_script("document.querySelector('#reserInsertBtn').click();")
+        else:
+            wait_click_css(driver, "#reserInsertBtn")
 
     # Handle SweetAlert2 popup
-    result = handle_swal_after_reserve(driver, timeout=12)
-    if result == "duplicate" or wait_for_text_present(driver, "예약이 중복되었습니다", timeout=3):
+    with span("swal") as sp:
+        try:
+            result = await_submit_result(driver, watch) if watch else None
+            if result:
+                sp["source"] = "network"
+            else:
+                result = handle_swal_after_reserve(driver, timeout=12)
+                if result != "duplicate" and wait_for_text_present(driver, DUPLICATE_MSG, timeout=3):
+                    result = "duplicate"
+        except Exception as e:
+            # the click is out: an error now must give a verdict, never a retry
+            result = (watch.wait(12) if watch and watch.sent.is_set() else None) or "unknown"
+            sp["source"] = "network" if result != "unknown" else "error"
+            log(f"Reading the submit result failed ({e}); outcome: {result}.")
+        sp["outcome"] = result
+    checkpoint("submitted", result=result)
+    if result == "unknown":
+        return "unknown"
+    if result in ("invalid", "session"):
+        log(f"Reservation rejected by the server ({result}).")
+        return "fail" if result == "invalid" else "session"
+    if result == "duplicate":
         log("Duplicate booking message — will try next room.")
         # Try to go home (verify session). If it fails, propagate so caller can rebuild driver.
-        go_home(driver)  # may raise RuntimeError("SESSION_LOST_AFTER_HOME")
+        if home_after_duplicate:
+            with span("go_home"):
+                go_home(driver)  # may raise RuntimeError("SESSION_LOST_AFTER_HOME")
         return "duplicate"
 
     return "success"
 
-# ---------- MAIN ----------
-def main():
-    today = now_kst()
-    if today.weekday() not in BOOK_DAYS:
-        print(f"Today is {today.strftime('%A')} — not in booking days {BOOK_DAYS}. Exiting.")
-        sys.exit(0)
+def try_book_room(driver, today, target_date, room_code, start_mode="full"):
+    """
+    start_mode:
+      - "full": click English + select Building, then choose room (first attempt)
+      - "room_only": start from home and only change the room (after duplicate)
+      - "in_place": the filled form of a duplicate is still open; switch its room and
+        resubmit (falls back to go_home + "room_only" if the form cannot be reused)
+      - "form" / "filled": resumed after recovery on this room's open form; fill it,
+        or submit it as is
+    Returns: "success" | "duplicate" | "fail" | "session" | "unknown" (see submit_staged_form)
+    """
+    if start_mode == "filled":
+        trace_room(room_code)
+        return submit_staged_form(driver, home_after_duplicate=not IN_PLACE_RETRY)
+    if start_mode == "in_place":
+        if not choose_slot(room_code, target_date.strftime("%Y-%m-%d"), target_date.weekday()):
+            return "duplicate"   # no acceptable slot left in this room; the form stays open for the next
+        status = "fail"
+        if tuple(slot_times(target_date.weekday())) == tuple(_CHECKPOINT["values"].get("times") or ()):
+            status = resubmit_for_room(driver, target_date, room_code)
+        else:   # switching only the room would submit the previous room's times
+            log(f"[switch] room {room_code} books other times than the open form; filling a new form.")
+        if status != "fail":
+            return status
+        with span("go_home"):
+            go_home(driver)  # may raise RuntimeError("SESSION_LOST_AFTER_HOME")
+        start_mode = "room_only"
+    if stage_room(driver, today, target_date, room_code, start_mode=start_mode) != "staged":
+        return "fail"
+    return submit_staged_form(driver, home_after_duplicate=not IN_PLACE_RETRY)
+
+# ---------- RELEASE SCHEDULER ----------
+def next_release_kst(now=None):
+    """Today's release instant in KST, or tomorrow's if today's passed over an hour ago."""
+    now = now or now_kst()
+    h, m, sec = RELEASE_TIME
+    release = now.replace(hour=h, minute=m, second=sec, microsecond=0)
+    if now > release + timedelta(hours=1):
+        release += timedelta(days=1)
+    return release
+
+def estimate_server_offset(url=None, samples=CLOCK_SAMPLES, session=None):
+    """
+    Server clock minus host clock (seconds) from HTTP Date headers.
+    A Date header only has 1 s resolution, so each sample bounds the offset to
+    [date - t_recv_latest, date + 1 - t_send]; samples taken at staggered
+    sub-second phases are intersected to narrow it down.
+    Returns (offset, uncertainty); uncertainty is None when no sample worked.
+    """
+    from email.utils import parsedate_to_datetime
+    url = url or START_URL
+    own = session is None
+    session = session or requests.Session()
+    lo, hi = float("-inf"), float("inf")
+    mids = []
+    try:
+        for _ in range(samples):
+            try:
+                t0 = time.time()
+                r = session.head(url, timeout=HTTP_TIMEOUT, allow_redirects=False)
+                t1 = time.time()
+                server = parsedate_to_datetime(r.headers["Date"]).timestamp()
+            except Exception:
+                continue
+            lo = max(lo, server - t1)
+            hi = min(hi, server + 1.0 - t0)
+            mids.append(server + 0.5 - (t0 + t1) / 2)
+            time.sleep(1.0 / samples)
+    finally:
+        if own:
+            session.close()
+
+    if not mids:
+        return 0.0, None
+    if lo <= hi:
+        return (lo + hi) / 2, (hi - lo) / 2
+    # Inconsistent windows (e.g. several backends with skewed clocks): use the median.
+    mids.sort()
+    return mids[len(mids) // 2], 0.5
+
+def wait_until_epoch(target):
+    """Sleep coarsely, then spin on perf_counter for the last half second."""
+    remaining = target - time.time()
+    if remaining > 0.5:
+        time.sleep(remaining - 0.5)
+    end = time.perf_counter() + (target - time.time())
+    while time.perf_counter() < end:
+        pass
 
-    target_date = today + timedelta(days=7)
-    print(f"Booking for: {target_date.strftime('%Y-%m-%d (%A)')} (KST)")
-    print("Using profile:", PROFILE_DIR)
+def sleep_until_prep(release):
+    """Block until PREP_LEAD_SECONDS before release (no-op if already past)."""
+    prep_at = release - timedelta(seconds=PREP_LEAD_SECONDS)
+    wait = (prep_at - now_kst()).total_seconds()
+    if wait > 0:
+        log(f"[schedule] release {release.strftime('%Y-%m-%d %H:%M:%S')} KST; sleeping {wait:.0f}s before preparing.")
+        time.sleep(wait)
 
-    os.makedirs(PROFILE_DIR, exist_ok=True)
-    driver = build_driver(headless=False)
+def release_epoch_local(release, offset):
+    """Host-clock epoch at which the server clock reads `release`."""
+    return release.timestamp() - offset
 
-    try:
-        # Open the portal; if nsso login shows, do it then continue
-        log("-> Opening reservation site...")
+def scheduled_try_book_room(driver, today, target_date, room_code, release_local, start_mode="full"):
+    """
+    Stage the form for room_code, hold it until the (server-corrected) release instant,
+    then fire #reserInsertBtn in one script call and log the achieved latency.
+    If the form cannot be staged early, wait for release and do a normal attempt.
+    Returns: "success" | "duplicate" | "fail" | "session" | "unknown"
+    """
+    if stage_room(driver, today, target_date, room_code, start_mode=start_mode) != "staged":
+        log("[schedule] could not stage the form before release; retrying normally at release.")
+        wait_until_epoch(release_local)
         driver.get(START_URL)
         wait_for_idle(driver)
-        time.sleep(1.0)
         maybe_login_nsso(driver)
+        return try_book_room(driver, today, target_date, room_code, start_mode="full")
+
+    lead = release_local - time.time()
+    log(f"[schedule] form staged for room {room_code}; holding {lead:.1f}s for release.")
+    wait_until_epoch(release_local)
+    fired = time.time()
+    status = submit_staged_form(driver, fast=True, home_after_duplicate=not IN_PLACE_RETRY)
+    log(f"[schedule] submit fired {(fired - release_local) * 1000:+.1f} ms vs release; "
+        f"result '{status}' {(time.time() - release_local) * 1000:+.0f} ms after release.")
+    return status
+
+# ---------- MULTI-ROOM RACE ----------
+def close_race_tabs(driver, handles, home_handle):
+    close_submit_watches([h for h in handles if h in _WATCHERS])
+    for h in handles:
+        try:
+            driver.switch_to.window(h)
+            driver.close()
+        except Exception:
+            pass
+    driver.switch_to.window(home_handle)
 
-        day = today.weekday()
-        rooms_today = ROOM_PRIORITY.get(day, ["311", "302", "318"])
-
-        start_mode = "full"   # first attempt does English + Building
+def race_rooms(driver, today, target_date, rooms, release_local=None):
+    """
+    Stage one filled form per room, each in its own tab of the logged-in browser
+    (tabs share the profile's session; separate drivers cannot share PROFILE_DIR).
+    At release (or right away) the staged forms are fired one at a time in strict
+    priority order, each wave only after the previous one came back duplicate, so
+    at most one booking can ever be made. The first success closes the rest.
+    Returns (status, room, rooms_not_settled): status "success" | "fail" |
+    "unknown" (a wave errored after it may have submitted; the slot ends there).
+    """
+    home = driver.current_window_handle
+    staged = []      # (room, handle)
+    unsettled = []
+    opened = []
+    for room in rooms:
+        driver.switch_to.new_window("tab")
+        opened.append(driver.current_window_handle)
+        lean_tab(driver)
+        try:
+            driver.get(START_URL)
+            wait_for_idle(driver)
+            maybe_login_nsso(driver)
+            if stage_room(driver, today, target_date, room, start_mode="full") == "staged":
+                # the form may have opened in its own window
+                if driver.current_window_handle not in opened:
+                    opened.append(driver.current_window_handle)
+                staged.append((room, driver.current_window_handle))
+                continue
+        except Exception as e:
+            if DEBUG: dump_debug(driver, f"race_stage_{room}")
+            log(f"[race] staging room {room} failed: {e}")
+        unsettled.append(room)
+    log(f"[race] staged {len(staged)}/{len(rooms)} rooms: {', '.join(r for r, _ in staged) or '-'}")
 
-        for idx, room in enumerate(rooms_today, start=1):
-            log(f"=== Try {idx}/{len(rooms_today)}: room {room} ===")
+    try:
+        if release_local:
+            wait_until_epoch(release_local)
+        for i, (room, handle) in enumerate(staged, start=1):
+            t0 = time.time()
+            started = time.monotonic()
             try:
-                status = try_book_room(driver, today, target_date, room, start_mode=start_mode)
-
-            except RuntimeError as re:
-                # Raised when session lost after go_home
-                if "SESSION_LOST_AFTER_HOME" in str(re):
-                    if DEBUG: dump_debug(driver, f"session_lost_{room}")
-                    try:
-                        driver.quit()
-                    except Exception:
-                        pass
-                    # Rebuild driver and restart from full
-                    driver = build_driver(headless=False)
-                    driver.get(START_URL)
-                    wait_for_idle(driver)
-                    time.sleep(1.0)
-                    maybe_login_nsso(driver)
-                    start_mode = "full"
-                    # retry this same room once
-                    try:
-                        status = try_book_room(driver, today, target_date, room, start_mode=start_mode)
-                    except Exception as e2:
-                        if DEBUG: dump_debug(driver, f"exception_room_{room}_retry")
-                        log(f"Error while retrying room {room}: {e2}")
-                        status = "fail"
-                else:
-                    if DEBUG: dump_debug(driver, f"exception_room_{room}")
-                    log(f"Error while trying room {room}: {re}")
-                    status = "fail"
+                driver.switch_to.window(handle)
+                status = submit_staged_form(driver, fast=True, home_after_duplicate=False)
+            except Exception as e:
+                # the submit may have gone out: neither this room nor any later one is
+                # fired again, by the race or the sequential loop
+                log(f"[race] wave {i} room {room} error, ending the slot: {e}")
+                note_attempt(target_date, room, "unknown", started, "race")
+                return "unknown", room, []
+            log(f"[race] wave {i} room {room}: {status} ({(time.time() - t0) * 1000:.0f} ms)")
+            note_attempt(target_date, room, status, started, "race")
+            if status in ("success", "unknown"):
+                return status, room, []
+    finally:
+        close_race_tabs(driver, [h for h in opened if h != home], home)
 
-            except WebDriverException as e:
-                # Handle crashes: tab crashed, invalid session id, etc.
-                msg = str(e).lower()
-                if "tab crashed" in msg or "invalid session id" in msg or "chrome not reachable" in msg:
-                    if DEBUG: dump_debug(driver, f"driver_crashed_{room}")
-                    try:
-                        driver.quit()
-                    except Exception:
-                        pass
-                    driver = build_driver(headless=False)
-                    driver.get(START_URL)
-                    wait_for_idle(driver)
-                    time.sleep(1.0)
-                    maybe_login_nsso(driver)
-                    start_mode = "full"
-                    # retry this room once
-                    try:
-                        status = try_book_room(driver, today, target_date, room, start_mode=start_mode)
-                    except Exception as e2:
-                        if DEBUG: dump_debug(driver, f"exception_room_{room}_retry2")
-                        log(f"Error while retrying room {room}: {e2}")
-                        status = "fail"
-                else:
-                    if DEBUG: dump_debug(driver, f"exception_room_{room}")
-                    log(f"Error while trying room {room}: {e}")
-                    status = "fail"
+    # keep priority order for whatever the sequential loop retries
+    return "fail", None, [r for r in rooms if r in unsettled]
 
+# ---------- ONE SLOT ----------
+def book_target(driver, today, target_date, rooms, start_mode="full", release_local=None):
+    """
+    Book one slot on target_date: pre-scan, HTTP engine, race, then rooms one by one.
+    Returns (status, room, driver, start_mode): status "success" | "fail" | "error" |
+    "unknown" (a submit of room went out without a clear answer, so nothing else was tried);
+    the driver may have been rebuilt, start_mode says where the page stands.
+    """
+    day = target_date.weekday()
+    _PICK.clear()
+    try:
+        if PRESCAN and rooms:
+            with span("prescan") as sp:
+                t0 = time.monotonic()
+                scanned, sp["avoided"] = prescan_rooms(driver, target_date, day, rooms)
+                for room in rooms:
+                    if room not in scanned:
+                        note_attempt(target_date, room, "gone", t0, "prescan")
+                rooms = scanned
+            if not rooms:
+                print("Pre-scan: every configured room is already booked for this slot.")
+
+        if HTTP_ENGINE:
+            if release_local:
+                log("[schedule] HTTP engine waiting for release...")
+                wait_until_epoch(release_local)
+            log("-> Trying HTTP engine first...")
+            try:
+                http_status, booked, rooms = http_book_rooms(driver, target_date, day, rooms)
             except Exception as e:
-                if DEBUG: dump_debug(driver, f"exception_room_{room}")
-                log(f"Error while trying room {room}: {e}")
-                status = "fail"
+                log(f"[http] engine error, falling back to Selenium: {e}")
+                http_status = None
+            if http_status == "success":
+                print(f"Success with room {booked} (HTTP){picked_note()}. Check your portal for confirmation/approval.")
+                return "success", booked, driver, start_mode
+            if http_status == "unknown":
+                print(f"Room {booked} (HTTP): the reservation went out but its outcome is unknown; "
+                      "not trying other rooms for this slot. Check your portal.")
+                return "unknown", booked, driver, start_mode
+            if rooms:
+                log(f"-> Selenium fallback for rooms: {', '.join(rooms)}")
+
+        if RACE_ROOMS > 1 and rooms:
+            log(f"-> Racing {min(RACE_ROOMS, len(rooms))} rooms in parallel tabs...")
+            race_status, booked, unsettled = race_rooms(driver, today, target_date, rooms[:RACE_ROOMS], release_local)
+            if race_status == "success":
+                print(f"Success with room {booked}. Check your portal for confirmation/approval.")
+                return "success", booked, driver, start_mode
+            if race_status == "unknown":
+                print(f"Room {booked}: the submit failed midway and its outcome is unknown; "
+                      "not trying other rooms for this slot. Check your portal.")
+                return "unknown", booked, driver, start_mode
+            rooms = unsettled + rooms[RACE_ROOMS:]
+            start_spare(driver)
+            release_local = None   # release has passed; the loop below just continues
+            driver.get(START_URL)
+            wait_for_idle(driver)
+            start_mode = "full"
+
+        for idx, room in enumerate(rooms, start=1):
+            log(f"=== Try {idx}/{len(rooms)}: room {room} ===")
+            status = "fail"
+            t0 = time.monotonic()
+            if release_local and idx == 1:   # the staged form waits for release; its cost starts there
+                t0 += max(0.0, release_local - time.time())
+            for attempt in (1, 2):   # a crash or lost session retries the room once, from its checkpoint
+                try:
+                    if release_local and idx == 1 and attempt == 1:
+                        status = scheduled_try_book_room(driver, today, target_date, room, release_local, start_mode=start_mode)
+                    else:
+                        status = try_book_room(driver, today, target_date, room, start_mode=start_mode)
+                    break
+                except Exception as e:
+                    kind = failure_kind(e)
+                    retry = kind is not None and attempt == 1
+                    if DEBUG: dump_debug(driver, f"{kind or 'exception'}_room_{room}" + ("_retry" if attempt > 1 else ""))
+                    log(f"Error while {'retrying' if attempt > 1 else 'trying'} room {room}: {e}")
+                    if submit_pending():
+                        # the insert may have gone out: no recovery, no retry, no other room
+                        status = "unknown"
+                        break
+                    status = "fail"
+                    if not retry:
+                        break
+                    driver, start_mode = recover(driver, kind, room, target_date)
+            note_attempt(target_date, room, status, t0, "ui")
+            if status == "unknown":
+                print(f"Room {room}: the submit failed midway and its outcome is unknown; "
+                      "not trying other rooms for this slot. Check your portal.")
+                return "unknown", room, driver, "full"
+            if status != "success":
+                start_spare(driver)   # the release-time submit is over
 
             # handle result
             if status == "success":
-                print(f"Success with room {room}. Check your portal for confirmation/approval.")
-                return
+                print(f"Success with room {room}{picked_note()}. Check your portal for confirmation/approval.")
+                return "success", room, driver, start_mode
             elif status == "duplicate":
-                # After duplicate + go_home success: skip English/Building next time
-                start_mode = "room_only"
+                # The filled form is still open: only switch the room next time
+                # (or, after go_home, skip English/Building)
+                start_mode = "in_place" if IN_PLACE_RETRY else "room_only"
                 continue
-            else:
-                # Hard fail: ensure we're at start and reset to full
+            elif idx < len(rooms):
+                # Hard fail: back to the latest checkpoint the page still holds for the next room
+                # (an expired session always goes through the login again)
+                driver, start_mode = recover(driver, "session_lost" if status == "session" else "hard_fail",
+                                             rooms[idx], target_date)
+    except Exception as e:
+        if DEBUG: dump_debug(driver, "exception")
+        log(f"Error: {e}")
+        return "error", None, driver, "full"
+    finally:
+        _PICK.clear()
+    return "fail", None, driver, start_mode
+
+# ---------- BATCH ----------
+def parse_jobs(jobs):
+    """BOOKING_JOBS entries -> [{"date", "times", "rooms", "label"}]."""
+    parsed = []
+    for date_s, start, end, rooms in jobs:
+        date = datetime.strptime(date_s, "%Y-%m-%d").replace(tzinfo=KST)
+        sh, sm = start.split(":")
+        eh, em = end.split(":")
+        parsed.append({"date": date, "times": (sh, sm, eh, em), "rooms": list(rooms) if rooms else None,
+                       "label": f"{date_s} {start}-{end}"})
+    return parsed
+
+def job_release(job):
+    """KST instant at which the job's date opens for booking."""
+    h, m, sec = RELEASE_TIME
+    return (job["date"] - timedelta(days=BOOK_AHEAD_DAYS)).replace(hour=h, minute=m, second=sec)
+
+def job_start(job):
+    """KST instant at which the job's slot begins."""
+    sh, sm = job["times"][:2]
+    return job["date"].replace(hour=int(sh), minute=int(sm))
+
+def order_jobs(jobs, now):
+    """
+    (open jobs, most recently opened first, earlier slot first; jobs not open yet;
+    jobs whose slot has already begun).
+    """
+    past = [j for j in jobs if job_start(j) <= now]
+    live = [j for j in jobs if job_start(j) > now]
+    open_jobs = sorted((j for j in live if job_release(j) <= now),
+                       key=lambda j: (-job_release(j).timestamp(), j["times"]))
+    return open_jobs, [j for j in live if job_release(j) > now], past
+
+def run_jobs(driver, today, jobs, start_mode="full", release=None, release_local=None):
+    """
+    Run batch jobs in one session. Between jobs the page goes back home (building kept).
+    Returns ([{"job", "outcome", "room"}], driver).
+    """
+    open_jobs, closed, past = order_jobs(jobs, release or now_kst())
+    results = [{"job": j["label"], "outcome": "past", "room": None} for j in past]
+    results += [{"job": j["label"], "outcome": "not_open", "room": None} for j in closed]
+    for n, job in enumerate(open_jobs, start=1):
+        log(f"=== Job {n}/{len(open_jobs)}: {job['label']} ===")
+        if n > 1:
+            try:
+                with span("go_home"):
+                    go_home(driver)
+                start_mode = "room_only"
+            except Exception:   # also after a job that ended on a dead browser
+                driver, start_mode = recover(driver, "hard_fail", None, job["date"])
+        rooms = job["rooms"] or room_priority(job["date"].weekday())
+        t0 = time.monotonic()
+        with job_times(job["times"]):
+            status, room, driver, start_mode = book_target(
+                driver, today, job["date"], rooms, start_mode,
+                release_local if release and job_release(job) == release else None)
+        trace_event("job", t0, time.monotonic(), status, job=job["label"], booked=room)
+        results.append({"job": job["label"], "outcome": status, "room": room})
+    return results, driver
+
+# ---------- MAIN ----------
+def main():
+    """One booking run with the module settings. Returns (outcome, room) as traced for the run."""
+    check_time_config()
+    release = next_release_kst() if SCHEDULE_MODE else None
+    today = release or now_kst()
+    jobs = parse_jobs(BOOKING_JOBS)
+    if not jobs and today.weekday() not in BOOK_DAYS:
+        print(f"Today is {today.strftime('%A')} — not in booking days {BOOK_DAYS}. Exiting.")
+        sys.exit(0)
+
+    target_date = today + timedelta(days=BOOK_AHEAD_DAYS)
+    if jobs:
+        print(f"Batch of {len(jobs)} jobs: {', '.join(j['label'] for j in jobs)} (KST)")
+    else:
+        print(f"Booking for: {target_date.strftime('%Y-%m-%d (%A)')} (KST)")
+    print("Using profile:", PROFILE_DIR)
+    if release:
+        sleep_until_prep(release)
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    trace_start_run()
+    _HISTORY.clear()
+    run_outcome, run_room = "fail", None
+    with span("build_driver"):
+        driver = build_driver()
+
+    try:
+        # Open the portal; if nsso login shows, do it then continue
+        warm = False
+        if SESSION_CACHE_FILE:
+            with span("session_restore") as sp:
                 try:
-                    driver.get(START_URL)
-                    wait_for_idle(driver)
-                    time.sleep(1.0)
-                    maybe_login_nsso(driver)  # if session dropped mid-run
-                except Exception:
-                    # If even this fails, rebuild browser
-                    try:
-                        driver.quit()
-                    except Exception:
-                        pass
-                    driver = build_driver(headless=False)
-                    driver.get(START_URL)
-                    wait_for_idle(driver)
-                    time.sleep(1.0)
-                    maybe_login_nsso(driver)
-                start_mode = "full"
+                    warm = restore_session(driver)
+                except Exception as e:
+                    log(f"[session] warm start failed: {e}")
+                sp["outcome"] = "warm" if warm else "cold"
+        if not warm:
+            log("-> Opening reservation site...")
+            with span("start_url"):
+                driver.get(START_URL)
+                wait_for_idle(driver)
+                settle(driver, 1.0)
+            with span("nsso_login"):
+                maybe_login_nsso(driver)
+
+        release_local = None
+        if release:
+            offset, uncertainty = estimate_server_offset(START_URL)
+            release_local = release_epoch_local(release, offset)
+            unc = f"±{uncertainty * 1000:.0f} ms" if uncertainty is not None else "unknown, using host clock"
+            log(f"[schedule] server clock offset {offset * 1000:+.0f} ms ({unc}).")
+
+        start_mode = "room_only" if warm else "full"   # first attempt does English + Building
+        if jobs:
+            results, driver = run_jobs(driver, today, jobs, start_mode, release, release_local)
+            print()
+            print(f"{'job':<28}{'outcome':<10}{'room':<6}")
+            for r in results:
+                print(f"{r['job']:<28}{r['outcome']:<10}{r['room'] or '-':<6}")
+            booked = [r["room"] for r in results if r["outcome"] == "success"]
+            if any(r["outcome"] == "error" for r in results):
+                run_outcome = "error"
+            elif booked:
+                run_outcome = "success" if len(booked) == len(results) else "partial"
+            elif any(r["outcome"] == "unknown" for r in results):
+                run_outcome = "unknown"
+            run_room = ",".join(booked) or None
+            return run_outcome, run_room
+
+        rooms = room_priority(target_date.weekday())
+        status, room, driver, _ = book_target(driver, today, target_date, rooms, start_mode, release_local)
+        if status in ("success", "unknown"):
+            run_outcome, run_room = status, room
+            return run_outcome, run_room
+        if status == "error":
+            run_outcome = "error"
+            return run_outcome, run_room
 
         print("Could not complete a reservation with the configured rooms for today.")
 
     except Exception as e:
+        run_outcome = "error"
         if DEBUG: dump_debug(driver, "exception")
         print(f"Error: {e}")
     finally:
+        trace_end_run(run_outcome, run_room)
+        save_history(run_outcome, run_room)
+        close_submit_watches()
+        close_spare()
+        finish_debug(driver, run_outcome in ("fail", "error", "unknown"))
+        if run_outcome != "error":
+            save_session_cache(driver)
         try:
             time.sleep(2)
             driver.quit()
         except Exception:
             pass
+    return run_outcome, run_room
+
+def startup_benchmark():
+    """--startup-benchmark: time from process start to the first driver.get(START_URL); no booking."""
+    marks = [("imports done", _STARTUP["imported"])]
+    if BROWSER_BACKEND == "cdp":
+        find_chrome()
+    else:
+        resolve_browser()
+    marks.append(("driver resolved", time.perf_counter()))
+    driver = build_driver()
+    marks.append(("browser up", time.perf_counter()))
+    try:
+        marks.append(("first get sent", time.perf_counter()))
+        driver.get(START_URL)
+        marks.append(("first page loaded", time.perf_counter()))
+    finally:
+        driver.quit()
+    try:
+        import psutil
+        origin = time.perf_counter() - (time.time() - psutil.Process().create_time())
+        label = "process start"
+    except Exception:
+        origin = _STARTUP["module"]
+        label = "module start (install psutil to include interpreter start-up)"
+    print(f"Startup timeline, ms since {label}:")
+    for name, t in marks:
+        print(f"  {name:<20}{(t - origin) * 1000:>9.0f}")
+
+_STARTUP["imported"] = time.perf_counter()
 
 if __name__ == "__main__":
-    main()
+    if "--startup-benchmark" in sys.argv[1:]:
+        startup_benchmark()
+    else:
+        main()
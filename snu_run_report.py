@@ -0,0 +1,100 @@
+# snu_run_report.py
+# Aggregate the per-phase spans that snu_practice_room_bot.py appends to
+# run_timeline.jsonl:  python snu_run_report.py [run_timeline.jsonl] [--runs 30]
+import argparse
+import json
+import math
+import sys
+from collections import defaultdict, OrderedDict
+
+# Display order; unknown phases are listed after these.
+PHASE_ORDER = [
+    "build_driver", "session_restore", "start_url", "nsso_login", "prescan",
+    "building_select", "room_select", "datepicker", "search", "calendar_render", "slot_pick", "form_landing", "form_fill",
+    "submit", "swal", "room_switch", "go_home", "recovery", "spare_warm", "job", "run",
+]
+
+def load_runs(path):
+    """Return {run_id: [span, ...]} in file order."""
+    runs = OrderedDict()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            runs.setdefault(rec.get("run"), []).append(rec)
+    return runs
+
+def percentile(sorted_vals, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_vals:
+        return 0.0
+    k = max(0, min(len(sorted_vals) - 1, math.ceil(p / 100.0 * len(sorted_vals)) - 1))
+    return sorted_vals[k]
+
+def summarize(runs):
+    durations = defaultdict(list)
+    failures = defaultdict(int)
+    for spans in runs.values():
+        for rec in spans:
+            durations[rec["phase"]].append(rec["ms"])
+            if str(rec.get("outcome", "")).startswith("error") or rec.get("outcome") in ("fail", "no_button"):
+                failures[rec["phase"]] += 1
+    phases = [p for p in PHASE_ORDER if p in durations] + sorted(p for p in durations if p not in PHASE_ORDER)
+    rows = []
+    for phase in phases:
+        vals = sorted(durations[phase])
+        rows.append((phase, len(vals), percentile(vals, 50), percentile(vals, 95), max(vals), failures[phase]))
+    return rows
+
+def recovery_by_kind(runs):
+    """[(kind, n, p50 ms, max ms, {resume mode: count})] from the "recovery" spans."""
+    by_kind = defaultdict(list)
+    for spans in runs.values():
+        for rec in spans:
+            if rec["phase"] == "recovery":
+                by_kind[rec.get("kind", "?")].append(rec)
+    rows = []
+    for kind, recs in sorted(by_kind.items()):
+        vals = sorted(r["ms"] for r in recs)
+        modes = defaultdict(int)
+        for r in recs:
+            modes[r.get("outcome")] += 1
+        rows.append((kind, len(vals), percentile(vals, 50), max(vals), dict(modes)))
+    return rows
+
+def main():
+    ap = argparse.ArgumentParser(description="p50/p95 per booking phase across runs")
+    ap.add_argument("path", nargs="?", default="run_timeline.jsonl")
+    ap.add_argument("--runs", type=int, default=0, help="only the last N runs (0 = all)")
+    args = ap.parse_args()
+
+    try:
+        runs = load_runs(args.path)
+    except FileNotFoundError:
+        print(f"No timeline at {args.path}")
+        sys.exit(1)
+    if args.runs > 0:
+        runs = OrderedDict(list(runs.items())[-args.runs:])
+
+    outcomes = defaultdict(int)
+    for spans in runs.values():
+        end = [r for r in spans if r["phase"] == "run"]
+        outcomes[end[-1]["outcome"] if end else "incomplete"] += 1
+    print(f"{len(runs)} runs: " + ", ".join(f"{k}={v}" for k, v in sorted(outcomes.items())))
+    print(f"{'phase':<18}{'n':>5}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'fails':>7}")
+    for phase, n, p50, p95, mx, fails in summarize(runs):
+        print(f"{phase:<18}{n:>5}{p50:>10.0f}{p95:>10.0f}{mx:>10.0f}{fails:>7}")
+    recoveries = recovery_by_kind(runs)
+    if recoveries:
+        print()
+        print(f"{'recovery':<18}{'n':>5}{'p50 ms':>10}{'max ms':>10}  resumed as")
+        for kind, n, p50, mx, modes in recoveries:
+            print(f"{kind:<18}{n:>5}{p50:>10.0f}{mx:>10.0f}  " + ", ".join(f"{m}={c}" for m, c in sorted(modes.items())))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+# snu_watcher.py
+# Watch mode: keep polling the WATCH_TARGETS of snu_practice_room_bot.py for
+# cancellations and book the first target slot that frees up.
+#   python snu_watcher.py [--once] [--hours 24]
+#
+# One browser stays logged in (or attached to the daemon with ATTACH_TO_DAEMON);
+# polls are plain HTTP calendar searches with its cookies, one per (date, room).
+#   - a response identical to the previous one for that (date, room) is not parsed
+#     and cannot trigger a second attempt
+#   - the poll interval drops to WATCH_MIN_INTERVAL after a change and grows by
+#     WATCH_GROWTH towards WATCH_MAX_INTERVAL while nothing changes; failed polls
+#     back off exponentially up to WATCH_MAX_BACKOFF
+#   - requests are spaced so the account never sends more than
+#     WATCH_REQUESTS_PER_MINUTE searches (one watcher = one account's session)
+import argparse
+import hashlib
+import json
+import random
+import sys
+import time
+from datetime import timedelta
+
+from selenium.common.exceptions import WebDriverException
+
+import snu_practice_room_bot as bot
+
+WATCH_MIN_INTERVAL = 20
+WATCH_MAX_INTERVAL = 300
+WATCH_GROWTH = 1.5
+WATCH_MAX_BACKOFF = 900
+WATCH_REQUESTS_PER_MINUTE = 12
+
+class SessionExpired(Exception):
+    pass
+
+class Pacer:
+    """Spaces requests at least 60 / per_minute seconds apart."""
+
+    def __init__(self, per_minute):
+        self.gap = 60.0 / per_minute
+        self.next_at = 0.0
+
+    def wait(self):
+        now = time.monotonic()
+        if self.next_at > now:
+            time.sleep(self.next_at - now)
+        self.next_at = max(now, self.next_at) + self.gap
+
+def watch_targets(now):
+    """
+    Open, not yet started targets as parse_jobs() dicts (WATCH_TARGETS or the default
+    per-day slots). A default slot from a flexible TIME_CONFIG entry keeps its
+    preferred times in "times" and every acceptable (start, end) in "windows".
+    """
+    if bot.WATCH_TARGETS:
+        jobs = bot.parse_jobs(bot.WATCH_TARGETS)
+    else:
+        jobs = []
+        for ahead in range(bot.BOOK_AHEAD_DAYS + 1):
+            date = (now + timedelta(days=ahead)).replace(hour=0, minute=0, second=0, microsecond=0)
+            if date.weekday() not in bot.BOOK_DAYS:
+                continue
+            times, min_minutes, tolerance = bot.slot_spec(date.weekday())
+            sh, sm, eh, em = times
+            job = {"date": date, "times": times, "rooms": None,
+                   "label": f"{date.strftime('%Y-%m-%d')} {sh}:{sm}-{eh}:{em}"}
+            if bot.slot_is_flexible(date.weekday()):
+                job["windows"] = bot.slot_candidates(times, min_minutes, tolerance)
+            jobs.append(job)
+    live = []
+    for job in jobs:
+        if bot.job_release(job) <= now < bot.job_start(job):
+            job["rooms"] = job["rooms"] or bot.ROOM_PRIORITY.get(job["date"].weekday(), ["311", "302", "318"])
+            live.append(job)
+    return live
+
+def job_free(job, data):
+    """Whether a parsed search response has the job's slot (any acceptable one, if flexible) free."""
+    return any(bot.slot_status(data, window) == "free"
+               for window in job.get("windows") or [bot.slot_window(job["times"])])
+
+def poll(session, codes, jobs, snapshots, pacer):
+    """
+    One search per (date, room) the jobs need. Returns (changed, failed, hits):
+    hits = [(job, free rooms in priority order)] among the (date, room) pairs
+    whose response changed since the last poll.
+    Raises SessionExpired when a search lands on the login page.
+    """
+    building_code, space_codes = codes
+    changed, failed, free = 0, 0, {}
+    pairs = {}
+    for job in jobs:
+        for room in job["rooms"]:
+            pairs.setdefault((job["date"].strftime("%Y-%m-%d"), room), job["date"])
+    for (day, room), date in pairs.items():
+        if not space_codes.get(room):
+            continue
+        pacer.wait()
+        state, body = bot.fetch_room_day(session, date, building_code, space_codes[room])
+        if state == "login":
+            raise SessionExpired()
+        if state != "ok":
+            failed += 1
+            continue
+        digest = hashlib.sha1(body.encode("utf-8")).digest()
+        if snapshots.get((day, room)) == digest:
+            continue
+        snapshots[(day, room)] = digest
+        changed += 1
+        try:
+            data = json.loads(body)
+        except ValueError:
+            continue
+        bot.note_occupancy(day, room, bot.booked_windows(data))   # lets a flexible booking pick its slot
+        for job in jobs:
+            if job["date"].strftime("%Y-%m-%d") == day and room in job["rooms"]:
+                if job_free(job, data):
+                    free.setdefault(job["label"], set()).add(room)
+    hits = [(job, [r for r in job["rooms"] if r in free[job["label"]]]) for job in jobs if job["label"] in free]
+    return changed, failed, hits
+
+def open_session(driver):
+    """Logged-in page with the filter lists (for the HTTP codes)."""
+    try:
+        if bot.SESSION_CACHE_FILE and bot.restore_session(driver):
+            return
+    except Exception as e:
+        bot.log(f"[watch] warm start failed: {e}")
+    driver.get(bot.START_URL)
+    bot.wait_for_idle(driver)
+    bot.maybe_login_nsso(driver)
+
+def book(driver, job, rooms):
+    """Run the normal booking path for a freed slot. Returns (status, room, driver)."""
+    bot.log(f"[watch] {job['label']}: free in {', '.join(rooms)}; booking.")
+    # a flexible slot books through TIME_CONFIG; the run history models release-time runs, not freed slots
+    with bot.job_times(None if job.get("windows") else job["times"], record=False):
+        driver.get(bot.START_URL)
+        bot.wait_for_idle(driver)
+        bot.maybe_login_nsso(driver)
+        status, room, driver, _ = bot.book_target(driver, bot.now_kst(), job["date"], rooms, "full")
+    return status, room, driver
+
+def main():
+    ap = argparse.ArgumentParser(description="Poll the watch targets for cancellations and book freed slots")
+    ap.add_argument("--once", action="store_true", help="one poll (and booking) then exit")
+    ap.add_argument("--hours", type=float, default=0, help="stop after this many hours (0 = until no targets are left)")
+    args = ap.parse_args()
+
+    stop_at = time.monotonic() + args.hours * 3600 if args.hours else None
+    bot.trace_start_run()
+    driver = bot.build_driver()
+    session = None
+    booked = []
+    try:
+        open_session(driver)
+        session = bot.build_http_session(driver)
+        codes = bot.discover_http_codes(driver)
+        if not codes[0]:
+            bot.log("[watch] no building code (set HTTP_BUILDING_CODE); cannot poll.")
+            return 1
+        pacer = Pacer(WATCH_REQUESTS_PER_MINUTE)
+        snapshots = {}
+        interval, errors = WATCH_MIN_INTERVAL, 0
+        done = set()
+        while stop_at is None or time.monotonic() < stop_at:
+            jobs = [j for j in watch_targets(bot.now_kst()) if j["label"] not in done]
+            if not jobs:
+                bot.log("[watch] no open targets left.")
+                break
+            t0 = time.monotonic()
+            try:
+                changed, failed, hits = poll(session, codes, jobs, snapshots, pacer)
+                outcome = "changed" if changed else "same"
+            except SessionExpired:
+                bot.log("[watch] session expired; logging in again.")
+                session.close()
+                open_session(driver)
+                session = bot.build_http_session(driver)
+                changed, failed, hits, outcome = 0, 1, [], "login"
+            bot.trace_event("watch_poll", t0, time.monotonic(), outcome,
+                            targets=len(jobs), changed=changed, failed=failed)
+
+            for job, rooms in hits:
+                try:
+                    status, room, driver = book(driver, job, rooms)
+                except WebDriverException as e:
+                    bot.log(f"[watch] browser error while booking: {e}")
+                    driver = bot.fresh_driver(driver)
+                    open_session(driver)
+                    status, room = "error", None
+                bot.trace_event("job", t0, time.monotonic(), status, job=job["label"], booked=room)
+                if status == "success":
+                    print(f"[watch] booked {job['label']} in room {room}.")
+                    booked.append((job["label"], room))
+                    done.add(job["label"])
+                elif status == "unknown":   # may be booked already; never risk a second booking
+                    print(f"[watch] {job['label']}: outcome unknown in room {room}; no longer watched, check your portal.")
+                    done.add(job["label"])
+                else:   # not booked: look at these rooms again next poll even if nothing changed
+                    for r in rooms:
+                        snapshots.pop((job["date"].strftime("%Y-%m-%d"), r), None)
+            if hits:
+                session.close()
+                session = bot.build_http_session(driver)   # the booking may have rebuilt the browser
+
+            if args.once:
+                break
+            if failed and not changed:
+                errors += 1
+                interval = min(WATCH_MIN_INTERVAL * 2 ** errors, WATCH_MAX_BACKOFF)
+            else:
+                errors = 0
+                interval = WATCH_MIN_INTERVAL if changed else min(interval * WATCH_GROWTH, WATCH_MAX_INTERVAL)
+            bot.log(f"[watch] {len(jobs)} targets, {changed} changed, {failed} failed; next poll in {interval:.0f}s.")
+            time.sleep(interval * random.uniform(0.9, 1.1))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        bot.trace_end_run("success" if booked else "fail", ",".join(r for _, r in booked) or None)
+        if session is not None:
+            session.close()
+        bot.save_session_cache(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+    return 0 if booked else 1
+
+if __name__ == "__main__":
+    sys.exit(main())